@@ -6,7 +6,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from modeles.gestionnaire_donnees import GestionnaireDonnees
 from modeles.membre_equipe import MembreEquipe
+from modeles.stockage import ConflitConcurrence
 from utilitaires.validateurs import Validateurs
+from gui.pagination import ChargeurPagine
 
 class FenetreEquipe:
     def __init__(self, parent, gestionnaire_donnees: GestionnaireDonnees):
@@ -89,7 +91,16 @@ class FenetreEquipe:
         # Barres de défilement
         defilement_v = ttk.Scrollbar(cadre_arbre, orient="vertical", command=self.arbre_membres.yview)
         defilement_h = ttk.Scrollbar(cadre_arbre, orient="horizontal", command=self.arbre_membres.xview)
-        self.arbre_membres.configure(yscrollcommand=defilement_v.set, xscrollcommand=defilement_h.set)
+        self.arbre_membres.configure(xscrollcommand=defilement_h.set)
+        
+        # Chargement page par page au défilement (configure aussi yscrollcommand)
+        self.texte_filtre = None
+        self.chargeur_membres = ChargeurPagine(self.arbre_membres, defilement_v,
+                                               self.charger_page_membres, self.afficher_membre)
+        
+        # Configurer les balises pour les couleurs
+        self.arbre_membres.tag_configure("faible_disponibilite", background="#ffcdd2")
+        self.arbre_membres.tag_configure("haute_disponibilite", background="#c8e6c9")
         
         # Disposition en grille
         self.arbre_membres.grid(row=0, column=0, sticky="nsew")
@@ -101,53 +112,48 @@ class FenetreEquipe:
     
     def actualiser(self):
         """Actualiser l'affichage des membres d'équipe"""
-        self.membres = self.gestionnaire_donnees.charger_membres_equipe()
-        self.toutes_taches = self.gestionnaire_donnees.charger_taches()
         self.filtrer_membres()
     
     def filtrer_membres(self, *args):
         """Filtrer les membres selon la recherche"""
-        # Effacer les éléments existants
-        for element in self.arbre_membres.get_children():
-            self.arbre_membres.delete(element)
-        
-        texte_recherche = self.var_recherche.get().lower()
-        
-        for membre in self.membres:
-            # Appliquer le filtre de recherche
-            if texte_recherche and (texte_recherche not in membre.nom.lower() and 
-                                   texte_recherche not in membre.email.lower() and
-                                   texte_recherche not in membre.role.lower()):
-                continue
-            
-            # Obtenir les tâches actuelles du membre
-            taches_membre = [t for t in self.toutes_taches if t.assigne_a == membre.id and t.statut != "Terminé"]
-            
-            # Formater les compétences
-            texte_competences = ", ".join(membre.competences[:3])  # Afficher les 3 premières compétences
-            if len(membre.competences) > 3:
-                texte_competences += f" (+{len(membre.competences) - 3} autres)"
-            
-            # Déterminer la couleur de ligne selon la disponibilité
-            balises = []
-            if membre.obtenir_score_disponibilite() < 0.3:
-                balises = ["faible_disponibilite"]
-            elif membre.obtenir_score_disponibilite() > 0.7:
-                balises = ["haute_disponibilite"]
-            
-            self.arbre_membres.insert("", "end", values=(
-                membre.nom,
-                membre.email,
-                membre.role,
-                texte_competences,
-                f"{membre.disponibilite}%",
-                str(len(taches_membre)),
-                f"{membre.charge_travail_heures}/{membre.heures_max_par_semaine}"
-            ), tags=[membre.id] + balises)
-        
-        # Configurer les balises pour les couleurs
-        self.arbre_membres.tag_configure("faible_disponibilite", background="#ffcdd2")
-        self.arbre_membres.tag_configure("haute_disponibilite", background="#c8e6c9")
+        # Filtre appliqué côté base de données, chargement page par page
+        self.texte_filtre = self.var_recherche.get().strip() or None
+        self.chargeur_membres.recommencer()
+    
+    def charger_page_membres(self, curseur):
+        """Charger une page de membres avec leur nombre de tâches actuelles"""
+        membres, curseur_suivant = self.gestionnaire_donnees.charger_page_membres(
+            apres=curseur, texte=self.texte_filtre)
+        
+        # Compter les tâches non terminées des membres de la page en une seule requête
+        nb_taches = self.gestionnaire_donnees.compter_taches_actives_par_membre([m.id for m in membres])
+        return [(membre, nb_taches.get(membre.id, 0)) for membre in membres], curseur_suivant
+    
+    def afficher_membre(self, element):
+        """Ajouter un membre d'équipe (et son nombre de tâches actuelles) à l'arbre"""
+        membre, nb_taches_membre = element
+        
+        # Formater les compétences
+        texte_competences = ", ".join(membre.competences[:3])  # Afficher les 3 premières compétences
+        if len(membre.competences) > 3:
+            texte_competences += f" (+{len(membre.competences) - 3} autres)"
+        
+        # Déterminer la couleur de ligne selon la disponibilité
+        balises = []
+        if membre.obtenir_score_disponibilite() < 0.3:
+            balises = ["faible_disponibilite"]
+        elif membre.obtenir_score_disponibilite() > 0.7:
+            balises = ["haute_disponibilite"]
+        
+        self.arbre_membres.insert("", "end", values=(
+            membre.nom,
+            membre.email,
+            membre.role,
+            texte_competences,
+            f"{membre.disponibilite}%",
+            str(nb_taches_membre),
+            f"{membre.charge_travail_heures}/{membre.heures_max_par_semaine}"
+        ), tags=[membre.id] + balises)
     
     def obtenir_membre_selectionne(self):
         """Obtenir le membre d'équipe actuellement sélectionné"""
@@ -184,11 +190,11 @@ class FenetreEquipe:
             return
         
         # Vérifier si le membre a des tâches assignées
-        taches_assignees = [t for t in self.toutes_taches if t.assigne_a == membre.id and t.statut != "Terminé"]
+        nb_taches_assignees = self.gestionnaire_donnees.compter_taches_actives_par_membre([membre.id]).get(membre.id, 0)
         
         message_avertissement = f"Êtes-vous sûr de vouloir supprimer le membre d'équipe '{membre.nom}' ?"
-        if taches_assignees:
-            message_avertissement += f"\n\nCe membre a {len(taches_assignees)} tâches assignées qui seront désassignées."
+        if nb_taches_assignees:
+            message_avertissement += f"\n\nCe membre a {nb_taches_assignees} tâches assignées qui seront désassignées."
         
         resultat = messagebox.askyesno("Confirmer la Suppression", message_avertissement)
         
@@ -212,7 +218,7 @@ class FenetreEquipe:
         fenetre_taches.geometry("800x500")
         
         # Tâches pour ce membre
-        taches_membre = [t for t in self.toutes_taches if t.assigne_a == membre.id]
+        taches_membre = self.gestionnaire_donnees.rechercher_taches(assigne_a=membre.id)
         
         # Créer l'arbre
         cadre = ttk.Frame(fenetre_taches, padding=20)
@@ -391,6 +397,13 @@ class FenetreEquipe:
                 
                 dialogue.destroy()
                 
+            except ConflitConcurrence:
+                messagebox.showwarning(
+                    "Conflit de Modification",
+                    "Ce membre a été modifié ou supprimé par un autre utilisateur depuis son ouverture.\n"
+                    "Vos modifications n'ont pas été enregistrées : actualisez la liste puis recommencez."
+                )
+                dialogue.destroy()
             except Exception as e:
                 messagebox.showerror("Erreur", f"Échec de la sauvegarde du membre d'équipe : {str(e)}")
         
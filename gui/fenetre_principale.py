@@ -3,18 +3,25 @@ Fenêtre principale pour l'application de Suivi des Projets
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog, simpledialog
 from gui.tableau_bord import TableauBord
 from gui.fenetre_projet import FenetreProjet
 from gui.fenetre_tache import FenetreTache
 from gui.fenetre_equipe import FenetreEquipe
 from modeles.gestionnaire_donnees import GestionnaireDonnees
+from modeles.stockage import JOURS_AVANT_ARCHIVAGE
+from utilitaires.importation import ImportateurDonnees, ENTITE_PROJETS, ENTITE_MEMBRES, ENTITE_TACHES
+from utilitaires.exportation import ExportateurDonnees
 
 class FenetrePrincipale:
     def __init__(self, racine):
         self.racine = racine
         self.gestionnaire_donnees = GestionnaireDonnees()
         
+        # Correspondance ancien ID → nouvel ID des projets et membres importés, appliquée aux
+        # références des tâches importées ensuite (les IDs du fichier source ne sont pas les nôtres)
+        self.correspondances_import = {ENTITE_PROJETS: {}, ENTITE_MEMBRES: {}}
+        
         self.configurer_fenetre()
         self.creer_menu()
         self.creer_cadre_principal()
@@ -27,6 +34,7 @@ class FenetrePrincipale:
         self.racine.title("Suivi des Projets - Système de Gestion des Tâches")
         self.racine.geometry("1200x800")
         self.racine.minsize(800, 600)
+        self.racine.protocol("WM_DELETE_WINDOW", self.quitter)
         
         # Configurer le poids de la grille
         self.racine.grid_rowconfigure(0, weight=1)
@@ -42,7 +50,18 @@ class FenetrePrincipale:
         barre_menu.add_cascade(label="Fichier", menu=menu_fichier)
         menu_fichier.add_command(label="Tableau de bord", command=self.afficher_tableau_bord)
         menu_fichier.add_separator()
-        menu_fichier.add_command(label="Quitter", command=self.racine.quit)
+        menu_importer = tk.Menu(menu_fichier, tearoff=0)
+        menu_fichier.add_cascade(label="Importer", menu=menu_importer)
+        menu_importer.add_command(label="Projets...", command=lambda: self.importer_donnees(ENTITE_PROJETS))
+        menu_importer.add_command(label="Membres d'Équipe...", command=lambda: self.importer_donnees(ENTITE_MEMBRES))
+        menu_importer.add_command(label="Tâches...", command=lambda: self.importer_donnees(ENTITE_TACHES))
+        menu_exporter = tk.Menu(menu_fichier, tearoff=0)
+        menu_fichier.add_cascade(label="Exporter", menu=menu_exporter)
+        menu_exporter.add_command(label="Projets...", command=lambda: self.exporter_donnees(ENTITE_PROJETS))
+        menu_exporter.add_command(label="Membres d'Équipe...", command=lambda: self.exporter_donnees(ENTITE_MEMBRES))
+        menu_exporter.add_command(label="Tâches...", command=lambda: self.exporter_donnees(ENTITE_TACHES))
+        menu_fichier.add_separator()
+        menu_fichier.add_command(label="Quitter", command=self.quitter)
         
         # Menu Projets
         menu_projets = tk.Menu(barre_menu, tearoff=0)
@@ -55,12 +74,16 @@ class FenetrePrincipale:
         barre_menu.add_cascade(label="Tâches", menu=menu_taches)
         menu_taches.add_command(label="Gérer les Tâches", command=self.afficher_taches)
         menu_taches.add_command(label="Nouvelle Tâche", command=self.nouvelle_tache)
+        menu_taches.add_separator()
+        menu_taches.add_command(label="Archiver les Tâches Terminées...", command=self.archiver_taches_terminees)
         
         # Menu Équipe
         menu_equipe = tk.Menu(barre_menu, tearoff=0)
         barre_menu.add_cascade(label="Équipe", menu=menu_equipe)
         menu_equipe.add_command(label="Gérer l'Équipe", command=self.afficher_equipe)
         menu_equipe.add_command(label="Ajouter un Membre", command=self.nouveau_membre_equipe)
+        menu_equipe.add_separator()
+        menu_equipe.add_command(label="Recalculer les Charges de Travail", command=self.recalculer_charges_travail)
         
         # Menu Aide
         menu_aide = tk.Menu(barre_menu, tearoff=0)
@@ -124,6 +147,87 @@ class FenetrePrincipale:
         if isinstance(self.vue_actuelle, (TableauBord, FenetreEquipe)):
             self.vue_actuelle.actualiser()
     
+    def recalculer_charges_travail(self):
+        """Recalculer les charges de travail de tous les membres depuis leurs tâches"""
+        nombre = self.gestionnaire_donnees.recalculer_charges_travail()
+        messagebox.showinfo("Charges de Travail", f"{nombre} charge(s) de travail corrigée(s).")
+        if isinstance(self.vue_actuelle, (TableauBord, FenetreEquipe)):
+            self.vue_actuelle.actualiser()
+    
+    def archiver_taches_terminees(self):
+        """Archiver les tâches terminées depuis un nombre de jours choisi"""
+        jours = simpledialog.askinteger(
+            "Archivage", "Archiver les tâches terminées depuis plus de combien de jours ?",
+            parent=self.racine, initialvalue=JOURS_AVANT_ARCHIVAGE, minvalue=0)
+        if jours is None:
+            return
+        nombre = self.gestionnaire_donnees.archiver_taches_terminees(jours)
+        messagebox.showinfo("Archivage", f"{nombre} tâche(s) archivée(s).")
+        if isinstance(self.vue_actuelle, (TableauBord, FenetreTache)):
+            self.vue_actuelle.actualiser()
+    
+    def importer_donnees(self, entite):
+        """Importer un fichier CSV ou JSON Lines en affichant la progression"""
+        chemin = filedialog.askopenfilename(
+            parent=self.racine, title="Importer des données",
+            filetypes=[("CSV ou JSON Lines", "*.csv *.jsonl *.ndjson *.gz"), ("Tous les fichiers", "*.*")])
+        if not chemin:
+            return
+        
+        fenetre_progression = tk.Toplevel(self.racine)
+        fenetre_progression.title("Importation")
+        fenetre_progression.transient(self.racine)
+        etiquette = ttk.Label(fenetre_progression, text="Lecture du fichier...", padding=20)
+        etiquette.pack()
+        
+        def afficher_progression(rapport):
+            etiquette.config(text=f"{rapport['lus']} ligne(s) lue(s), {rapport['importes']} importée(s), "
+                                  f"{rapport['rejetes']} rejetée(s)")
+            fenetre_progression.update()
+        
+        try:
+            rapport = ImportateurDonnees(self.gestionnaire_donnees).importer_fichier(
+                chemin, entite, rappel_progression=afficher_progression,
+                correspondance_projets=self.correspondances_import[ENTITE_PROJETS],
+                correspondance_membres=self.correspondances_import[ENTITE_MEMBRES])
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Erreur", f"Importation impossible : {e}")
+            return
+        finally:
+            fenetre_progression.destroy()
+        
+        if entite in self.correspondances_import:
+            self.correspondances_import[entite].update(rapport['correspondance'])
+        
+        message = f"{rapport['importes']} enregistrement(s) importé(s), {rapport['rejetes']} rejeté(s)."
+        if rapport['erreurs']:
+            message += "\n\n" + "\n".join(f"Ligne {ligne} : {erreur}" for ligne, erreur in rapport['erreurs'][:10])
+        messagebox.showinfo("Importation", message)
+        if self.vue_actuelle is not None:
+            self.vue_actuelle.actualiser()
+    
+    def exporter_donnees(self, entite):
+        """Exporter une entité vers un fichier JSON Lines ou CSV (compressé si l'extension est .gz)"""
+        chemin = filedialog.asksaveasfilename(
+            parent=self.racine, title="Exporter des données", defaultextension=".jsonl",
+            initialfile=f"{entite}.jsonl",
+            filetypes=[("JSON Lines", "*.jsonl"), ("CSV", "*.csv"), ("Compressé (gzip)", "*.gz")])
+        if not chemin:
+            return
+        
+        try:
+            nombre = ExportateurDonnees(self.gestionnaire_donnees).exporter(
+                chemin, entite, rappel_progression=lambda _: self.racine.update_idletasks())
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Erreur", f"Exportation impossible : {e}")
+            return
+        messagebox.showinfo("Exportation", f"{nombre} enregistrement(s) exporté(s) vers {chemin}.")
+    
+    def quitter(self):
+        """Fermer les connexions à la base de données et quitter l'application"""
+        self.gestionnaire_donnees.fermer()
+        self.racine.destroy()
+    
     def afficher_a_propos(self):
         """Afficher la boîte de dialogue à propos"""
         texte_a_propos = """Suivi des Projets v1.0
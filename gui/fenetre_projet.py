@@ -6,7 +6,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from modeles.gestionnaire_donnees import GestionnaireDonnees
 from modeles.projet import Projet
+from modeles.stockage import ConflitConcurrence
 from utilitaires.validateurs import Validateurs
+from gui.pagination import ChargeurPagine
 
 class FenetreProjet:
     def __init__(self, parent, gestionnaire_donnees: GestionnaireDonnees):
@@ -96,7 +98,12 @@ class FenetreProjet:
         # Barres de défilement
         defilement_v = ttk.Scrollbar(cadre_arbre, orient="vertical", command=self.arbre_projets.yview)
         defilement_h = ttk.Scrollbar(cadre_arbre, orient="horizontal", command=self.arbre_projets.xview)
-        self.arbre_projets.configure(yscrollcommand=defilement_v.set, xscrollcommand=defilement_h.set)
+        self.arbre_projets.configure(xscrollcommand=defilement_h.set)
+        
+        # Chargement page par page au défilement (configure aussi yscrollcommand)
+        self.filtres = {}
+        self.chargeur_projets = ChargeurPagine(self.arbre_projets, defilement_v,
+                                               self.charger_page_projets, self.afficher_projet)
         
         # Disposition en grille
         self.arbre_projets.grid(row=0, column=0, sticky="nsew")
@@ -108,44 +115,40 @@ class FenetreProjet:
     
     def actualiser(self):
         """Actualiser l'affichage des projets"""
-        self.projets = self.gestionnaire_donnees.charger_projets()
-        self.toutes_taches = self.gestionnaire_donnees.charger_taches()
         self.filtrer_projets()
     
     def filtrer_projets(self, *args):
         """Filtrer les projets selon la recherche et le statut"""
-        # Effacer les éléments existants
-        for element in self.arbre_projets.get_children():
-            self.arbre_projets.delete(element)
-        
-        texte_recherche = self.var_recherche.get().lower()
+        texte_recherche = self.var_recherche.get().strip()
         filtre_statut = self.var_statut.get()
         
-        for projet in self.projets:
-            # Appliquer les filtres
-            if texte_recherche and texte_recherche not in projet.nom.lower() and texte_recherche not in projet.description.lower():
-                continue
-            
-            if filtre_statut != "Tous" and projet.statut != filtre_statut:
-                continue
-            
-            # Compter les tâches pour ce projet
-            taches_projet = len([t for t in self.toutes_taches if t.id_projet == projet.id])
-            
-            # Formater la date de création
-            try:
-                date_creation = projet.cree_le.split("T")[0]
-            except:
-                date_creation = projet.cree_le
-            
-            self.arbre_projets.insert("", "end", values=(
-                projet.nom,
-                projet.description[:50] + "..." if len(projet.description) > 50 else projet.description,
-                projet.statut,
-                str(taches_projet),
-                date_creation,
-                projet.cree_par
-            ), tags=[projet.id])
+        # Filtres appliqués côté base de données, chargement page par page
+        self.filtres = {
+            'statut': filtre_statut if filtre_statut != "Tous" else None,
+            'texte': texte_recherche or None
+        }
+        self.chargeur_projets.recommencer()
+    
+    def charger_page_projets(self, curseur):
+        """Charger une page de projets (le nombre de tâches est lu avec chaque projet)"""
+        return self.gestionnaire_donnees.charger_page_projets(apres=curseur, **self.filtres)
+    
+    def afficher_projet(self, projet):
+        """Ajouter un projet à l'arbre"""
+        # Formater la date de création
+        try:
+            date_creation = projet.cree_le.split("T")[0]
+        except:
+            date_creation = projet.cree_le
+        
+        self.arbre_projets.insert("", "end", values=(
+            projet.nom,
+            projet.description[:50] + "..." if len(projet.description) > 50 else projet.description,
+            projet.statut,
+            str(projet.nb_taches),
+            date_creation,
+            projet.cree_par
+        ), tags=[projet.id])
     
     def obtenir_projet_selectionne(self):
         """Obtenir le projet actuellement sélectionné"""
@@ -301,7 +304,14 @@ class FenetreProjet:
                     messagebox.showinfo("Succès", "Projet créé avec succès.")
                 
                 dialogue.destroy()
-                
+            
+            except ConflitConcurrence:
+                messagebox.showwarning(
+                    "Conflit de Modification",
+                    "Ce projet a été modifié ou supprimé par un autre utilisateur depuis son ouverture.\n"
+                    "Vos modifications n'ont pas été enregistrées : actualisez la liste puis recommencez."
+                )
+                dialogue.destroy()
             except Exception as e:
                 messagebox.showerror("Erreur", f"Échec de la sauvegarde du projet : {str(e)}")
         
@@ -6,9 +6,11 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, date
 from modeles.gestionnaire_donnees import GestionnaireDonnees
+from modeles.stockage import ConflitConcurrence
 from modeles.tache import Tache
 from utilitaires.moteur_assignation import MoteurAssignation
 from utilitaires.validateurs import Validateurs
+from gui.pagination import ChargeurPagine
 
 class FenetreTache:
     def __init__(self, parent, gestionnaire_donnees: GestionnaireDonnees, filtre_projet: str = None):
@@ -128,7 +130,22 @@ class FenetreTache:
         # Barres de défilement
         defilement_v = ttk.Scrollbar(cadre_arbre, orient="vertical", command=self.arbre_taches.yview)
         defilement_h = ttk.Scrollbar(cadre_arbre, orient="horizontal", command=self.arbre_taches.xview)
-        self.arbre_taches.configure(yscrollcommand=defilement_v.set, xscrollcommand=defilement_h.set)
+        self.arbre_taches.configure(xscrollcommand=defilement_h.set)
+        
+        # Chargement page par page au défilement (configure aussi yscrollcommand)
+        self.filtres = {}
+        self.chargeur_taches = ChargeurPagine(
+            self.arbre_taches, defilement_v,
+            lambda curseur: self.gestionnaire_donnees.charger_page_taches(apres=curseur, **self.filtres),
+            self.afficher_tache
+        )
+        
+        # Configurer les balises pour les couleurs
+        self.arbre_taches.tag_configure("haute_priorite", background="#ffebee")
+        self.arbre_taches.tag_configure("priorite_moyenne", background="#fff3e0")
+        self.arbre_taches.tag_configure("basse_priorite", background="#e8f5e8")
+        self.arbre_taches.tag_configure("termine", background="#e0e0e0")
+        self.arbre_taches.tag_configure("en_retard", background="#ffcdd2")
         
         # Disposition en grille
         self.arbre_taches.grid(row=0, column=0, sticky="nsew")
@@ -140,7 +157,6 @@ class FenetreTache:
     
     def actualiser(self):
         """Actualiser l'affichage des tâches"""
-        self.taches = self.gestionnaire_donnees.charger_taches()
         self.projets = {p.id: p for p in self.gestionnaire_donnees.charger_projets()}
         self.membres_equipe = {m.id: m for m in self.gestionnaire_donnees.charger_membres_equipe()}
         
@@ -153,11 +169,7 @@ class FenetreTache:
     
     def filtrer_taches(self, *args):
         """Filtrer les tâches selon la recherche et les filtres"""
-        # Effacer les éléments existants
-        for element in self.arbre_taches.get_children():
-            self.arbre_taches.delete(element)
-        
-        texte_recherche = self.var_recherche.get().lower()
+        texte_recherche = self.var_recherche.get().strip()
         filtre_statut = self.var_statut.get()
         filtre_priorite = self.var_priorite.get()
         
@@ -172,74 +184,65 @@ class FenetreTache:
                     filtre_projet = pid
                     break
         
-        for tache in self.taches:
-            # Appliquer les filtres
-            if texte_recherche and texte_recherche not in tache.titre.lower() and texte_recherche not in tache.description.lower():
-                continue
-            
-            if filtre_statut != "Tous" and tache.statut != filtre_statut:
-                continue
-            
-            if filtre_priorite != "Tous" and tache.priorite != filtre_priorite:
-                continue
-            
-            if filtre_projet and tache.id_projet != filtre_projet:
-                continue
-            
-            # Obtenir les données d'affichage
-            nom_projet = self.projets.get(tache.id_projet, type('obj', (object,), {'nom': 'Aucun Projet'})).nom
-            nom_assigne = self.membres_equipe.get(tache.assigne_a, type('obj', (object,), {'nom': 'Non assigné'})).nom
-            
-            # Formater la date de création
+        # Appliquer les filtres côté base de données : seules les lignes correspondantes sont lues,
+        # une page à la fois au fil du défilement
+        self.filtres = {
+            'statut': filtre_statut if filtre_statut != "Tous" else None,
+            'priorite': filtre_priorite if filtre_priorite != "Tous" else None,
+            'id_projet': filtre_projet,
+            'texte': texte_recherche or None
+        }
+        self.chargeur_taches.recommencer()
+    
+    def afficher_tache(self, tache: Tache):
+        """Ajouter une tâche à l'arbre"""
+        # Obtenir les données d'affichage
+        nom_projet = self.projets.get(tache.id_projet, type('obj', (object,), {'nom': 'Aucun Projet'})).nom
+        nom_assigne = self.membres_equipe.get(tache.assigne_a, type('obj', (object,), {'nom': 'Non assigné'})).nom
+        
+        # Formater la date de création
+        try:
+            date_creation = tache.cree_le.split("T")[0]
+        except:
+            date_creation = tache.cree_le
+        
+        # Préparer les valeurs
+        valeurs = [
+            tache.titre,
+            nom_projet,
+            tache.priorite,
+            tache.statut,
+            nom_assigne,
+            tache.echeance or "Pas d'échéance",
+            date_creation
+        ]
+        
+        # Supprimer la colonne projet si filtré
+        if self.filtre_projet:
+            valeurs.pop(1)
+        
+        # Déterminer les balises pour les couleurs
+        balises = []
+        if tache.priorite == Tache.PRIORITE_HAUTE:
+            balises.append("haute_priorite")
+        elif tache.priorite == Tache.PRIORITE_MOYENNE:
+            balises.append("priorite_moyenne")
+        else:
+            balises.append("basse_priorite")
+        
+        if tache.statut == Tache.STATUT_TERMINE:
+            balises.append("termine")
+        
+        # Vérifier si en retard
+        if tache.echeance and tache.statut != Tache.STATUT_TERMINE:
             try:
-                date_creation = tache.cree_le.split("T")[0]
-            except:
-                date_creation = tache.cree_le
-            
-            # Préparer les valeurs
-            valeurs = [
-                tache.titre,
-                nom_projet,
-                tache.priorite,
-                tache.statut,
-                nom_assigne,
-                tache.echeance or "Pas d'échéance",
-                date_creation
-            ]
-            
-            # Supprimer la colonne projet si filtré
-            if self.filtre_projet:
-                valeurs.pop(1)
-            
-            # Déterminer les balises pour les couleurs
-            balises = []
-            if tache.priorite == Tache.PRIORITE_HAUTE:
-                balises.append("haute_priorite")
-            elif tache.priorite == Tache.PRIORITE_MOYENNE:
-                balises.append("priorite_moyenne")
-            else:
-                balises.append("basse_priorite")
-            
-            if tache.statut == Tache.STATUT_TERMINE:
-                balises.append("termine")
-            
-            # Vérifier si en retard
-            if tache.echeance and tache.statut != Tache.STATUT_TERMINE:
-                try:
-                    date_echeance = datetime.strptime(tache.echeance, "%Y-%m-%d").date()
-                    if date_echeance < date.today():
-                        balises.append("en_retard")
-                except ValueError:
-                    pass
-            
-            self.arbre_taches.insert("", "end", values=valeurs, tags=[tache.id] + balises)
+                date_echeance = datetime.strptime(tache.echeance, "%Y-%m-%d").date()
+                if date_echeance < date.today():
+                    balises.append("en_retard")
+            except ValueError:
+                pass
         
-        # Configurer les balises pour les couleurs
-        self.arbre_taches.tag_configure("haute_priorite", background="#ffebee")
-        self.arbre_taches.tag_configure("priorite_moyenne", background="#fff3e0")
-        self.arbre_taches.tag_configure("basse_priorite", background="#e8f5e8")
-        self.arbre_taches.tag_configure("termine", background="#e0e0e0")
-        self.arbre_taches.tag_configure("en_retard", background="#ffcdd2")
+        self.arbre_taches.insert("", "end", values=valeurs, tags=[tache.id] + balises)
     
     def obtenir_tache_selectionnee(self):
         """Obtenir la tâche actuellement sélectionnée"""
@@ -311,22 +314,11 @@ class FenetreTache:
             messagebox.showwarning("Aucune Assignation", "Aucun membre d'équipe approprié trouvé pour cette tâche.")
             return
         
-        # Assigner la tâche
-        ancien_assigne_a = tache.assigne_a
-        ancien_membre = self.gestionnaire_donnees.obtenir_membre_equipe(ancien_assigne_a) if ancien_assigne_a else None
-        
-        # Mettre à jour l'ancien assignataire
-        if ancien_membre:
-            ancien_membre.desassigner_tache(tache.id, tache.heures_estimees)
-            self.gestionnaire_donnees.mettre_a_jour_membre_equipe(ancien_membre)
-        
-        # Assigner au nouveau membre
+        # Assigner la tâche (les charges de travail de l'ancien et du nouvel
+        # assignataire sont mises à jour par les déclencheurs de la base)
         tache.assigner_a(meilleur_membre.id)
-        meilleur_membre.assigner_tache(tache.id, tache.heures_estimees)
-        
-        # Sauvegarder les changements
-        self.gestionnaire_donnees.mettre_a_jour_tache(tache)
-        self.gestionnaire_donnees.mettre_a_jour_membre_equipe(meilleur_membre)
+        if not self.sauvegarder_tache(tache):
+            return
         
         messagebox.showinfo(
             "Tâche Assignée",
@@ -344,22 +336,31 @@ class FenetreTache:
             messagebox.showinfo("Déjà Terminé", "La tâche est déjà marquée comme terminée.")
             return
         
-        # Marquer comme terminée
+        # Marquer comme terminée (la charge de l'assignataire est libérée par la base)
         tache.marquer_termine()
-        
-        # Mettre à jour la charge de travail de l'assignataire
-        if tache.assigne_a:
-            membre = self.gestionnaire_donnees.obtenir_membre_equipe(tache.assigne_a)
-            if membre:
-                membre.desassigner_tache(tache.id, tache.heures_estimees)
-                self.gestionnaire_donnees.mettre_a_jour_membre_equipe(membre)
-        
-        # Sauvegarder les changements
-        self.gestionnaire_donnees.mettre_a_jour_tache(tache)
+        if not self.sauvegarder_tache(tache):
+            return
         
         messagebox.showinfo("Succès", "Tâche marquée comme terminée.")
         self.actualiser()
     
+    def sauvegarder_tache(self, tache: Tache) -> bool:
+        """
+        Enregistrer une tâche modifiée dans la liste. Si un autre utilisateur l'a modifiée
+        entre-temps, prévenir et recharger la liste ; retourne False si rien n'a été enregistré.
+        """
+        try:
+            self.gestionnaire_donnees.mettre_a_jour_tache(tache)
+            return True
+        except ConflitConcurrence:
+            messagebox.showwarning(
+                "Conflit de Modification",
+                f"La tâche '{tache.titre}' a été modifiée ou supprimée par un autre utilisateur.\n"
+                "La liste a été rechargée : recommencez la modification si nécessaire."
+            )
+            self.actualiser()
+            return False
+    
     @staticmethod
     def afficher_dialogue_tache(parent, gestionnaire_donnees: GestionnaireDonnees, tache: Tache = None, filtre_projet: str = None):
         """Afficher la boîte de dialogue de création/modification de tâche"""
@@ -557,7 +558,14 @@ class FenetreTache:
                     messagebox.showinfo("Succès", "Tâche créée avec succès.")
                 
                 dialogue.destroy()
-                
+            
+            except ConflitConcurrence:
+                messagebox.showwarning(
+                    "Conflit de Modification",
+                    "Cette tâche a été modifiée ou supprimée par un autre utilisateur depuis son ouverture.\n"
+                    "Vos modifications n'ont pas été enregistrées : actualisez la liste puis recommencez."
+                )
+                dialogue.destroy()
             except Exception as e:
                 messagebox.showerror("Erreur", f"Échec de la sauvegarde de la tâche : {str(e)}")
         
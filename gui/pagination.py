@@ -0,0 +1,52 @@
+"""
+Chargement progressif des Treeview : une page supplémentaire est chargée
+quand la barre de défilement approche du bas de la liste
+"""
+
+# Fraction visible à partir de laquelle la page suivante est demandée
+SEUIL_CHARGEMENT = 0.9
+
+class ChargeurPagine:
+    def __init__(self, arbre, defilement_v, charger_page, afficher_element):
+        """
+        charger_page(curseur) doit retourner (elements, curseur_suivant) ;
+        afficher_element(element) insère un élément dans l'arbre.
+        """
+        self.arbre = arbre
+        self.defilement_v = defilement_v
+        self.charger_page = charger_page
+        self.afficher_element = afficher_element
+        self.curseur = None
+        self.termine = False
+        self.en_cours = False
+        
+        self.arbre.configure(yscrollcommand=self.sur_defilement)
+    
+    def recommencer(self):
+        """Vider l'arbre et recharger depuis la première page"""
+        for element in self.arbre.get_children():
+            self.arbre.delete(element)
+        self.curseur = None
+        self.termine = False
+        self.charger_suite()
+    
+    def charger_suite(self):
+        """Charger et afficher la page suivante, s'il y en a une"""
+        if self.termine or self.en_cours or not self.arbre.winfo_exists():
+            return
+        
+        self.en_cours = True
+        try:
+            elements, self.curseur = self.charger_page(self.curseur)
+            for element in elements:
+                self.afficher_element(element)
+            self.termine = self.curseur is None
+        finally:
+            self.en_cours = False
+    
+    def sur_defilement(self, premier, dernier):
+        """Mettre à jour la barre de défilement et charger la suite près du bas"""
+        self.defilement_v.set(premier, dernier)
+        if float(dernier) >= SEUIL_CHARGEMENT and not self.termine:
+            # Différer : ne pas insérer de lignes pendant le rappel de défilement
+            self.arbre.after_idle(self.charger_suite)
@@ -8,14 +8,24 @@ from datetime import datetime, date
 from modeles.gestionnaire_donnees import GestionnaireDonnees
 from modeles.tache import Tache
 from modeles.projet import Projet
+from gui.pagination import ChargeurPagine
+
+# Intervalle de vérification des modifications (en millisecondes)
+INTERVALLE_VERIFICATION = 2000
+
+# Nombre maximal de tâches haute priorité affichées (les échéances les plus proches)
+LIMITE_TACHES_PRIORITAIRES = 50
 
 class TableauBord:
     def __init__(self, parent, gestionnaire_donnees: GestionnaireDonnees):
         self.parent = parent
         self.gestionnaire_donnees = gestionnaire_donnees
+        self.version_affichee = None  # (version des données, date) du dernier affichage
         
         self.creer_widgets()
         self.actualiser()
+        # Programmé sur le parent : il survit à cette vue, dont la disparition arrête la boucle
+        self.parent.after(INTERVALLE_VERIFICATION, self.verifier_modifications)
     
     def creer_widgets(self):
         """Créer les widgets du tableau de bord"""
@@ -151,7 +161,14 @@ class TableauBord:
         # Barres de défilement
         defilement_v = ttk.Scrollbar(cadre_onglet, orient="vertical", command=self.arbre_projets.yview)
         defilement_h = ttk.Scrollbar(cadre_onglet, orient="horizontal", command=self.arbre_projets.xview)
-        self.arbre_projets.configure(yscrollcommand=defilement_v.set, xscrollcommand=defilement_h.set)
+        self.arbre_projets.configure(xscrollcommand=defilement_h.set)
+        
+        # Chargement page par page au défilement (configure aussi yscrollcommand)
+        self.chargeur_projets = ChargeurPagine(
+            self.arbre_projets, defilement_v,
+            lambda curseur: self.gestionnaire_donnees.charger_page_projets(apres=curseur),
+            self.afficher_apercu_projet
+        )
         
         # Disposition en grille
         self.arbre_projets.grid(row=0, column=0, sticky="nsew")
@@ -162,49 +179,39 @@ class TableauBord:
         cadre_onglet.grid_columnconfigure(0, weight=1)
     
     def actualiser(self):
-        """Actualiser les données du tableau de bord"""
+        """Actualiser les données du tableau de bord, seulement si elles ont changé"""
+        # La date fait partie de la clé : les tâches en retard changent à minuit sans écriture
+        version = (self.gestionnaire_donnees.version_donnees(), date.today())
+        if version == self.version_affichee:
+            return
+        self.version_affichee = version
+        
         self.mettre_a_jour_statistiques()
         self.mettre_a_jour_taches_recentes()
         self.mettre_a_jour_taches_prioritaires()
         self.mettre_a_jour_apercu_projets()
     
+    def verifier_modifications(self):
+        """Actualiser périodiquement (modifications faites par un autre processus)"""
+        if not self.cadre_principal.winfo_exists():
+            return
+        self.actualiser()
+        self.parent.after(INTERVALLE_VERIFICATION, self.verifier_modifications)
+    
     def mettre_a_jour_statistiques(self):
         """Mettre à jour l'affichage des statistiques"""
-        projets = self.gestionnaire_donnees.charger_projets()
-        taches = self.gestionnaire_donnees.charger_taches()
-        membres_equipe = self.gestionnaire_donnees.charger_membres_equipe()
-        
-        # Calculer les statistiques
-        total_projets = len(projets)
-        projets_actifs = len([p for p in projets if p.statut == "Actif"])
-        total_taches = len(taches)
-        taches_terminees = len([t for t in taches if t.statut == Tache.STATUT_TERMINE])
-        taches_haute_priorite = len([t for t in taches if t.priorite == Tache.PRIORITE_HAUTE])
-        
-        # Calculer les tâches en retard
-        aujourd_hui = date.today()
-        taches_retard = 0
-        for tache in taches:
-            if tache.echeance and tache.statut != Tache.STATUT_TERMINE:
-                try:
-                    date_echeance = datetime.strptime(tache.echeance, "%Y-%m-%d").date()
-                    if date_echeance < aujourd_hui:
-                        taches_retard += 1
-                except ValueError:
-                    pass
-        
-        total_membres = len(membres_equipe)
-        membres_disponibles = len([m for m in membres_equipe if m.obtenir_score_disponibilite() > 0.5])
+        # Compteurs agrégés en SQL : le coût ne dépend pas du nombre d'objets à charger
+        stats = self.gestionnaire_donnees.obtenir_statistiques()
         
         # Mettre à jour les étiquettes
-        self.etiquettes_stats["total_projets"].config(text=str(total_projets))
-        self.etiquettes_stats["projets_actifs"].config(text=str(projets_actifs))
-        self.etiquettes_stats["total_taches"].config(text=str(total_taches))
-        self.etiquettes_stats["taches_terminees"].config(text=str(taches_terminees))
-        self.etiquettes_stats["taches_haute_priorite"].config(text=str(taches_haute_priorite))
-        self.etiquettes_stats["taches_retard"].config(text=str(taches_retard))
-        self.etiquettes_stats["membres_equipe"].config(text=str(total_membres))
-        self.etiquettes_stats["membres_disponibles"].config(text=str(membres_disponibles))
+        self.etiquettes_stats["total_projets"].config(text=str(stats['total_projets']))
+        self.etiquettes_stats["projets_actifs"].config(text=str(stats['projets_actifs']))
+        self.etiquettes_stats["total_taches"].config(text=str(stats['total_taches']))
+        self.etiquettes_stats["taches_terminees"].config(text=str(stats['taches_terminees']))
+        self.etiquettes_stats["taches_haute_priorite"].config(text=str(stats['taches_haute_priorite']))
+        self.etiquettes_stats["taches_retard"].config(text=str(stats['taches_en_retard']))
+        self.etiquettes_stats["membres_equipe"].config(text=str(stats['total_membres']))
+        self.etiquettes_stats["membres_disponibles"].config(text=str(stats['membres_disponibles']))
     
     def mettre_a_jour_taches_recentes(self):
         """Mettre à jour l'affichage des tâches récentes"""
@@ -212,17 +219,14 @@ class TableauBord:
         for element in self.arbre_taches_recentes.get_children():
             self.arbre_taches_recentes.delete(element)
         
-        taches = self.gestionnaire_donnees.charger_taches()
-        projets = {p.id: p for p in self.gestionnaire_donnees.charger_projets()}
-        membres_equipe = {m.id: m for m in self.gestionnaire_donnees.charger_membres_equipe()}
-        
-        # Trier les tâches par date de création (plus récentes en premier)
-        taches.sort(key=lambda t: t.cree_le, reverse=True)
+        # Charger seulement la première page des 20 tâches les plus récentes
+        taches, _ = self.gestionnaire_donnees.charger_page_taches(taille=20)
+        noms_projets, noms_membres = self.noms_references(taches)
         
         # Afficher les 20 dernières tâches
-        for tache in taches[:20]:
-            nom_projet = projets.get(tache.id_projet, type('obj', (object,), {'nom': 'Aucun Projet'})).nom if tache.id_projet else "Aucun Projet"
-            nom_assigne = membres_equipe.get(tache.assigne_a, type('obj', (object,), {'nom': 'Non assigné'})).nom if tache.assigne_a else "Non assigné"
+        for tache in taches:
+            nom_projet = noms_projets.get(tache.id_projet, "Aucun Projet")
+            nom_assigne = noms_membres.get(tache.assigne_a, "Non assigné")
             
             # Codage couleur par priorité
             balises = []
@@ -253,17 +257,14 @@ class TableauBord:
         for element in self.arbre_taches_prioritaires.get_children():
             self.arbre_taches_prioritaires.delete(element)
         
-        taches = self.gestionnaire_donnees.charger_taches()
-        projets = {p.id: p for p in self.gestionnaire_donnees.charger_projets()}
-        membres_equipe = {m.id: m for m in self.gestionnaire_donnees.charger_membres_equipe()}
-        
-        # Filtrer les tâches haute priorité
-        taches_haute_priorite = [t for t in taches if t.priorite == Tache.PRIORITE_HAUTE]
-        taches_haute_priorite.sort(key=lambda t: t.echeance or "9999-12-31")
+        # Filtre, tri par échéance et limite appliqués côté SQL
+        taches_haute_priorite = self.gestionnaire_donnees.rechercher_taches(
+            priorite=Tache.PRIORITE_HAUTE, tri='echeance', limite=LIMITE_TACHES_PRIORITAIRES)
+        noms_projets, noms_membres = self.noms_references(taches_haute_priorite)
         
         for tache in taches_haute_priorite:
-            nom_projet = projets.get(tache.id_projet, type('obj', (object,), {'nom': 'Aucun Projet'})).nom if tache.id_projet else "Aucun Projet"
-            nom_assigne = membres_equipe.get(tache.assigne_a, type('obj', (object,), {'nom': 'Non assigné'})).nom if tache.assigne_a else "Non assigné"
+            nom_projet = noms_projets.get(tache.id_projet, "Aucun Projet")
+            nom_assigne = noms_membres.get(tache.assigne_a, "Non assigné")
             
             # Vérifier si en retard
             balises = []
@@ -287,27 +288,24 @@ class TableauBord:
         self.arbre_taches_prioritaires.tag_configure("en_retard", background="#ffcdd2")
     
     def mettre_a_jour_apercu_projets(self):
-        """Mettre à jour l'affichage de l'aperçu des projets"""
-        # Effacer les éléments existants
-        for element in self.arbre_projets.get_children():
-            self.arbre_projets.delete(element)
-        
-        projets = self.gestionnaire_donnees.charger_projets()
-        toutes_taches = self.gestionnaire_donnees.charger_taches()
-        
-        for projet in projets:
-            taches_projet = [t for t in toutes_taches if t.id_projet == projet.id]
-            total_taches = len(taches_projet)
-            taches_terminees = len([t for t in taches_projet if t.statut == Tache.STATUT_TERMINE])
-            
-            progres = 0
-            if total_taches > 0:
-                progres = int((taches_terminees / total_taches) * 100)
-            
-            self.arbre_projets.insert("", "end", values=(
-                projet.nom,
-                projet.statut,
-                str(total_taches),
-                str(taches_terminees),
-                f"{progres}%"
-            ))
+        """Mettre à jour l'affichage de l'aperçu des projets (première page, la suite au défilement)"""
+        self.chargeur_projets.recommencer()
+    
+    def afficher_apercu_projet(self, projet):
+        """Ajouter un projet à l'aperçu"""
+        # Les compteurs de tâches sont stockés sur chaque projet : aucune tâche n'est chargée
+        self.arbre_projets.insert("", "end", values=(
+            projet.nom,
+            projet.statut,
+            str(projet.nb_taches),
+            str(projet.nb_terminees),
+            f"{projet.obtenir_progres()}%"
+        ))
+    
+    def noms_references(self, taches):
+        """Noms des projets et des assignataires des tâches affichées, lus par ID"""
+        noms_projets = self.gestionnaire_donnees.noms_projets(
+            list({tache.id_projet for tache in taches if tache.id_projet}))
+        noms_membres = self.gestionnaire_donnees.noms_membres(
+            list({tache.assigne_a for tache in taches if tache.assigne_a}))
+        return noms_projets, noms_membres
@@ -4,27 +4,179 @@ Gestionnaire de base de données SQLite pour l'application de suivi des projets
 
 import sqlite3
 import os
+import random
+import threading
+import itertools
+import time
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
+from modeles.migrations import appliquer_migrations
+
+# Numérotation des bases en mémoire des instantanés (un nom unique par instantané)
+_numeros_instantanes = itertools.count(1)
+
+def _est_verrouillee(erreur: sqlite3.OperationalError) -> bool:
+    """Indiquer si l'erreur signale une base occupée par un autre écrivain (SQLITE_BUSY/SQLITE_LOCKED)"""
+    return 'locked' in str(erreur) or 'busy' in str(erreur)
 
 class BaseDonnees:
-    def __init__(self, chemin_db='donnees/suivi_projets.db'):
-        """Initialiser la connexion à la base de données"""
+    # Base verrouillée par un autre écrivain malgré busy_timeout : nouvelles tentatives, après
+    # une attente exponentielle à valeur aléatoire (les écrivains en concurrence ne se
+    # représentent pas tous au même moment) ; l'erreur n'est levée qu'après la dernière
+    TENTATIVES_VERROU = 6
+    ATTENTE_INITIALE_VERROU = 0.05  # En secondes, doublée à chaque tentative
+    ATTENTE_MAX_VERROU = 1.0
+    
+    # Profils de performance
+    PROFIL_SUR = "sur"
+    PROFIL_RAPIDE = "rapide"
+    PROFIL_MEMOIRE = "memoire"
+    
+    # PRAGMA appliqués à chaque nouvelle connexion, dans l'ordre
+    PROFILS = {
+        # WAL (les lecteurs ne sont plus bloqués par l'écrivain) mais fsync à chaque commit
+        PROFIL_SUR: {
+            'journal_mode': 'WAL',
+            'synchronous': 'FULL',
+            'cache_size': -8000,  # En Kio (valeur négative) : 8 Mo
+            'mmap_size': 0,
+            'temp_store': 'DEFAULT',
+            'busy_timeout': 5000,  # En millisecondes
+        },
+        # fsync seulement aux checkpoints WAL : un commit peut être perdu en cas de coupure
+        # de courant, mais la base reste cohérente
+        PROFIL_RAPIDE: {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -64000,
+            'mmap_size': 268435456,  # 256 Mo
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,
+        },
+        # Base en mémoire (instantanés) : pas de fichier, donc ni WAL ni fsync
+        PROFIL_MEMOIRE: {
+            'journal_mode': 'MEMORY',
+            'synchronous': 'OFF',
+            'cache_size': -64000,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,
+        },
+    }
+    
+    def __init__(self, chemin_db='donnees/suivi_projets.db', profil=PROFIL_SUR,
+                 source=None, lecture_seule=False):
+        """
+        Initialiser la connexion à la base de données.
+        Le profil est le nom d'un preset de PROFILS ou un dictionnaire {pragma: valeur}.
+        chemin_db peut aussi être ':memory:' ou une URI SQLite ('file:...').
+        source : autre BaseDonnees dont le contenu est copié ici avant l'initialisation.
+        lecture_seule : refuser toute écriture (PRAGMA query_only) après l'initialisation.
+        """
         self.chemin_db = chemin_db
+        self.pragmas = self.PROFILS[profil] if isinstance(profil, str) else dict(profil)
+        self.lecture_seule = False
+        
+        # Une connexion persistante par thread, réutilisée par toutes les requêtes.
+        # Le registre {thread: connexion} ne retient pas les threads : les connexions des
+        # threads terminés sont fermées à l'ouverture suivante, ou par fermer_connexion_thread().
+        # La première connexion reste ouverte jusqu'à fermer() : c'est elle qui garde en vie
+        # une base en mémoire partagée (instantané) créée par un thread de travail.
+        self._local = threading.local()
+        self._connexions = weakref.WeakKeyDictionary()
+        self._connexion_initiale = None
+        self._verrou = threading.Lock()
         
-        # Créer le répertoire s'il n'existe pas
-        os.makedirs(os.path.dirname(chemin_db), exist_ok=True)
+        # Créer le répertoire s'il n'existe pas (base sur fichier uniquement)
+        if chemin_db != ':memory:' and not chemin_db.startswith('file:'):
+            repertoire = os.path.dirname(chemin_db)
+            if repertoire:
+                os.makedirs(repertoire, exist_ok=True)
+        
+        # Copier la base source page par page (API de sauvegarde SQLite)
+        if source is not None:
+            source.obtenir_connexion().backup(self.obtenir_connexion())
         
         # Initialiser la base de données
         self.initialiser_db()
+        
+        if lecture_seule:
+            self.obtenir_connexion().execute('PRAGMA query_only = ON')
+            self.lecture_seule = True
     
     def obtenir_connexion(self):
-        """Obtenir une connexion à la base de données"""
-        conn = sqlite3.connect(self.chemin_db)
+        """Obtenir la connexion du thread courant (ouverte au premier appel)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._ouvrir_connexion()
+            self._local.conn = conn
+            with self._verrou:
+                self._connexions[threading.current_thread()] = conn
+                if self._connexion_initiale is None:
+                    self._connexion_initiale = conn
+                terminees = [(thread, connexion) for thread, connexion in self._connexions.items()
+                             if not thread.is_alive() and connexion is not self._connexion_initiale]
+                for thread, _ in terminees:
+                    del self._connexions[thread]
+            # Le thread propriétaire est terminé : plus aucun accès concurrent à ces connexions
+            for _, connexion in terminees:
+                connexion.close()
+        return conn
+    
+    def fermer_connexion_thread(self):
+        """
+        Fermer la connexion du thread courant (à appeler à la fin d'un thread de travail) ;
+        un appel ultérieur depuis ce thread en rouvre une
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._verrou:
+            self._connexions.pop(threading.current_thread(), None)
+            if conn is self._connexion_initiale:
+                return  # Gardée jusqu'à fermer()
+        conn.close()
+    
+    def _ouvrir_connexion(self):
+        """Ouvrir une nouvelle connexion SQLite"""
+        # check_same_thread=False uniquement pour permettre la fermeture depuis fermer() ;
+        # chaque connexion n'est utilisée que par le thread qui l'a ouverte
+        conn = sqlite3.connect(self.chemin_db, check_same_thread=False,
+                               uri=self.chemin_db.startswith('file:'))
         conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        for pragma, valeur in self.pragmas.items():
+            # Le passage en WAL demande un verrou exclusif : il peut échouer si un autre processus écrit
+            self._reessayer_si_verrouillee(conn.execute, f'PRAGMA {pragma} = {valeur}')
+        if self.lecture_seule:
+            conn.execute('PRAGMA query_only = ON')
         return conn
     
+    def creer_instantane(self, lecture_seule=True):
+        """
+        Copier la base dans une base SQLite en mémoire et retourner une BaseDonnees dessus.
+        La copie est faite par l'API de sauvegarde, sous une seule transaction de lecture :
+        l'instantané est cohérent et les écrivains de la base sur disque ne sont pas bloqués.
+        Le cache partagé (cache=shared) permet à tous les threads d'y accéder ; la base en
+        mémoire disparaît à l'appel de fermer().
+        """
+        uri = f'file:instantane_{next(_numeros_instantanes)}?mode=memory&cache=shared'
+        return BaseDonnees(uri, self.PROFIL_MEMOIRE, source=self, lecture_seule=lecture_seule)
+    
+    def fermer(self):
+        """Fermer toutes les connexions ouvertes (à appeler à l'arrêt de l'application)"""
+        with self._verrou:
+            connexions = set(self._connexions.values())
+            if self._connexion_initiale is not None:
+                connexions.add(self._connexion_initiale)
+            self._connexions = weakref.WeakKeyDictionary()
+            self._connexion_initiale = None
+            self._local = threading.local()
+        for conn in connexions:
+            conn.close()
+    
     def initialiser_db(self):
-        """Créer les tables si elles n'existent pas"""
+        """Créer les tables si elles n'existent pas, puis appliquer les migrations"""
         with self.obtenir_connexion() as conn:
             curseur = conn.cursor()
             
@@ -57,7 +209,8 @@ class BaseDonnees:
                 )
             ''')
             
-            # Table des compétences des membres
+            # Table des compétences des membres (schéma initial : la migration 5 la remplace
+            # par des références au dictionnaire des compétences)
             curseur.execute('''
                 CREATE TABLE IF NOT EXISTS competences_membres (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -86,7 +239,7 @@ class BaseDonnees:
                 )
             ''')
             
-            # Table des compétences requises pour les tâches
+            # Table des compétences requises pour les tâches (schéma initial, voir migration 5)
             curseur.execute('''
                 CREATE TABLE IF NOT EXISTS competences_taches (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -109,28 +262,115 @@ class BaseDonnees:
             ''')
             
             conn.commit()
+        
+        # Mettre à niveau le schéma (index, nouvelles colonnes...) selon PRAGMA user_version
+        appliquer_migrations(self.obtenir_connexion())
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Regrouper toutes les écritures du bloc dans une seule transaction : un seul commit
+        à la sortie, annulation complète si une exception est levée.
+        Un bloc imbriqué rejoint la transaction englobante du même thread.
+        """
+        conn = self.obtenir_connexion()
+        if getattr(self._local, 'en_transaction', False):
+            yield conn
+            return
+        
+        # IMMEDIATE : prendre le verrou d'écriture dès le début plutôt qu'au premier INSERT ;
+        # c'est là qu'un autre écrivain fait attendre, avant toute écriture du bloc
+        if not conn.in_transaction:
+            self._reessayer_si_verrouillee(conn.execute, 'BEGIN IMMEDIATE')
+        self._local.en_transaction = True
+        try:
+            yield conn
+            self._reessayer_si_verrouillee(conn.commit)
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.en_transaction = False
+    
+    def _reessayer_si_verrouillee(self, operation, *args):
+        """
+        Exécuter operation(*args) ; si la base reste verrouillée au-delà de busy_timeout,
+        réessayer jusqu'à TENTATIVES_VERROU fois avec une attente exponentielle
+        """
+        for tentative in range(self.TENTATIVES_VERROU):
+            try:
+                return operation(*args)
+            except sqlite3.OperationalError as e:
+                if not _est_verrouillee(e) or tentative == self.TENTATIVES_VERROU - 1:
+                    raise
+            attente = min(self.ATTENTE_MAX_VERROU, self.ATTENTE_INITIALE_VERROU * 2 ** tentative)
+            time.sleep(random.uniform(attente / 2, attente))
     
     def executer_requete(self, requete, parametres=None):
         """Exécuter une requête et retourner les résultats"""
-        with self.obtenir_connexion() as conn:
-            curseur = conn.cursor()
+        curseur = self.obtenir_connexion().cursor()
+        if parametres:
+            curseur.execute(requete, parametres)
+        else:
+            curseur.execute(requete)
+        return curseur.fetchall()
+    
+    def iterer_requete(self, requete, parametres=None, taille_lot=1000):
+        """
+        Exécuter une requête et produire les résultats par lots de taille_lot lignes
+        (fetchmany), sans jamais charger tout le résultat en mémoire
+        """
+        curseur = self.obtenir_connexion().cursor()
+        try:
             if parametres:
                 curseur.execute(requete, parametres)
             else:
                 curseur.execute(requete)
-            return curseur.fetchall()
+            while True:
+                lignes = curseur.fetchmany(taille_lot)
+                if not lignes:
+                    break
+                yield lignes
+        finally:
+            curseur.close()
     
     def executer_modification(self, requete, parametres=None):
-        """Exécuter une requête de modification (INSERT, UPDATE, DELETE)"""
-        with self.obtenir_connexion() as conn:
+        """
+        Exécuter une requête de modification (INSERT, UPDATE, DELETE).
+        Validée immédiatement, sauf à l'intérieur d'un bloc transaction().
+        """
+        with self.transaction() as conn:
             curseur = conn.cursor()
             if parametres:
                 curseur.execute(requete, parametres)
             else:
                 curseur.execute(requete)
-            conn.commit()
             return curseur.lastrowid
     
+    def ids_generes(self, conn, table, nombre):
+        """
+        Retourner, dans l'ordre, les IDs attribués par les `nombre` dernières insertions
+        dans une table AUTOINCREMENT. À appeler dans la transaction d'insertion : tant que
+        le verrou d'écriture est tenu, les IDs attribués par executemany sont consécutifs.
+        """
+        dernier = conn.execute('SELECT seq FROM sqlite_sequence WHERE name=?', (table,)).fetchone()[0]
+        return list(range(dernier - nombre + 1, dernier + 1))
+    
+    def versions_tables(self):
+        """
+        Retourner les compteurs de modifications {table: version} tenus par des déclencheurs.
+        PRAGMA data_version change quand une autre connexion (ou un autre processus) valide
+        une écriture, total_changes quand cette connexion écrit : tant que les deux sont
+        identiques, la dernière lecture est réutilisée sans lire la table des compteurs.
+        """
+        conn = self.obtenir_connexion()
+        marque = (conn.execute('PRAGMA data_version').fetchone()[0], conn.total_changes)
+        cache = getattr(self._local, 'versions', None)
+        if cache is None or cache[0] != marque:
+            versions = dict(conn.execute('SELECT nom_table, version FROM versions_donnees').fetchall())
+            cache = self._local.versions = (marque, versions)
+        return dict(cache[1])
+    
     def maintenant(self):
         """Retourner la date/heure actuelle en format ISO"""
         return datetime.now().isoformat()
@@ -0,0 +1,160 @@
+"""
+Instantané en colonnes de la table des tâches
+Une colonne par champ utile aux calculs (IDs, codes de priorité et de statut, heures,
+échéance en numéro de jour) : les statistiques, la détection des retards et les sommes
+de charge se font sur des tableaux, sans construire d'objets Tache
+"""
+
+import array
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence
+from modeles.tache import Tache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est facultatif : les colonnes restent alors des array.array
+    np = None
+
+# Codes de priorité et de statut : position dans ces tuples (CODE_INCONNU sinon)
+PRIORITES = (Tache.PRIORITE_HAUTE, Tache.PRIORITE_MOYENNE, Tache.PRIORITE_BASSE)
+STATUTS = (Tache.STATUT_A_FAIRE, Tache.STATUT_EN_COURS, Tache.STATUT_TERMINE)
+CODE_INCONNU = -1
+CODE_TERMINE = STATUTS.index(Tache.STATUT_TERMINE)
+
+# Valeur des colonnes id_projet, assigne_a et echeance quand le champ est vide
+# (les IDs SQLite et les numéros de jour date.toordinal() commencent à 1)
+AUCUN = 0
+
+# Colonnes dans l'ordre des lignes attendues par ajouter_lignes, avec leur type array
+COLONNES = (
+    ('id', 'q'),
+    ('id_projet', 'q'),
+    ('assigne_a', 'q'),
+    ('priorite', 'b'),
+    ('statut', 'b'),
+    ('heures_estimees', 'd'),
+    ('echeance', 'i'),
+)
+
+def code_priorite(priorite: Optional[str]) -> int:
+    """Code entier d'une priorité"""
+    return PRIORITES.index(priorite) if priorite in PRIORITES else CODE_INCONNU
+
+def code_statut(statut: Optional[str]) -> int:
+    """Code entier d'un statut"""
+    return STATUTS.index(statut) if statut in STATUTS else CODE_INCONNU
+
+def jour_echeance(echeance: Optional[str]) -> int:
+    """Numéro de jour (date.toordinal) d'une échéance AAAA-MM-JJ, ou AUCUN"""
+    if not echeance:
+        return AUCUN
+    try:
+        return date.fromisoformat(echeance[:10]).toordinal()
+    except ValueError:
+        return AUCUN
+
+class ColonnesTaches:
+    """
+    Tâches stockées par colonnes : id, id_projet, assigne_a, priorite, statut,
+    heures_estimees et echeance sont des tableaux de même longueur (tableaux NumPy si
+    NumPy est installé, array.array sinon). Construit par
+    StockageDonnees.colonnes_taches() ; les calculs ci-dessous sont vectorisés avec NumPy.
+    """
+    
+    def __init__(self):
+        """Créer un instantané vide, à remplir avec ajouter_lignes puis terminer"""
+        for nom, type_array in COLONNES:
+            setattr(self, nom, array.array(type_array))
+    
+    def __len__(self) -> int:
+        return len(self.id)
+    
+    def ajouter_lignes(self, lignes: Sequence[Sequence]):
+        """
+        Ajouter un lot de lignes déjà codées, dans l'ordre de COLONNES
+        (champs vides remplacés par AUCUN, priorité et statut par leur code)
+        """
+        if not lignes:
+            return
+        # zip(*lignes) transpose le lot : une séquence de valeurs par colonne
+        for (nom, _), valeurs in zip(COLONNES, zip(*lignes)):
+            getattr(self, nom).extend(valeurs)
+    
+    def terminer(self) -> 'ColonnesTaches':
+        """Exposer les colonnes en tableaux NumPy (sans copie) si NumPy est disponible"""
+        if np is not None:
+            for nom, type_array in COLONNES:
+                colonne = getattr(self, nom)
+                if isinstance(colonne, array.array):
+                    setattr(self, nom, np.frombuffer(colonne, dtype=type_array))
+        return self
+    
+    # Calculs
+    def nombre_par_statut(self) -> Dict[str, int]:
+        """Nombre de tâches par statut connu"""
+        if np is not None:
+            codes = self.statut[self.statut >= 0]
+            comptes = np.bincount(codes, minlength=len(STATUTS))
+            return {statut: int(comptes[code]) for code, statut in enumerate(STATUTS)}
+        comptes = [0] * len(STATUTS)
+        for code in self.statut:
+            if code >= 0:
+                comptes[code] += 1
+        return dict(zip(STATUTS, comptes))
+    
+    def nombre_par_priorite(self) -> Dict[str, int]:
+        """Nombre de tâches par priorité connue"""
+        if np is not None:
+            codes = self.priorite[self.priorite >= 0]
+            comptes = np.bincount(codes, minlength=len(PRIORITES))
+            return {priorite: int(comptes[code]) for code, priorite in enumerate(PRIORITES)}
+        comptes = [0] * len(PRIORITES)
+        for code in self.priorite:
+            if code >= 0:
+                comptes[code] += 1
+        return dict(zip(PRIORITES, comptes))
+    
+    def ids_en_retard(self, aujourd_hui: Optional[date] = None) -> List[int]:
+        """IDs des tâches non terminées dont l'échéance est passée"""
+        jour = (aujourd_hui or date.today()).toordinal()
+        if np is not None:
+            masque = (self.echeance != AUCUN) & (self.echeance < jour) & (self.statut != CODE_TERMINE)
+            return self.id[masque].tolist()
+        return [id_tache for id_tache, echeance, statut in zip(self.id, self.echeance, self.statut)
+                if echeance != AUCUN and echeance < jour and statut != CODE_TERMINE]
+    
+    def charge_par_membre(self) -> Dict[int, float]:
+        """Heures estimées des tâches non terminées, par membre assigné"""
+        if np is not None:
+            masque = (self.assigne_a != AUCUN) & (self.statut != CODE_TERMINE)
+            return self._sommer_par(self.assigne_a[masque], self.heures_estimees[masque])
+        charges = {}
+        for membre, heures, statut in zip(self.assigne_a, self.heures_estimees, self.statut):
+            if membre != AUCUN and statut != CODE_TERMINE:
+                charges[membre] = charges.get(membre, 0) + heures
+        return charges
+    
+    def heures_par_projet(self) -> Dict[int, float]:
+        """Heures estimées de toutes les tâches, par projet"""
+        if np is not None:
+            masque = self.id_projet != AUCUN
+            return self._sommer_par(self.id_projet[masque], self.heures_estimees[masque])
+        heures_projets = {}
+        for projet, heures in zip(self.id_projet, self.heures_estimees):
+            if projet != AUCUN:
+                heures_projets[projet] = heures_projets.get(projet, 0) + heures
+        return heures_projets
+    
+    @staticmethod
+    def _sommer_par(cles, poids) -> Dict[int, float]:
+        """Somme des poids par clé (NumPy) : regroupement par np.unique puis np.bincount"""
+        uniques, positions = np.unique(cles, return_inverse=True)
+        sommes = np.bincount(positions, weights=poids, minlength=len(uniques))
+        return dict(zip(uniques.tolist(), sommes.tolist()))
+
+def construire_colonnes(lots: Iterable[Sequence[Sequence]]) -> ColonnesTaches:
+    """Construire un instantané à partir de lots de lignes codées (par exemple fetchmany)"""
+    colonnes = ColonnesTaches()
+    for lignes in lots:
+        colonnes.ajouter_lignes(lignes)
+    return colonnes.terminer()
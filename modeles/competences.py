@@ -0,0 +1,24 @@
+"""
+Normalisation et internement des compétences
+Les compétences sont stockées une seule fois dans la table competences ;
+les tâches et les membres y font référence par ID entier
+"""
+
+from typing import Dict, FrozenSet, Iterable
+
+# Ensembles d'IDs déjà construits : les tâches/membres ayant les mêmes compétences
+# partagent le même objet frozenset
+_ensembles_internes: Dict[FrozenSet[int], FrozenSet[int]] = {}
+
+def nom_competence(nom: str) -> str:
+    """Nom affichable d'une compétence : espaces superflus supprimés"""
+    return ' '.join(nom.split())
+
+def cle_competence(nom: str) -> str:
+    """Clé canonique d'une compétence (insensible à la casse et aux espaces superflus)"""
+    return nom_competence(nom).casefold()
+
+def interner_competences(ids: Iterable[int]) -> FrozenSet[int]:
+    """Retourner l'ensemble interné des IDs de compétences donnés"""
+    ensemble = frozenset(ids)
+    return _ensembles_internes.setdefault(ensemble, ensemble)
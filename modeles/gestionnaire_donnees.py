@@ -1,50 +1,189 @@
 """
 Gestionnaire de données pour l'application de suivi des projets
-Gère la persistance des données en utilisant SQLite
+Gère la persistance des données en utilisant SQLite (implémentation de StockageDonnees)
 """
 
-from typing import List, Optional
+import re
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 from modeles.base_donnees import BaseDonnees
+from modeles.colonnes_taches import (ColonnesTaches, PRIORITES, STATUTS, CODE_INCONNU, AUCUN,
+                                     construire_colonnes)
+from modeles.competences import cle_competence, nom_competence, interner_competences
+from modeles.migrations import RECALCUL_CHARGES_TRAVAIL
+from modeles.stockage import (StockageDonnees, ConflitConcurrence, TAILLE_PAGE, TAILLE_LOT_LECTURE,
+                              JOURS_AVANT_ARCHIVAGE, TAILLE_LOT_ARCHIVAGE, VERSION_INITIALE)
 from modeles.projet import Projet
 from modeles.tache import Tache
 from modeles.membre_equipe import MembreEquipe
 
-class GestionnaireDonnees:
-    def __init__(self, chemin_db='donnees/suivi_projets.db'):
-        """Initialiser le gestionnaire de données avec SQLite"""
-        self.db = BaseDonnees(chemin_db)
+# Nombre maximal d'IDs par clause IN (reste sous la limite de variables SQLite)
+TAILLE_LOT_IN = 500
+
+# Colonnes lues pour construire une Tache
+COLONNES_TACHES = ('id, titre, description, id_projet, priorite, statut, assigne_a, '
+                   'echeance, heures_estimees, cree_le, mis_a_jour_le, version')
+
+# Colonnes lues pour construire un Projet (compteurs de tâches tenus par des déclencheurs)
+COLONNES_PROJETS = ('projets.id, projets.nom, projets.description, projets.statut, projets.date_debut, '
+                    'projets.date_fin, projets.cree_le, projets.mis_a_jour_le, projets.nb_taches, '
+                    'projets.nb_terminees, projets.heures_totales, projets.version')
+
+# Ordres de tri autorisés pour rechercher_taches (jamais de SQL venant de l'appelant)
+TRIS_TACHES = {
+    'recentes': 'cree_le DESC, id DESC',
+    'anciennes': 'cree_le ASC, id ASC',
+    'echeance': "CASE WHEN echeance IS NULL OR echeance = '' THEN 1 ELSE 0 END, echeance, id",
+    'priorite': "CASE priorite WHEN 'Haute' THEN 0 WHEN 'Moyenne' THEN 1 ELSE 2 END, cree_le DESC, id DESC",
+    'titre': 'titre COLLATE NOCASE, id',
+}
+
+# Colonnes de colonnes_taches(), codées par SQLite dans l'ordre de modeles.colonnes_taches.COLONNES.
+# 1721424.5 : julianday() du jour 0 de date.toordinal() ; seules les dates AAAA-MM-JJ sont converties.
+REQUETE_COLONNES_TACHES = f'''
+    SELECT id, COALESCE(id_projet, {AUCUN}), COALESCE(assigne_a, {AUCUN}),
+           CASE priorite {' '.join(f'WHEN ? THEN {code}' for code in range(len(PRIORITES)))} ELSE {CODE_INCONNU} END,
+           CASE statut {' '.join(f'WHEN ? THEN {code}' for code in range(len(STATUTS)))} ELSE {CODE_INCONNU} END,
+           COALESCE(heures_estimees, 0),
+           CASE WHEN echeance GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+                THEN COALESCE(CAST(julianday(substr(echeance, 1, 10)) - 1721424.5 AS INTEGER), {AUCUN})
+                ELSE {AUCUN} END
+    FROM taches ORDER BY id
+'''
+
+# Conditions de reprise après un curseur (cree_le, id) pour les tris paginables.
+# La première comparaison seule permet à SQLite de parcourir l'index sur cree_le.
+CONDITIONS_APRES = {
+    'recentes': 'cree_le <= ? AND (cree_le < ? OR id < ?)',
+    'anciennes': 'cree_le >= ? AND (cree_le > ? OR id > ?)',
+}
+
+class GestionnaireDonnees(StockageDonnees):
+    def __init__(self, chemin_db='donnees/suivi_projets.db', profil=BaseDonnees.PROFIL_SUR,
+                 db: Optional[BaseDonnees] = None):
+        """
+        Initialiser le gestionnaire de données avec SQLite.
+        profil : BaseDonnees.PROFIL_SUR, BaseDonnees.PROFIL_RAPIDE ou un dictionnaire de PRAGMA
+        db : BaseDonnees déjà ouverte à utiliser (chemin_db et profil sont alors ignorés)
+        """
+        self.db = db if db is not None else BaseDonnees(chemin_db, profil)
+    
+    def fermer(self):
+        """Fermer les connexions à la base de données"""
+        self.db.fermer()
+    
+    def creer_instantane(self, lecture_seule: bool = True) -> 'GestionnaireDonnees':
+        """
+        Retourner un gestionnaire travaillant sur une copie en mémoire de la base.
+        En lecture seule, pour les rapports lourds : ils ne concurrencent plus les écritures
+        de l'interface sur le fichier WAL. Avec lecture_seule=False, la copie sert de brouillon
+        (simulations) : ses modifications ne sont jamais reportées sur disque.
+        Appeler fermer() sur l'instantané pour libérer sa mémoire.
+        """
+        return GestionnaireDonnees(db=self.db.creer_instantane(lecture_seule))
+    
+    def transaction(self):
+        """
+        Regrouper plusieurs appels du gestionnaire dans une seule transaction :
+            with gestionnaire.transaction():
+                gestionnaire.mettre_a_jour_tache(tache)
+                gestionnaire.mettre_a_jour_membre_equipe(membre)
+        Un seul commit à la sortie du bloc, annulation complète en cas d'erreur.
+        """
+        return self.db.transaction()
+    
+    def version_donnees(self) -> Dict[str, int]:
+        """
+        Retourner la version des données {table: compteur}, sans lire les tables elles-mêmes.
+        Chaque compteur augmente à chaque écriture dans la table (y compris les compétences
+        des tâches et des membres), quel que soit le processus qui l'a faite.
+        """
+        return self.db.versions_tables()
     
     # Méthodes pour les projets
     def charger_projets(self) -> List[Projet]:
         """Charger tous les projets"""
-        lignes = self.db.executer_requete('''
-            SELECT id, nom, description, statut, date_debut, date_fin, cree_le, mis_a_jour_le
-            FROM projets ORDER BY cree_le DESC
-        ''')
+        lignes = self.db.executer_requete(f'SELECT {COLONNES_PROJETS} FROM projets ORDER BY cree_le DESC')
         return [Projet.depuis_ligne_db(dict(ligne)) for ligne in lignes]
     
-    def ajouter_projet(self, projet: Projet):
-        """Ajouter un nouveau projet"""
+    def charger_page_projets(self, apres: Optional[tuple] = None, taille: int = TAILLE_PAGE,
+                             statut: Optional[str] = None, texte: Optional[str] = None):
+        """
+        Charger une page de projets, des plus récents aux plus anciens.
+        apres est le curseur (cree_le, id) retourné par la page précédente.
+        Retourne (projets, curseur_suivant) ; curseur_suivant vaut None à la dernière page.
+        """
+        conditions = []
+        parametres = []
+        if statut is not None:
+            conditions.append('statut = ?')
+            parametres.append(statut)
+        requete_fts = self._requete_fts(texte) if texte else ''
+        if requete_fts:
+            conditions.append('id IN (SELECT rowid FROM projets_fts WHERE projets_fts MATCH ?)')
+            parametres.append(requete_fts)
+        if apres is not None:
+            conditions.append(CONDITIONS_APRES['recentes'])
+            parametres.extend([apres[0], apres[0], apres[1]])
+        
+        requete = f'SELECT {COLONNES_PROJETS} FROM projets'
+        if conditions:
+            requete += ' WHERE ' + ' AND '.join(conditions)
+        requete += ' ORDER BY cree_le DESC, id DESC LIMIT ?'
+        parametres.append(taille)
+        
+        projets = [Projet.depuis_ligne_db(dict(ligne)) for ligne in self.db.executer_requete(requete, parametres)]
+        return projets, self._curseur_suivant(projets, taille, lambda p: (p.cree_le, p.id))
+    
+    def iterer_projets(self, taille_lot: int = TAILLE_LOT_LECTURE) -> Iterator[Projet]:
+        """Parcourir tous les projets par lots (fetchmany) sans construire la liste complète"""
+        lots = self.db.iterer_requete(f'SELECT {COLONNES_PROJETS} FROM projets ORDER BY cree_le DESC',
+                                      taille_lot=taille_lot)
+        for lignes in lots:
+            for ligne in lignes:
+                yield Projet.depuis_ligne_db(dict(ligne))
+    
+    def ajouter_projets_en_lot(self, projets: List[Projet]) -> List[int]:
+        """Ajouter plusieurs projets en une seule transaction"""
+        if not projets:
+            return []
+        
         maintenant = self.db.maintenant()
-        id_nouveau = self.db.executer_modification('''
-            INSERT INTO projets (nom, description, statut, date_debut, date_fin, cree_le, mis_a_jour_le)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (projet.nom, projet.description, projet.statut, projet.date_debut, 
-              projet.date_fin, maintenant, maintenant))
-        projet.id = id_nouveau
-        projet.cree_le = maintenant
-        projet.mis_a_jour_le = maintenant
+        with self.db.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO projets (nom, description, statut, date_debut, date_fin, cree_le, mis_a_jour_le)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(projet.nom, projet.description, projet.statut, projet.date_debut,
+                   projet.date_fin, maintenant, maintenant) for projet in projets])
+            ids = self.db.ids_generes(conn, 'projets', len(projets))
+        
+        for id_projet, projet in zip(ids, projets):
+            projet.id = id_projet
+            projet.cree_le = maintenant
+            projet.mis_a_jour_le = maintenant
+            projet.version = VERSION_INITIALE
+        return ids
     
     def mettre_a_jour_projet(self, projet: Projet):
-        """Mettre à jour un projet existant"""
+        """
+        Mettre à jour un projet existant.
+        Lève ConflitConcurrence si le projet a été modifié ou supprimé depuis sa lecture.
+        """
         maintenant = self.db.maintenant()
-        self.db.executer_modification('''
-            UPDATE projets 
-            SET nom=?, description=?, statut=?, date_debut=?, date_fin=?, mis_a_jour_le=?
-            WHERE id=?
-        ''', (projet.nom, projet.description, projet.statut, projet.date_debut,
-              projet.date_fin, maintenant, projet.id))
+        condition, parametres_condition = self._condition_version(projet)
+        with self.db.transaction() as conn:
+            modifies = conn.execute(f'''
+                UPDATE projets 
+                SET nom=?, description=?, statut=?, date_debut=?, date_fin=?, mis_a_jour_le=?,
+                    version=version + 1
+                WHERE {condition}
+            ''', (projet.nom, projet.description, projet.statut, projet.date_debut,
+                  projet.date_fin, maintenant, *parametres_condition)).rowcount
+            if modifies == 0 and projet.version is not None:
+                raise ConflitConcurrence('projets', [projet.id])
         projet.mis_a_jour_le = maintenant
+        if projet.version is not None:
+            projet.version += 1
     
     def supprimer_projet(self, id_projet: int):
         """Supprimer un projet"""
@@ -52,165 +191,495 @@ class GestionnaireDonnees:
     
     def obtenir_projet(self, id_projet: int) -> Optional[Projet]:
         """Obtenir un projet par son ID"""
-        lignes = self.db.executer_requete('''
-            SELECT id, nom, description, statut, date_debut, date_fin, cree_le, mis_a_jour_le
-            FROM projets WHERE id=?
-        ''', (id_projet,))
+        lignes = self.db.executer_requete(f'SELECT {COLONNES_PROJETS} FROM projets WHERE id=?', (id_projet,))
         if lignes:
             return Projet.depuis_ligne_db(dict(lignes[0]))
         return None
     
+    def noms_projets(self, ids_projets: List[int]) -> Dict[int, str]:
+        """Retourner {id: nom} des projets donnés, lus par lots d'IDs sur la clé primaire"""
+        return self._compter_par('SELECT id, nom FROM projets WHERE id IN ({})', list(ids_projets))
+    
     # Méthodes pour les tâches
     def charger_taches(self) -> List[Tache]:
         """Charger toutes les tâches avec leurs compétences"""
         lignes = self.db.executer_requete('''
             SELECT t.id, t.titre, t.description, t.id_projet, t.priorite, t.statut,
-                   t.assigne_a, t.echeance, t.heures_estimees, t.cree_le, t.mis_a_jour_le
+                   t.assigne_a, t.echeance, t.heures_estimees, t.cree_le, t.mis_a_jour_le, t.version
             FROM taches t ORDER BY t.cree_le DESC
         ''')
+        return self._hydrater_taches(lignes, toutes=True)
+    
+    def _hydrater_taches(self, lignes, toutes: bool = False, archives: bool = False) -> List[Tache]:
+        """
+        Construire les tâches et leur associer leurs compétences requises
+        (archives=True : lignes pouvant venir de taches_archive)
+        """
+        ids = None if toutes else [ligne['id'] for ligne in lignes]
+        competences = self._charger_competences('competences_taches', 'tache_id', ids)
+        if archives:
+            # IDs distincts entre tâches actives et archivées : les deux dictionnaires se complètent
+            competences.update(self._charger_competences('competences_taches_archive', 'tache_id', ids))
         
         taches = []
         for ligne in lignes:
             tache = Tache.depuis_ligne_db(dict(ligne))
-            # Charger les compétences requises
-            competences = self.db.executer_requete('''
-                SELECT competence FROM competences_taches WHERE tache_id=?
-            ''', (tache.id,))
-            tache.competences_requises = [comp[0] for comp in competences]
+            paires = competences.get(tache.id, [])
+            tache.competences_requises = [nom for _, nom in paires]
+            tache.ids_competences = interner_competences(id_comp for id_comp, _ in paires)
+            tache.marquer_enregistre()
             taches.append(tache)
-        
         return taches
     
+    def rechercher_taches(self, statut: Optional[str] = None, priorite: Optional[str] = None,
+                          id_projet: Optional[int] = None, assigne_a: Optional[int] = None,
+                          echeance_avant: Optional[str] = None, texte: Optional[str] = None,
+                          tri: str = 'recentes', limite: Optional[int] = None,
+                          decalage: Optional[int] = None, apres: Optional[tuple] = None,
+                          inclure_archives: bool = False) -> List[Tache]:
+        """
+        Rechercher des tâches en filtrant côté SQL (requête paramétrée utilisant les index).
+        Les critères à None sont ignorés ; echeance_avant exclut les tâches sans échéance ;
+        texte cherche des mots commençant par les termes saisis dans le titre ou la
+        description (index FTS5) ; tri est une clé de TRIS_TACHES.
+        apres est un curseur (cree_le, id) : reprendre après cette ligne sans OFFSET
+        (tris 'recentes' et 'anciennes' uniquement).
+        inclure_archives=True cherche aussi dans les tâches archivées (vue toutes_taches).
+        """
+        requete, parametres = self._construire_requete_taches(
+            statut=statut, priorite=priorite, id_projet=id_projet, assigne_a=assigne_a,
+            echeance_avant=echeance_avant, texte=texte, tri=tri, limite=limite,
+            decalage=decalage, apres=apres, inclure_archives=inclure_archives)
+        lignes = self.db.executer_requete(requete, parametres)
+        return self._hydrater_taches(lignes, archives=inclure_archives)
+    
+    def rechercher_texte(self, texte: str, limite: int = 50) -> List[Tache]:
+        """
+        Recherche plein texte des tâches (titre et description), classée par pertinence (bm25).
+        Chaque terme saisi est cherché comme préfixe de mot : "conc int" trouve
+        "Conception de l'interface".
+        """
+        requete_fts = self._requete_fts(texte)
+        if not requete_fts:
+            return []
+        lignes = self.db.executer_requete('''
+            SELECT t.id, t.titre, t.description, t.id_projet, t.priorite, t.statut,
+                   t.assigne_a, t.echeance, t.heures_estimees, t.cree_le, t.mis_a_jour_le, t.version
+            FROM taches_fts JOIN taches t ON t.id = taches_fts.rowid
+            WHERE taches_fts MATCH ? ORDER BY taches_fts.rank LIMIT ?
+        ''', (requete_fts, limite))
+        return self._hydrater_taches(lignes)
+    
+    def rechercher_texte_projets(self, texte: str, limite: int = 50) -> List[Projet]:
+        """Recherche plein texte des projets (nom et description), classée par pertinence"""
+        requete_fts = self._requete_fts(texte)
+        if not requete_fts:
+            return []
+        lignes = self.db.executer_requete(f'''
+            SELECT {COLONNES_PROJETS}
+            FROM projets_fts JOIN projets ON projets.id = projets_fts.rowid
+            WHERE projets_fts MATCH ? ORDER BY projets_fts.rank LIMIT ?
+        ''', (requete_fts, limite))
+        return [Projet.depuis_ligne_db(dict(ligne)) for ligne in lignes]
+    
+    def iterer_taches(self, taille_lot: int = TAILLE_LOT_LECTURE, **filtres) -> Iterator[Tache]:
+        """
+        Parcourir les tâches (avec leurs compétences) sans construire la liste complète.
+        Les lignes sont lues par lots de taille_lot (fetchmany) ; les filtres et le tri
+        sont ceux de rechercher_taches. La mémoire utilisée reste bornée par taille_lot.
+        """
+        requete, parametres = self._construire_requete_taches(**filtres)
+        for lignes in self.db.iterer_requete(requete, parametres, taille_lot):
+            yield from self._hydrater_taches(lignes, archives=filtres.get('inclure_archives', False))
+    
+    def colonnes_taches(self, taille_lot: int = TAILLE_LOT_LECTURE) -> ColonnesTaches:
+        """
+        Instantané en colonnes de toutes les tâches (voir modeles.colonnes_taches).
+        Codes et numéros de jour sont calculés en SQL : les lignes lues par fetchmany
+        vont directement dans les tableaux, sans objets Tache ni dictionnaires.
+        """
+        lots = self.db.iterer_requete(REQUETE_COLONNES_TACHES, PRIORITES + STATUTS, taille_lot)
+        return construire_colonnes(lots)
+    
+    def _construire_requete_taches(self, statut=None, priorite=None, id_projet=None, assigne_a=None,
+                                   echeance_avant=None, texte=None, tri='recentes', limite=None,
+                                   decalage=None, apres=None, inclure_archives=False):
+        """Construire la requête paramétrée de rechercher_taches ; retourne (requete, parametres)"""
+        if tri not in TRIS_TACHES:
+            raise ValueError(f"Tri inconnu : {tri}")
+        if apres is not None and tri not in CONDITIONS_APRES:
+            raise ValueError(f"Le tri '{tri}' ne permet pas la pagination par curseur")
+        
+        conditions = []
+        parametres = []
+        for colonne, valeur in (('statut', statut), ('priorite', priorite),
+                                ('id_projet', id_projet), ('assigne_a', assigne_a)):
+            if valeur is not None:
+                conditions.append(f'{colonne} = ?')
+                parametres.append(valeur)
+        
+        if echeance_avant:
+            conditions.append("echeance != '' AND echeance < ?")
+            parametres.append(echeance_avant)
+        
+        requete_fts = self._requete_fts(texte) if texte else ''
+        if requete_fts and inclure_archives:
+            conditions.append('(id IN (SELECT rowid FROM taches_fts WHERE taches_fts MATCH ?) '
+                              'OR id IN (SELECT rowid FROM taches_archive_fts WHERE taches_archive_fts MATCH ?))')
+            parametres.extend([requete_fts, requete_fts])
+        elif requete_fts:
+            conditions.append('id IN (SELECT rowid FROM taches_fts WHERE taches_fts MATCH ?)')
+            parametres.append(requete_fts)
+        
+        if apres is not None:
+            conditions.append(CONDITIONS_APRES[tri])
+            parametres.extend([apres[0], apres[0], apres[1]])
+        
+        requete = f"SELECT {COLONNES_TACHES} FROM {'toutes_taches' if inclure_archives else 'taches'}"
+        if conditions:
+            requete += ' WHERE ' + ' AND '.join(conditions)
+        requete += f' ORDER BY {TRIS_TACHES[tri]}'
+        if limite is not None:
+            requete += ' LIMIT ?'
+            parametres.append(limite)
+            if decalage:
+                requete += ' OFFSET ?'
+                parametres.append(decalage)
+        return requete, parametres
+    
+    def compter_taches_par_projet(self, ids_projets: List[int]) -> Dict[int, int]:
+        """Compter les tâches de chaque projet donné (GROUP BY sur l'index id_projet)"""
+        return self._compter_par('''
+            SELECT id_projet, COUNT(*) FROM taches WHERE id_projet IN ({}) GROUP BY id_projet
+        ''', ids_projets)
+    
+    def compter_taches_actives_par_membre(self, ids_membres: List[int]) -> Dict[int, int]:
+        """Compter les tâches non terminées assignées à chaque membre donné"""
+        return self._compter_par('''
+            SELECT assigne_a, COUNT(*) FROM taches
+            WHERE assigne_a IN ({}) AND statut != ? GROUP BY assigne_a
+        ''', ids_membres, (Tache.STATUT_TERMINE,))
+    
     def ajouter_tache(self, tache: Tache):
         """Ajouter une nouvelle tâche"""
         maintenant = self.db.maintenant()
-        id_nouveau = self.db.executer_modification('''
-            INSERT INTO taches (titre, description, id_projet, priorite, statut, assigne_a, 
-                               echeance, heures_estimees, cree_le, mis_a_jour_le)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (tache.titre, tache.description, tache.id_projet, tache.priorite,
-              tache.statut, tache.assigne_a, tache.echeance, tache.heures_estimees,
-              maintenant, maintenant))
+        with self.db.transaction():
+            id_nouveau = self.db.executer_modification('''
+                INSERT INTO taches (titre, description, id_projet, priorite, statut, assigne_a, 
+                                   echeance, heures_estimees, cree_le, mis_a_jour_le)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (tache.titre, tache.description, tache.id_projet, tache.priorite,
+                  tache.statut, tache.assigne_a, tache.echeance, tache.heures_estimees,
+                  maintenant, maintenant))
+            
+            # Ajouter les compétences requises
+            ids_competences = self._enregistrer_competences(
+                'competences_taches', 'tache_id', {id_nouveau: tache.competences_requises})
         
         tache.id = id_nouveau
+        tache.ids_competences = ids_competences[id_nouveau]
         tache.cree_le = maintenant
         tache.mis_a_jour_le = maintenant
+        tache.version = VERSION_INITIALE
+        tache.marquer_enregistre()
+    
+    def ajouter_taches_en_lot(self, taches: List[Tache]) -> List[int]:
+        """Ajouter plusieurs tâches et leurs compétences en une seule transaction"""
+        if not taches:
+            return []
+        
+        maintenant = self.db.maintenant()
+        with self.db.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO taches (titre, description, id_projet, priorite, statut, assigne_a,
+                                   echeance, heures_estimees, cree_le, mis_a_jour_le)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(tache.titre, tache.description, tache.id_projet, tache.priorite,
+                   tache.statut, tache.assigne_a, tache.echeance, tache.heures_estimees,
+                   maintenant, maintenant) for tache in taches])
+            ids = self.db.ids_generes(conn, 'taches', len(taches))
+            
+            # Ajouter les compétences requises
+            ids_competences = self._enregistrer_competences(
+                'competences_taches', 'tache_id',
+                {id_tache: tache.competences_requises for id_tache, tache in zip(ids, taches)})
         
-        # Ajouter les compétences requises
-        if tache.competences_requises:
-            for competence in tache.competences_requises:
-                self.db.executer_modification('''
-                    INSERT INTO competences_taches (tache_id, competence) VALUES (?, ?)
-                ''', (id_nouveau, competence))
+        for id_tache, tache in zip(ids, taches):
+            tache.id = id_tache
+            tache.ids_competences = ids_competences[id_tache]
+            tache.cree_le = maintenant
+            tache.mis_a_jour_le = maintenant
+            tache.version = VERSION_INITIALE
+            tache.marquer_enregistre()
+        return ids
     
-    def mettre_a_jour_tache(self, tache: Tache):
-        """Mettre à jour une tâche existante"""
+    def mettre_a_jour_taches_en_lot(self, taches: List[Tache]) -> List[int]:
+        """
+        Mettre à jour plusieurs tâches existantes et leurs compétences en une seule transaction.
+        Seules les colonnes modifiées depuis le chargement (ou la dernière sauvegarde) de chaque
+        tâche sont écrites, et les compétences seulement si leur ensemble a changé. Une tâche
+        sans modification n'est pas réécrite (mis_a_jour_le et version inchangés).
+        Chaque UPDATE vérifie la version lue : si une tâche a été modifiée ou supprimée depuis,
+        rien n'est écrit et ConflitConcurrence liste toutes les tâches en conflit.
+        """
+        if not taches:
+            return []
+        
         maintenant = self.db.maintenant()
-        self.db.executer_modification('''
-            UPDATE taches 
-            SET titre=?, description=?, id_projet=?, priorite=?, statut=?, assigne_a=?,
-                echeance=?, heures_estimees=?, mis_a_jour_le=?
-            WHERE id=?
-        ''', (tache.titre, tache.description, tache.id_projet, tache.priorite,
-              tache.statut, tache.assigne_a, tache.echeance, tache.heures_estimees,
-              maintenant, tache.id))
-        
-        # Mettre à jour les compétences
-        self.db.executer_modification('DELETE FROM competences_taches WHERE tache_id=?', (tache.id,))
-        if tache.competences_requises:
-            for competence in tache.competences_requises:
-                self.db.executer_modification('''
-                    INSERT INTO competences_taches (tache_id, competence) VALUES (?, ?)
-                ''', (tache.id, competence))
+        modifiees = [tache for tache in taches
+                     if tache.champs_modifies() or tache.competences_modifiees()]
+        if not modifiees:
+            return [tache.id for tache in taches]
         
-        tache.mis_a_jour_le = maintenant
+        conflits = []
+        with self.db.transaction() as conn:
+            # Une requête par tâche (et non executemany) pour savoir laquelle est en conflit ;
+            # noms de colonnes tirés de Tache.CHAMPS_SUIVIS, jamais d'une saisie
+            for tache in modifiees:
+                champs = tache.champs_modifies()
+                affectations = ''.join(f'{colonne}=?, ' for colonne in champs)
+                condition, parametres_condition = self._condition_version(tache)
+                modifies = conn.execute(
+                    f'UPDATE taches SET {affectations}mis_a_jour_le=?, version=version + 1 WHERE {condition}',
+                    (*champs.values(), maintenant, *parametres_condition)).rowcount
+                if modifies == 0 and tache.version is not None:
+                    conflits.append(tache.id)
+            if conflits:
+                raise ConflitConcurrence('taches', conflits)
+            
+            # Mettre à jour les compétences qui ont changé
+            ids_competences = self._modifier_competences(
+                'competences_taches', 'tache_id',
+                {tache.id: (tache.competences_enregistrees(), tache.competences_requises)
+                 for tache in modifiees if tache.competences_modifiees()})
+        
+        for tache in modifiees:
+            tache.mis_a_jour_le = maintenant
+            tache.ids_competences = ids_competences.get(tache.id, tache.ids_competences)
+            if tache.version is not None:
+                tache.version += 1
+            tache.marquer_enregistre()
+        return [tache.id for tache in taches]
     
     def supprimer_tache(self, id_tache: int):
         """Supprimer une tâche"""
         self.db.executer_modification('DELETE FROM taches WHERE id=?', (id_tache,))
     
+    def archiver_taches_terminees(self, jours: int = JOURS_AVANT_ARCHIVAGE,
+                                  taille_lot: int = TAILLE_LOT_ARCHIVAGE) -> int:
+        """
+        Déplacer vers taches_archive (et competences_taches_archive) les tâches terminées
+        dont la dernière modification date de plus de jours jours.
+        Une transaction par lot de taille_lot tâches : les autres connexions ne sont bloquées
+        que le temps d'un lot. Les déclencheurs gardent les compteurs des projets inchangés
+        et n'inscrivent pas de désassignation dans l'historique.
+        Retourne le nombre de tâches archivées.
+        """
+        limite = (datetime.now() - timedelta(days=jours)).isoformat()
+        taille_lot = min(taille_lot, TAILLE_LOT_IN)
+        total = 0
+        while True:
+            with self.db.transaction() as conn:
+                ids = [ligne[0] for ligne in conn.execute(
+                    'SELECT id FROM taches WHERE statut = ? AND mis_a_jour_le < ? LIMIT ?',
+                    (Tache.STATUT_TERMINE, limite, taille_lot))]
+                if ids:
+                    marqueurs = ', '.join('?' * len(ids))
+                    conn.execute(f'''
+                        INSERT INTO taches_archive ({COLONNES_TACHES}, archive_le)
+                        SELECT {COLONNES_TACHES}, ? FROM taches WHERE id IN ({marqueurs})
+                    ''', [self.db.maintenant()] + ids)
+                    conn.execute(f'''
+                        INSERT OR IGNORE INTO competences_taches_archive (tache_id, competence_id)
+                        SELECT tache_id, competence_id FROM competences_taches
+                        WHERE tache_id IN ({marqueurs}) ORDER BY id
+                    ''', ids)
+                    conn.execute(f'DELETE FROM competences_taches WHERE tache_id IN ({marqueurs})', ids)
+                    conn.execute(f'DELETE FROM taches WHERE id IN ({marqueurs})', ids)
+            if not ids:
+                return total
+            total += len(ids)
+    
     def obtenir_tache(self, id_tache: int) -> Optional[Tache]:
         """Obtenir une tâche par son ID"""
         lignes = self.db.executer_requete('''
             SELECT id, titre, description, id_projet, priorite, statut, assigne_a,
-                   echeance, heures_estimees, cree_le, mis_a_jour_le
+                   echeance, heures_estimees, cree_le, mis_a_jour_le, version
             FROM taches WHERE id=?
         ''', (id_tache,))
         
         if lignes:
-            tache = Tache.depuis_ligne_db(dict(lignes[0]))
-            # Charger les compétences requises
-            competences = self.db.executer_requete('''
-                SELECT competence FROM competences_taches WHERE tache_id=?
-            ''', (id_tache,))
-            tache.competences_requises = [comp[0] for comp in competences]
-            return tache
+            return self._hydrater_taches(lignes)[0]
         return None
     
     # Méthodes pour les membres d'équipe
-    def charger_membres_equipe(self) -> List[MembreEquipe]:
-        """Charger tous les membres d'équipe avec leurs compétences"""
+    def charger_membres_equipe(self, avec_taches: bool = False) -> List[MembreEquipe]:
+        """
+        Charger tous les membres d'équipe avec leurs compétences.
+        avec_taches=True : renseigner aussi taches_actuelles (lecture de toutes les tâches actives
+        assignées) ; inutile pour la charge de travail, tenue par les déclencheurs.
+        """
         lignes = self.db.executer_requete('''
             SELECT id, nom, email, role, disponibilite, heures_max_par_semaine,
-                   charge_travail_heures, cree_le, mis_a_jour_le
+                   charge_travail_heures, cree_le, mis_a_jour_le, version
             FROM membres_equipe ORDER BY nom
         ''')
+        return self._hydrater_membres(lignes, toutes=True, avec_taches=avec_taches)
+    
+    def _hydrater_membres(self, lignes, toutes: bool = False, avec_taches: bool = True) -> List[MembreEquipe]:
+        """Construire les membres d'équipe et leur associer leurs compétences (et leurs tâches en cours)"""
+        ids = None if toutes else [ligne['id'] for ligne in lignes]
+        competences = self._charger_competences('competences_membres', 'membre_id', ids)
+        taches_actuelles = self.taches_actuelles_par_membre(ids) if avec_taches else {}
         
         membres = []
         for ligne in lignes:
             membre = MembreEquipe.depuis_ligne_db(dict(ligne))
-            # Charger les compétences
-            competences = self.db.executer_requete('''
-                SELECT competence FROM competences_membres WHERE membre_id=?
-            ''', (membre.id,))
-            membre.competences = [comp[0] for comp in competences]
+            paires = competences.get(membre.id, [])
+            membre.competences = [nom for _, nom in paires]
+            membre.ids_competences = interner_competences(id_comp for id_comp, _ in paires)
+            membre.taches_actuelles = taches_actuelles.get(membre.id, [])
+            membre.marquer_enregistre()
             membres.append(membre)
-        
         return membres
     
+    def iterer_membres(self, taille_lot: int = TAILLE_LOT_LECTURE) -> Iterator[MembreEquipe]:
+        """Parcourir tous les membres d'équipe (avec leurs compétences) par lots, triés par nom"""
+        lots = self.db.iterer_requete('''
+            SELECT id, nom, email, role, disponibilite, heures_max_par_semaine,
+                   charge_travail_heures, cree_le, mis_a_jour_le, version
+            FROM membres_equipe ORDER BY nom
+        ''', taille_lot=taille_lot)
+        for lignes in lots:
+            yield from self._hydrater_membres(lignes)
+    
+    def charger_page_membres(self, apres: Optional[tuple] = None, taille: int = TAILLE_PAGE,
+                             texte: Optional[str] = None):
+        """
+        Charger une page de membres d'équipe triés par nom.
+        apres est le curseur (nom, id) retourné par la page précédente ;
+        texte cherche une sous-chaîne dans le nom, l'email ou le rôle.
+        Retourne (membres, curseur_suivant) ; curseur_suivant vaut None à la dernière page.
+        """
+        conditions = []
+        parametres = []
+        if texte:
+            motif = self._motif_like(texte)
+            conditions.append("(nom LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\' OR role LIKE ? ESCAPE '\\')")
+            parametres.extend([motif, motif, motif])
+        if apres is not None:
+            conditions.append('nom >= ? AND (nom > ? OR id > ?)')
+            parametres.extend([apres[0], apres[0], apres[1]])
+        
+        requete = '''
+            SELECT id, nom, email, role, disponibilite, heures_max_par_semaine,
+                   charge_travail_heures, cree_le, mis_a_jour_le, version
+            FROM membres_equipe'''
+        if conditions:
+            requete += ' WHERE ' + ' AND '.join(conditions)
+        requete += ' ORDER BY nom, id LIMIT ?'
+        parametres.append(taille)
+        
+        membres = self._hydrater_membres(self.db.executer_requete(requete, parametres))
+        return membres, self._curseur_suivant(membres, taille, lambda m: (m.nom, m.id))
+    
     def ajouter_membre_equipe(self, membre: MembreEquipe):
         """Ajouter un nouveau membre d'équipe"""
         maintenant = self.db.maintenant()
-        id_nouveau = self.db.executer_modification('''
-            INSERT INTO membres_equipe (nom, email, role, disponibilite, heures_max_par_semaine,
-                                       charge_travail_heures, cree_le, mis_a_jour_le)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (membre.nom, membre.email, membre.role, membre.disponibilite,
-              membre.heures_max_par_semaine, membre.charge_travail_heures,
-              maintenant, maintenant))
+        with self.db.transaction():
+            # charge_travail_heures n'est pas écrite : elle est tenue par les déclencheurs sur taches
+            id_nouveau = self.db.executer_modification('''
+                INSERT INTO membres_equipe (nom, email, role, disponibilite, heures_max_par_semaine,
+                                           cree_le, mis_a_jour_le)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (membre.nom, membre.email, membre.role, membre.disponibilite,
+                  membre.heures_max_par_semaine, maintenant, maintenant))
+            
+            # Ajouter les compétences
+            ids_competences = self._enregistrer_competences(
+                'competences_membres', 'membre_id', {id_nouveau: membre.competences})
         
         membre.id = id_nouveau
+        membre.ids_competences = ids_competences[id_nouveau]
+        membre.charge_travail_heures = 0
         membre.cree_le = maintenant
         membre.mis_a_jour_le = maintenant
+        membre.version = VERSION_INITIALE
+        membre.marquer_enregistre()
+    
+    def ajouter_membres_en_lot(self, membres: List[MembreEquipe]) -> List[int]:
+        """Ajouter plusieurs membres d'équipe et leurs compétences en une seule transaction"""
+        if not membres:
+            return []
+        
+        maintenant = self.db.maintenant()
+        with self.db.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO membres_equipe (nom, email, role, disponibilite, heures_max_par_semaine,
+                                           cree_le, mis_a_jour_le)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(membre.nom, membre.email, membre.role, membre.disponibilite,
+                   membre.heures_max_par_semaine, maintenant, maintenant) for membre in membres])
+            ids = self.db.ids_generes(conn, 'membres_equipe', len(membres))
+            
+            # Ajouter les compétences
+            ids_competences = self._enregistrer_competences(
+                'competences_membres', 'membre_id',
+                {id_membre: membre.competences for id_membre, membre in zip(ids, membres)})
         
-        # Ajouter les compétences
-        if membre.competences:
-            for competence in membre.competences:
-                self.db.executer_modification('''
-                    INSERT INTO competences_membres (membre_id, competence) VALUES (?, ?)
-                ''', (id_nouveau, competence))
+        for id_membre, membre in zip(ids, membres):
+            membre.id = id_membre
+            membre.ids_competences = ids_competences[id_membre]
+            membre.charge_travail_heures = 0
+            membre.cree_le = maintenant
+            membre.mis_a_jour_le = maintenant
+            membre.version = VERSION_INITIALE
+            membre.marquer_enregistre()
+        return ids
     
     def mettre_a_jour_membre_equipe(self, membre: MembreEquipe):
-        """Mettre à jour un membre d'équipe existant"""
+        """
+        Mettre à jour un membre d'équipe existant : seulement les colonnes modifiées depuis son
+        chargement, et ses compétences seulement si leur ensemble a changé.
+        La charge de travail n'est pas écrite : les déclencheurs sur taches la maintiennent.
+        Lève ConflitConcurrence si le membre a été modifié ou supprimé depuis sa lecture.
+        """
+        champs = membre.champs_modifies()
+        competences_modifiees = membre.competences_modifiees()
+        if not champs and not competences_modifiees:
+            return
+        
         maintenant = self.db.maintenant()
-        self.db.executer_modification('''
-            UPDATE membres_equipe 
-            SET nom=?, email=?, role=?, disponibilite=?, heures_max_par_semaine=?,
-                charge_travail_heures=?, mis_a_jour_le=?
-            WHERE id=?
-        ''', (membre.nom, membre.email, membre.role, membre.disponibilite,
-              membre.heures_max_par_semaine, membre.charge_travail_heures,
-              maintenant, membre.id))
-        
-        # Mettre à jour les compétences
-        self.db.executer_modification('DELETE FROM competences_membres WHERE membre_id=?', (membre.id,))
-        if membre.competences:
-            for competence in membre.competences:
-                self.db.executer_modification('''
-                    INSERT INTO competences_membres (membre_id, competence) VALUES (?, ?)
-                ''', (membre.id, competence))
+        condition, parametres_condition = self._condition_version(membre)
+        with self.db.transaction() as conn:
+            # Noms de colonnes tirés de MembreEquipe.CHAMPS_SUIVIS, jamais d'une saisie
+            affectations = ''.join(f'{colonne}=?, ' for colonne in champs)
+            modifies = conn.execute(
+                f'UPDATE membres_equipe SET {affectations}mis_a_jour_le=?, version=version + 1 WHERE {condition}',
+                (*champs.values(), maintenant, *parametres_condition)).rowcount
+            if modifies == 0 and membre.version is not None:
+                raise ConflitConcurrence('membres_equipe', [membre.id])
+            
+            # Mettre à jour les compétences si elles ont changé
+            ids_competences = self._modifier_competences(
+                'competences_membres', 'membre_id',
+                {membre.id: (membre.competences_enregistrees(), membre.competences)}
+                if competences_modifiees else {})
         
         membre.mis_a_jour_le = maintenant
+        membre.ids_competences = ids_competences.get(membre.id, membre.ids_competences)
+        if membre.version is not None:
+            membre.version += 1
+        membre.marquer_enregistre()
+    
+    def recalculer_charges_travail(self) -> int:
+        """
+        Recalculer la charge de travail de tous les membres depuis leurs tâches non terminées,
+        en une seule requête UPDATE agrégée (réparation d'une base dont les charges ont dérivé).
+        Retourne le nombre de membres dont la charge a changé.
+        """
+        with self.db.transaction() as conn:
+            return conn.execute(RECALCUL_CHARGES_TRAVAIL).rowcount
     
     def supprimer_membre_equipe(self, id_membre: int):
         """Supprimer un membre d'équipe"""
@@ -220,64 +689,278 @@ class GestionnaireDonnees:
         """Obtenir un membre d'équipe par son ID"""
         lignes = self.db.executer_requete('''
             SELECT id, nom, email, role, disponibilite, heures_max_par_semaine,
-                   charge_travail_heures, cree_le, mis_a_jour_le
+                   charge_travail_heures, cree_le, mis_a_jour_le, version
             FROM membres_equipe WHERE id=?
         ''', (id_membre,))
         
         if lignes:
-            membre = MembreEquipe.depuis_ligne_db(dict(lignes[0]))
-            # Charger les compétences
-            competences = self.db.executer_requete('''
-                SELECT competence FROM competences_membres WHERE membre_id=?
-            ''', (id_membre,))
-            membre.competences = [comp[0] for comp in competences]
-            return membre
+            return self._hydrater_membres(lignes)[0]
         return None
     
+    def noms_membres(self, ids_membres: List[int]) -> Dict[int, str]:
+        """Retourner {id: nom} des membres d'équipe donnés, lus par lots d'IDs sur la clé primaire"""
+        return self._compter_par('SELECT id, nom FROM membres_equipe WHERE id IN ({})', list(ids_membres))
+    
+    # Compétences et historique des assignations
+    def charger_competences(self) -> Dict[int, str]:
+        """Retourner le dictionnaire des compétences {id: nom}"""
+        return dict(self.db.executer_requete('SELECT id, nom FROM competences ORDER BY id'))
+    
+    def historique_assignations(self, membre_id: Optional[int] = None, tache_id: Optional[int] = None,
+                                debut: Optional[str] = None, fin: Optional[str] = None,
+                                limite: Optional[int] = None) -> List[dict]:
+        """
+        Lire l'historique des assignations et désassignations, du plus ancien au plus récent.
+        debut (inclus) et fin (exclue) sont des dates ou horodatages ISO ('2025-07-01',
+        '2025-07-01T14:00'). Chaque événement est un dictionnaire
+        {id, membre_id, tache_id, assigne_le, type} ; type vaut TYPE_ASSIGNATION ou TYPE_DESASSIGNATION.
+        Les filtres par membre, tâche et période utilisent les index sur (membre_id, assigne_le),
+        (tache_id, assigne_le) et assigne_le.
+        """
+        conditions = []
+        parametres = []
+        if membre_id is not None:
+            conditions.append('membre_id = ?')
+            parametres.append(membre_id)
+        if tache_id is not None:
+            conditions.append('tache_id = ?')
+            parametres.append(tache_id)
+        if debut:
+            conditions.append('assigne_le >= ?')
+            parametres.append(debut)
+        if fin:
+            conditions.append('assigne_le < ?')
+            parametres.append(fin)
+        
+        requete = 'SELECT id, membre_id, tache_id, assigne_le, type FROM assignations_taches'
+        if conditions:
+            requete += ' WHERE ' + ' AND '.join(conditions)
+        requete += ' ORDER BY assigne_le, id'
+        if limite is not None:
+            requete += ' LIMIT ?'
+            parametres.append(limite)
+        return [dict(ligne) for ligne in self.db.executer_requete(requete, parametres)]
+    
+    def taches_actuelles_par_membre(self, ids_membres: Optional[List[int]] = None) -> Dict[int, List[int]]:
+        """
+        Retourner les IDs des tâches non terminées assignées à chaque membre
+        (tous les membres si ids_membres vaut None), lus par l'index (assigne_a, statut).
+        """
+        requete = 'SELECT assigne_a, id FROM taches WHERE assigne_a {} AND statut != ? ORDER BY assigne_a, id'
+        if ids_membres is None:
+            lots = [None]
+        else:
+            lots = [ids_membres[i:i + TAILLE_LOT_IN] for i in range(0, len(ids_membres), TAILLE_LOT_IN)]
+        
+        taches: Dict[int, List[int]] = {}
+        for lot in lots:
+            if lot is None:
+                lignes = self.db.executer_requete(requete.format('IS NOT NULL'), (Tache.STATUT_TERMINE,))
+            else:
+                lignes = self.db.executer_requete(requete.format(f"IN ({', '.join('?' * len(lot))})"),
+                                                  list(lot) + [Tache.STATUT_TERMINE])
+            for id_membre, id_tache in lignes:
+                taches.setdefault(id_membre, []).append(id_tache)
+        return taches
+    
+    def _charger_competences(self, table: str, colonne: str,
+                             ids: Optional[List[int]] = None) -> Dict[int, List[tuple]]:
+        """
+        Charger les compétences de plusieurs entités et les grouper par ID d'entité,
+        sous forme de paires (id_competence, nom) dans l'ordre de saisie.
+        Sans liste d'IDs, toute la table est lue en une seule requête ;
+        sinon les IDs sont envoyés par lots dans une clause IN.
+        """
+        requete = (f'SELECT l.{colonne}, c.id, c.nom FROM {table} l '
+                   f'JOIN competences c ON c.id = l.competence_id')
+        if ids is None:
+            lots = [None]
+        else:
+            lots = [ids[i:i + TAILLE_LOT_IN] for i in range(0, len(ids), TAILLE_LOT_IN)]
+        
+        competences: Dict[int, List[tuple]] = {}
+        for lot in lots:
+            if lot is None:
+                lignes = self.db.executer_requete(requete + ' ORDER BY l.id')
+            else:
+                marqueurs = ', '.join('?' * len(lot))
+                lignes = self.db.executer_requete(
+                    requete + f' WHERE l.{colonne} IN ({marqueurs}) ORDER BY l.id', lot)
+            for id_entite, id_competence, nom in lignes:
+                competences.setdefault(id_entite, []).append((id_competence, nom))
+        return competences
+    
+    def _resoudre_competences(self, noms: Iterable[str]) -> Dict[str, int]:
+        """
+        Retourner l'ID de chaque compétence par clé canonique, en ajoutant au dictionnaire
+        des compétences celles qui n'y sont pas encore. Une compétence déjà connue garde
+        le nom sous lequel elle a été saisie la première fois.
+        """
+        noms_par_cle: Dict[str, str] = {}
+        for nom in noms:
+            cle = cle_competence(nom)
+            if cle:
+                noms_par_cle.setdefault(cle, nom_competence(nom))
+        if not noms_par_cle:
+            return {}
+        
+        cles = list(noms_par_cle)
+        ids_par_cle: Dict[str, int] = {}
+        with self.db.transaction() as conn:
+            conn.executemany('INSERT OR IGNORE INTO competences (nom, cle) VALUES (?, ?)',
+                             [(nom, cle) for cle, nom in noms_par_cle.items()])
+            for i in range(0, len(cles), TAILLE_LOT_IN):
+                lot = cles[i:i + TAILLE_LOT_IN]
+                ids_par_cle.update(conn.execute(
+                    f"SELECT cle, id FROM competences WHERE cle IN ({', '.join('?' * len(lot))})", lot))
+        return ids_par_cle
+    
+    def _enregistrer_competences(self, table: str, colonne: str, competences: Dict[int, List[str]],
+                                 remplacer: bool = False) -> Dict[int, FrozenSet[int]]:
+        """
+        Lier chaque entité (ID → noms de compétences) aux IDs du dictionnaire des compétences.
+        Avec remplacer=True, les liens existants de ces entités sont d'abord supprimés.
+        Retourne l'ensemble interné des IDs de compétences de chaque entité.
+        """
+        with self.db.transaction() as conn:
+            ids_par_cle = self._resoudre_competences(
+                nom for noms in competences.values() for nom in noms)
+            
+            ensembles = {}
+            liens = []
+            for id_entite, noms in competences.items():
+                # dict.fromkeys : dédoublonner en gardant l'ordre de saisie
+                ids_entite = list(dict.fromkeys(
+                    ids_par_cle[cle_competence(nom)] for nom in noms if cle_competence(nom)))
+                liens.extend((id_entite, id_competence) for id_competence in ids_entite)
+                ensembles[id_entite] = interner_competences(ids_entite)
+            
+            if remplacer:
+                conn.executemany(f'DELETE FROM {table} WHERE {colonne}=?',
+                                 [(id_entite,) for id_entite in competences])
+            conn.executemany(f'INSERT OR IGNORE INTO {table} ({colonne}, competence_id) VALUES (?, ?)',
+                             liens)
+        return ensembles
+    
+    def _modifier_competences(self, table: str, colonne: str,
+                              changements: Dict[int, Tuple[Optional[tuple], List[str]]]) -> Dict[int, FrozenSet[int]]:
+        """
+        Appliquer des changements de compétences (ID → (noms enregistrés, nouveaux noms)) par
+        différence d'ensembles : seuls les liens retirés sont supprimés et seuls les liens
+        ajoutés sont insérés. Une entité dont l'état enregistré est inconnu (None) voit tous
+        ses liens remplacés. Retourne l'ensemble interné des IDs de compétences de chaque entité.
+        """
+        remplacements = {id_entite: nouveaux for id_entite, (anciens, nouveaux) in changements.items()
+                         if anciens is None}
+        differences = {id_entite: noms for id_entite, noms in changements.items() if noms[0] is not None}
+        with self.db.transaction() as conn:
+            ensembles = self._enregistrer_competences(table, colonne, remplacements, remplacer=True)
+            if not differences:
+                return ensembles
+            
+            ids_par_cle = self._resoudre_competences(
+                nom for anciens, nouveaux in differences.values() for nom in (*anciens, *nouveaux))
+            suppressions = []
+            ajouts = []
+            for id_entite, (anciens, nouveaux) in differences.items():
+                ids_anciens = {ids_par_cle[cle_competence(nom)] for nom in anciens if cle_competence(nom)}
+                ids_nouveaux = list(dict.fromkeys(
+                    ids_par_cle[cle_competence(nom)] for nom in nouveaux if cle_competence(nom)))
+                suppressions.extend((id_entite, id_competence)
+                                    for id_competence in ids_anciens.difference(ids_nouveaux))
+                ajouts.extend((id_entite, id_competence)
+                              for id_competence in ids_nouveaux if id_competence not in ids_anciens)
+                ensembles[id_entite] = interner_competences(ids_nouveaux)
+            
+            conn.executemany(f'DELETE FROM {table} WHERE {colonne}=? AND competence_id=?', suppressions)
+            conn.executemany(f'INSERT OR IGNORE INTO {table} ({colonne}, competence_id) VALUES (?, ?)',
+                             ajouts)
+        return ensembles
+    
     # Méthodes utilitaires
+    @staticmethod
+    def _condition_version(element) -> Tuple[str, tuple]:
+        """
+        Clause WHERE (et ses paramètres) d'une mise à jour optimiste : l'ID, et la version
+        lue quand elle est connue (objet construit hors du stockage : pas de vérification)
+        """
+        if element.version is None:
+            return 'id=?', (element.id,)
+        return 'id=? AND version=?', (element.id, element.version)
+    
+    @staticmethod
+    def _motif_like(texte: str) -> str:
+        """Construire un motif LIKE de sous-chaîne en échappant les jokers (ESCAPE '\\')"""
+        return '%' + texte.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    
+    @staticmethod
+    def _requete_fts(texte: str) -> str:
+        """
+        Convertir une saisie libre en requête FTS5 : chaque mot devient un préfixe entre
+        guillemets ("mot"*), ce qui neutralise la syntaxe FTS (AND, NEAR, -, ...).
+        Retourne une chaîne vide si la saisie ne contient aucun mot.
+        """
+        return ' '.join(f'"{mot}"*' for mot in re.findall(r'\w+', texte))
+    
+    def _compter_par(self, requete: str, ids: List[int], parametres: tuple = ()) -> Dict[int, int]:
+        """
+        Exécuter une requête (clé, valeur), COUNT ... GROUP BY par exemple, dont la clause
+        IN ({}) est remplie par lots d'IDs. Les paramètres supplémentaires suivent les IDs.
+        """
+        comptes: Dict[int, int] = {}
+        for i in range(0, len(ids), TAILLE_LOT_IN):
+            lot = ids[i:i + TAILLE_LOT_IN]
+            requete_lot = requete.format(', '.join('?' * len(lot)))
+            comptes.update(self.db.executer_requete(requete_lot, list(lot) + list(parametres)))
+        return comptes
+    
     def obtenir_statistiques(self) -> dict:
-        """Obtenir les statistiques générales"""
-        projets = self.charger_projets()
-        taches = self.charger_taches()
-        membres = self.charger_membres_equipe()
-        
+        """
+        Obtenir les statistiques générales.
+        Calculées en SQL (COUNT/SUM ... GROUP BY) sans construire d'objets modèles.
+        Les tâches archivées sont comptées, comme dans les compteurs des projets.
+        """
         # Statistiques des projets
-        projets_actifs = len([p for p in projets if p.statut == Projet.STATUT_ACTIF])
-        projets_termines = len([p for p in projets if p.statut == Projet.STATUT_TERMINE])
+        projets_par_statut = dict(self.db.executer_requete(
+            'SELECT statut, COUNT(*) FROM projets GROUP BY statut'))
         
-        # Statistiques des tâches
-        taches_a_faire = len([t for t in taches if t.statut == Tache.STATUT_A_FAIRE])
-        taches_en_cours = len([t for t in taches if t.statut == Tache.STATUT_EN_COURS])
-        taches_terminees = len([t for t in taches if t.statut == Tache.STATUT_TERMINE])
-        
-        # Tâches haute priorité
-        taches_haute_priorite = len([t for t in taches if t.priorite == Tache.PRIORITE_HAUTE])
+        # Statistiques des tâches actives puis archivées, chacune en un seul parcours
+        # de l'index (statut, priorite, echeance) de sa table
+        taches_par_statut = {}
+        taches_haute_priorite = 0
+        taches_en_retard = 0
+        lignes = [ligne for table in ('taches', 'taches_archive') for ligne in self.db.executer_requete(f'''
+            SELECT statut, priorite, COUNT(*) AS nombre,
+                   SUM(CASE WHEN statut != ? AND echeance != ''
+                            AND date(echeance) < date('now', 'localtime') THEN 1 ELSE 0 END) AS en_retard
+            FROM {table} GROUP BY statut, priorite
+        ''', (Tache.STATUT_TERMINE,))]
+        for ligne in lignes:
+            taches_par_statut[ligne['statut']] = taches_par_statut.get(ligne['statut'], 0) + ligne['nombre']
+            if ligne['priorite'] == Tache.PRIORITE_HAUTE:
+                taches_haute_priorite += ligne['nombre']
+            taches_en_retard += ligne['en_retard']
         
-        # Membres disponibles
-        membres_disponibles = len([m for m in membres if m.obtenir_score_disponibilite() > 0.5])
+        # Membres disponibles : même formule que MembreEquipe.obtenir_score_disponibilite() > 0.5
+        total_membres, membres_disponibles = self.db.executer_requete('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(CASE WHEN heures_max_par_semaine != 0
+                                     AND (disponibilite / 100.0) * (1.0 - MIN(
+                                         charge_travail_heures * 1.0 / heures_max_par_semaine, 1.0)) > 0.5
+                                THEN 1 ELSE 0 END), 0)
+            FROM membres_equipe
+        ''')[0]
         
         return {
-            'total_projets': len(projets),
-            'projets_actifs': projets_actifs,
-            'projets_termines': projets_termines,
-            'total_taches': len(taches),
-            'taches_a_faire': taches_a_faire,
-            'taches_en_cours': taches_en_cours,
-            'taches_terminees': taches_terminees,
+            'total_projets': sum(projets_par_statut.values()),
+            'projets_actifs': projets_par_statut.get(Projet.STATUT_ACTIF, 0),
+            'projets_termines': projets_par_statut.get(Projet.STATUT_TERMINE, 0),
+            'total_taches': sum(taches_par_statut.values()),
+            'taches_a_faire': taches_par_statut.get(Tache.STATUT_A_FAIRE, 0),
+            'taches_en_cours': taches_par_statut.get(Tache.STATUT_EN_COURS, 0),
+            'taches_terminees': taches_par_statut.get(Tache.STATUT_TERMINE, 0),
             'taches_haute_priorite': taches_haute_priorite,
-            'total_membres': len(membres),
+            'taches_en_retard': taches_en_retard,
+            'total_membres': total_membres,
             'membres_disponibles': membres_disponibles
         }
-    
-    # Méthodes de compatibilité (pour maintenir l'interface existante)
-    def sauvegarder_projets(self, projets: List[Projet]):
-        """Compatibilité - ne fait rien car SQLite sauvegarde automatiquement"""
-        pass
-    
-    def sauvegarder_taches(self, taches: List[Tache]):
-        """Compatibilité - ne fait rien car SQLite sauvegarde automatiquement"""
-        pass
-    
-    def sauvegarder_membres_equipe(self, membres: List[MembreEquipe]):
-        """Compatibilité - ne fait rien car SQLite sauvegarde automatiquement"""
-        pass
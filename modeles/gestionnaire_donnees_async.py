@@ -0,0 +1,114 @@
+"""
+Accès aux données pour les appelants asyncio
+Toutes les opérations SQLite s'exécutent sur un thread dédié : la boucle d'événements
+n'est jamais bloquée par une requête
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from modeles.base_donnees import BaseDonnees
+from modeles.gestionnaire_donnees import GestionnaireDonnees
+from modeles.stockage import StockageDonnees
+
+# Vrai dans la tâche asyncio qui a ouvert une transaction (et dans ses sous-tâches)
+_dans_transaction = contextvars.ContextVar('dans_transaction', default=False)
+
+class GestionnaireDonneesAsync:
+    """
+    Enveloppe asynchrone de GestionnaireDonnees :
+        donnees = GestionnaireDonneesAsync()
+        taches = await donnees.rechercher_taches(statut=Tache.STATUT_A_FAIRE)
+        async with donnees.transaction():
+            await donnees.mettre_a_jour_tache(tache)
+            await donnees.mettre_a_jour_membre_equipe(membre)
+        await donnees.fermer()
+    Toute méthode publique de GestionnaireDonnees est disponible sous forme de coroutine,
+    sauf les itérateurs iterer_* (leur lecture par lots se ferait hors du thread dédié).
+    """
+    
+    def __init__(self, gestionnaire: StockageDonnees = None,
+                 chemin_db='donnees/suivi_projets.db', profil=BaseDonnees.PROFIL_SUR):
+        """
+        Utiliser le gestionnaire fourni, ou en créer un sur chemin_db.
+        Un seul thread exécute les requêtes : il possède l'unique connexion utilisée,
+        et une transaction ouverte y reste cohérente d'un await à l'autre.
+        """
+        # Le gestionnaire est créé sur le thread dédié : la connexion ouverte par
+        # l'initialisation du schéma est celle que ce thread réutilisera
+        self._executeur = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite')
+        if gestionnaire is None:
+            gestionnaire = self._executeur.submit(GestionnaireDonnees, chemin_db, profil).result()
+        self.gestionnaire = gestionnaire
+        self._verrou = None  # asyncio.Lock, créé dans la boucle d'événements au premier appel
+    
+    def __getattr__(self, nom):
+        """Exposer les méthodes publiques du gestionnaire sous forme de coroutines"""
+        if nom.startswith('_') or nom.startswith('iterer_'):
+            raise AttributeError(nom)
+        methode = getattr(self.gestionnaire, nom)
+        if not callable(methode):
+            raise AttributeError(nom)
+        
+        @functools.wraps(methode)
+        async def appel(*args, **kwargs):
+            return await self._executer(methode, *args, **kwargs)
+        return appel
+    
+    async def charger_taches(self):
+        """Charger toutes les tâches avec leurs compétences"""
+        return await self._executer(self.gestionnaire.charger_taches)
+    
+    async def rechercher_taches(self, **filtres):
+        """Rechercher des tâches (mêmes filtres que GestionnaireDonnees.rechercher_taches)"""
+        return await self._executer(self.gestionnaire.rechercher_taches, **filtres)
+    
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Regrouper les appels du bloc dans une seule transaction (un seul commit à la sortie,
+        annulation complète en cas d'exception). Les appels faits par d'autres tâches
+        asyncio attendent la fin du bloc au lieu de s'y mêler.
+        """
+        if _dans_transaction.get():
+            yield self
+            return
+        
+        async with self._obtenir_verrou():
+            gestion = self.gestionnaire.transaction()
+            await self._soumettre(gestion.__enter__)
+            jeton = _dans_transaction.set(True)
+            try:
+                yield self
+            except BaseException as e:
+                _dans_transaction.reset(jeton)
+                await self._soumettre(gestion.__exit__, type(e), e, e.__traceback__)
+                raise
+            else:
+                _dans_transaction.reset(jeton)
+                await self._soumettre(gestion.__exit__, None, None, None)
+    
+    async def fermer(self):
+        """Fermer les connexions puis arrêter le thread dédié"""
+        await self._executer(self.gestionnaire.fermer)
+        self._executeur.shutdown(wait=True)
+    
+    def _obtenir_verrou(self) -> asyncio.Lock:
+        """Verrou sérialisant les transactions et les appels des autres tâches"""
+        if self._verrou is None:
+            self._verrou = asyncio.Lock()
+        return self._verrou
+    
+    async def _executer(self, fonction, *args, **kwargs):
+        """Exécuter un appel du gestionnaire, après la transaction en cours d'une autre tâche"""
+        if _dans_transaction.get():
+            return await self._soumettre(fonction, *args, **kwargs)
+        async with self._obtenir_verrou():
+            return await self._soumettre(fonction, *args, **kwargs)
+    
+    async def _soumettre(self, fonction, *args, **kwargs):
+        """Exécuter fonction sur le thread dédié sans bloquer la boucle d'événements"""
+        boucle = asyncio.get_running_loop()
+        return await boucle.run_in_executor(self._executeur, functools.partial(fonction, *args, **kwargs))
@@ -3,22 +3,32 @@ Modèle de membre d'équipe pour gérer les données des membres d'équipe
 """
 
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, FrozenSet
+from modeles.suivi_modifications import SuiviModifications
 
-class MembreEquipe:
+class MembreEquipe(SuiviModifications):
+    # Champs enregistrés en colonnes, écrits seulement s'ils ont changé (voir SuiviModifications) ;
+    # la charge de travail n'en fait pas partie : elle est tenue par la base de données
+    CHAMPS_SUIVIS = ('nom', 'email', 'role', 'disponibilite', 'heures_max_par_semaine')
+    CHAMP_COMPETENCES = 'competences'
+    
     def __init__(self, nom: str, email: str = "", role: str = ""):
         self.id: Optional[int] = None  # Sera défini par la base de données
         self.nom = nom
         self.email = email
         self.role = role
         self.competences: List[str] = []  # Liste des compétences
+        self.ids_competences: FrozenSet[int] = frozenset()  # IDs (table competences), renseignés par le gestionnaire
         self.disponibilite = 100  # Pourcentage de disponibilité (0-100)
         self.taches_actuelles: List[int] = []  # Liste des IDs de tâches actuellement assignées
-        self.charge_travail_heures = 0  # Charge de travail actuelle en heures
+        self.charge_travail_heures = 0  # Charge de travail actuelle en heures (tenue par la base de données)
         self.heures_max_par_semaine = 40  # Heures maximum par semaine
         self.cree_le = datetime.now().isoformat()
         self.mis_a_jour_le = datetime.now().isoformat()
-        
+        self.version: Optional[int] = None  # Version de la ligne lue (verrouillage optimiste), tenue par le stockage
+        self._etat_enregistre = None  # État à la dernière lecture/sauvegarde (SuiviModifications)
+        self._competences_enregistrees = None
+    
     def vers_dict(self) -> Dict[str, Any]:
         """Convertir le membre d'équipe en dictionnaire pour la sérialisation JSON"""
         return {
@@ -67,6 +77,7 @@ class MembreEquipe:
         membre.heures_max_par_semaine = ligne.get('heures_max_par_semaine', 40)
         membre.cree_le = ligne.get('cree_le', datetime.now().isoformat())
         membre.mis_a_jour_le = ligne.get('mis_a_jour_le', datetime.now().isoformat())
+        membre.version = ligne.get('version')
         return membre
     
     def ajouter_competence(self, competence: str):
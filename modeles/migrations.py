@@ -0,0 +1,365 @@
+"""
+Migrations versionnées du schéma de la base de données
+La version du schéma est stockée dans PRAGMA user_version
+"""
+
+import sqlite3
+from modeles.competences import cle_competence, nom_competence
+
+def _normaliser_competences(conn: sqlite3.Connection):
+    """
+    Créer le dictionnaire des compétences (une ligne par compétence canonique) et
+    reconstruire les tables de liaison pour qu'elles y fassent référence par ID.
+    La casse est repliée en Python (casefold) : lower() de SQLite ne gère que l'ASCII.
+    """
+    conn.execute('''
+        CREATE TABLE competences (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nom TEXT NOT NULL,
+            cle TEXT NOT NULL UNIQUE
+        )
+    ''')
+    
+    ids_par_cle = {}
+    for table, colonne, table_parente in (('competences_taches', 'tache_id', 'taches'),
+                                          ('competences_membres', 'membre_id', 'membres_equipe')):
+        anciennes_lignes = conn.execute(f'SELECT {colonne}, competence FROM {table} ORDER BY id').fetchall()
+        
+        liens = []
+        for id_entite, competence in anciennes_lignes:
+            cle = cle_competence(competence or '')
+            if not cle:
+                continue
+            if cle not in ids_par_cle:
+                ids_par_cle[cle] = conn.execute('INSERT INTO competences (nom, cle) VALUES (?, ?)',
+                                                (nom_competence(competence), cle)).lastrowid
+            liens.append((id_entite, ids_par_cle[cle]))
+        
+        # L'ancienne table et ses index sont remplacés ; l'ordre d'origine est conservé par id
+        conn.execute(f'DROP TABLE {table}')
+        conn.execute(f'''
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                {colonne} INTEGER NOT NULL,
+                competence_id INTEGER NOT NULL,
+                UNIQUE ({colonne}, competence_id),
+                FOREIGN KEY ({colonne}) REFERENCES {table_parente} (id) ON DELETE CASCADE,
+                FOREIGN KEY (competence_id) REFERENCES competences (id)
+            )
+        ''')
+        conn.executemany(f'INSERT OR IGNORE INTO {table} ({colonne}, competence_id) VALUES (?, ?)', liens)
+        conn.execute(f'CREATE INDEX idx_{table}_competence_id ON {table} (competence_id)')
+
+def _declencheurs_version(table: str, table_versionnee: str) -> list:
+    """Déclencheurs incrémentant le compteur de table_versionnee à chaque écriture dans table"""
+    return [f'''CREATE TRIGGER IF NOT EXISTS {table}_version_{evenement.lower()} AFTER {evenement} ON {table} BEGIN
+                   UPDATE versions_donnees SET version = version + 1 WHERE nom_table = '{table_versionnee}';
+               END''' for evenement in ('INSERT', 'UPDATE', 'DELETE')]
+
+# Charge de travail d'un membre : heures estimées de ses tâches non terminées
+_CHARGE_CALCULEE = '''(
+    SELECT COALESCE(SUM(heures_estimees), 0) FROM taches
+    WHERE taches.assigne_a = membres_equipe.id AND taches.statut != 'Terminé'
+)'''
+
+# Recalcul complet, en une seule requête ; seules les charges erronées sont réécrites
+RECALCUL_CHARGES_TRAVAIL = (f'UPDATE membres_equipe SET charge_travail_heures = {_CHARGE_CALCULEE} '
+                            f'WHERE charge_travail_heures IS NOT {_CHARGE_CALCULEE}')
+
+# Compteurs des tâches d'un projet, recalculés depuis la table taches
+RECALCUL_COMPTEURS_PROJETS = '''
+    UPDATE projets SET
+        nb_taches = (SELECT COUNT(*) FROM taches WHERE taches.id_projet = projets.id),
+        nb_terminees = (SELECT COUNT(*) FROM taches
+                        WHERE taches.id_projet = projets.id AND taches.statut = 'Terminé'),
+        heures_totales = (SELECT COALESCE(SUM(heures_estimees), 0) FROM taches
+                          WHERE taches.id_projet = projets.id)
+'''
+
+# Colonnes communes à taches et taches_archive
+_COLONNES_TACHES = ('id, titre, description, id_projet, priorite, statut, assigne_a, '
+                    'echeance, heures_estimees, cree_le, mis_a_jour_le')
+
+# Horodatage ISO local, au format de datetime.now().isoformat() (à la milliseconde)
+_HORODATAGE = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+# Chaque migration est un tuple (version, description, étapes).
+# Une étape est soit une instruction SQL, soit une fonction recevant la connexion.
+# Les versions doivent être strictement croissantes ; ne jamais modifier une migration publiée.
+MIGRATIONS = [
+    (1, "Index secondaires des filtres et des compétences", [
+        'CREATE INDEX IF NOT EXISTS idx_taches_assigne_a ON taches (assigne_a)',
+        'CREATE INDEX IF NOT EXISTS idx_taches_statut ON taches (statut)',
+        'CREATE INDEX IF NOT EXISTS idx_taches_id_projet ON taches (id_projet)',
+        'CREATE INDEX IF NOT EXISTS idx_taches_echeance ON taches (echeance)',
+        'CREATE INDEX IF NOT EXISTS idx_taches_cree_le ON taches (cree_le)',
+        'CREATE INDEX IF NOT EXISTS idx_competences_taches_tache_id ON competences_taches (tache_id)',
+        'CREATE INDEX IF NOT EXISTS idx_competences_membres_membre_id ON competences_membres (membre_id)',
+    ]),
+    (2, "Index des tris et filtres du tableau de bord", [
+        'CREATE INDEX IF NOT EXISTS idx_taches_priorite_echeance ON taches (priorite, echeance)',
+        'CREATE INDEX IF NOT EXISTS idx_projets_cree_le ON projets (cree_le)',
+        'CREATE INDEX IF NOT EXISTS idx_membres_equipe_nom ON membres_equipe (nom)',
+    ]),
+    (3, "Index couvrant des statistiques des tâches", [
+        'CREATE INDEX IF NOT EXISTS idx_taches_statut_priorite_echeance ON taches (statut, priorite, echeance)',
+    ]),
+    (4, "Index plein texte FTS5 des tâches et des projets", [
+        # Tables FTS à contenu externe : le texte reste dans taches/projets, seul l'index est stocké
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS taches_fts USING fts5(
+               titre, description, content='taches', content_rowid='id',
+               tokenize='unicode61 remove_diacritics 2', prefix='2 3')''',
+        '''CREATE TRIGGER IF NOT EXISTS taches_fts_insertion AFTER INSERT ON taches BEGIN
+               INSERT INTO taches_fts (rowid, titre, description) VALUES (new.id, new.titre, new.description);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS taches_fts_suppression AFTER DELETE ON taches BEGIN
+               INSERT INTO taches_fts (taches_fts, rowid, titre, description)
+               VALUES ('delete', old.id, old.titre, old.description);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS taches_fts_modification AFTER UPDATE OF titre, description ON taches BEGIN
+               INSERT INTO taches_fts (taches_fts, rowid, titre, description)
+               VALUES ('delete', old.id, old.titre, old.description);
+               INSERT INTO taches_fts (rowid, titre, description) VALUES (new.id, new.titre, new.description);
+           END''',
+        "INSERT INTO taches_fts (taches_fts) VALUES ('rebuild')",
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS projets_fts USING fts5(
+               nom, description, content='projets', content_rowid='id',
+               tokenize='unicode61 remove_diacritics 2', prefix='2 3')''',
+        '''CREATE TRIGGER IF NOT EXISTS projets_fts_insertion AFTER INSERT ON projets BEGIN
+               INSERT INTO projets_fts (rowid, nom, description) VALUES (new.id, new.nom, new.description);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS projets_fts_suppression AFTER DELETE ON projets BEGIN
+               INSERT INTO projets_fts (projets_fts, rowid, nom, description)
+               VALUES ('delete', old.id, old.nom, old.description);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS projets_fts_modification AFTER UPDATE OF nom, description ON projets BEGIN
+               INSERT INTO projets_fts (projets_fts, rowid, nom, description)
+               VALUES ('delete', old.id, old.nom, old.description);
+               INSERT INTO projets_fts (rowid, nom, description) VALUES (new.id, new.nom, new.description);
+           END''',
+        "INSERT INTO projets_fts (projets_fts) VALUES ('rebuild')",
+    ]),
+    (5, "Dictionnaire des compétences normalisées référencé par ID", [
+        _normaliser_competences,
+    ]),
+    (6, "Compteurs de modifications par table pour la détection des changements", [
+        '''CREATE TABLE IF NOT EXISTS versions_donnees (
+               nom_table TEXT PRIMARY KEY,
+               version INTEGER NOT NULL DEFAULT 0
+           ) WITHOUT ROWID''',
+        "INSERT OR IGNORE INTO versions_donnees (nom_table) VALUES ('projets'), ('taches'), ('membres_equipe')",
+        *_declencheurs_version('projets', 'projets'),
+        *_declencheurs_version('taches', 'taches'),
+        *_declencheurs_version('competences_taches', 'taches'),
+        *_declencheurs_version('membres_equipe', 'membres_equipe'),
+        *_declencheurs_version('competences_membres', 'membres_equipe'),
+    ]),
+    (7, "Charge de travail des membres tenue par des déclencheurs sur les tâches", [
+        # Une tâche compte dans la charge de son assignataire tant qu'elle n'est pas terminée
+        '''CREATE TRIGGER IF NOT EXISTS taches_charge_insertion AFTER INSERT ON taches
+           WHEN new.assigne_a IS NOT NULL AND new.statut != 'Terminé' BEGIN
+               UPDATE membres_equipe SET charge_travail_heures = charge_travail_heures + COALESCE(new.heures_estimees, 0)
+               WHERE id = new.assigne_a;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS taches_charge_suppression AFTER DELETE ON taches
+           WHEN old.assigne_a IS NOT NULL AND old.statut != 'Terminé' BEGIN
+               UPDATE membres_equipe SET charge_travail_heures = charge_travail_heures - COALESCE(old.heures_estimees, 0)
+               WHERE id = old.assigne_a;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS taches_charge_modification
+           AFTER UPDATE OF assigne_a, statut, heures_estimees ON taches
+           WHEN old.assigne_a IS NOT new.assigne_a OR old.statut IS NOT new.statut
+                OR old.heures_estimees IS NOT new.heures_estimees BEGIN
+               UPDATE membres_equipe SET charge_travail_heures = charge_travail_heures - COALESCE(old.heures_estimees, 0)
+               WHERE id = old.assigne_a AND old.statut != 'Terminé';
+               UPDATE membres_equipe SET charge_travail_heures = charge_travail_heures + COALESCE(new.heures_estimees, 0)
+               WHERE id = new.assigne_a AND new.statut != 'Terminé';
+           END''',
+        # Corriger les charges accumulées jusqu'ici par l'application
+        RECALCUL_CHARGES_TRAVAIL,
+    ]),
+    (8, "Compteurs de tâches dénormalisés sur les projets", [
+        'ALTER TABLE projets ADD COLUMN nb_taches INTEGER NOT NULL DEFAULT 0',
+        'ALTER TABLE projets ADD COLUMN nb_terminees INTEGER NOT NULL DEFAULT 0',
+        'ALTER TABLE projets ADD COLUMN heures_totales INTEGER NOT NULL DEFAULT 0',
+        '''CREATE TRIGGER IF NOT EXISTS taches_compteurs_insertion AFTER INSERT ON taches
+           WHEN new.id_projet IS NOT NULL BEGIN
+               UPDATE projets SET nb_taches = nb_taches + 1,
+                                  nb_terminees = nb_terminees + (new.statut = 'Terminé'),
+                                  heures_totales = heures_totales + COALESCE(new.heures_estimees, 0)
+               WHERE id = new.id_projet;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS taches_compteurs_suppression AFTER DELETE ON taches
+           WHEN old.id_projet IS NOT NULL BEGIN
+               UPDATE projets SET nb_taches = nb_taches - 1,
+                                  nb_terminees = nb_terminees - (old.statut = 'Terminé'),
+                                  heures_totales = heures_totales - COALESCE(old.heures_estimees, 0)
+               WHERE id = old.id_projet;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS taches_compteurs_modification
+           AFTER UPDATE OF id_projet, statut, heures_estimees ON taches
+           WHEN old.id_projet IS NOT new.id_projet OR old.statut IS NOT new.statut
+                OR old.heures_estimees IS NOT new.heures_estimees BEGIN
+               UPDATE projets SET nb_taches = nb_taches - 1,
+                                  nb_terminees = nb_terminees - (old.statut = 'Terminé'),
+                                  heures_totales = heures_totales - COALESCE(old.heures_estimees, 0)
+               WHERE id = old.id_projet;
+               UPDATE projets SET nb_taches = nb_taches + 1,
+                                  nb_terminees = nb_terminees + (new.statut = 'Terminé'),
+                                  heures_totales = heures_totales + COALESCE(new.heures_estimees, 0)
+               WHERE id = new.id_projet;
+           END''',
+        RECALCUL_COMPTEURS_PROJETS,
+    ]),
+    (9, "Historique des assignations alimenté par des déclencheurs", [
+        "ALTER TABLE assignations_taches ADD COLUMN type TEXT NOT NULL DEFAULT 'assignation'",
+        'CREATE INDEX IF NOT EXISTS idx_assignations_membre_date ON assignations_taches (membre_id, assigne_le)',
+        'CREATE INDEX IF NOT EXISTS idx_assignations_tache_date ON assignations_taches (tache_id, assigne_le)',
+        'CREATE INDEX IF NOT EXISTS idx_assignations_date ON assignations_taches (assigne_le)',
+        # Point de départ : les assignations en cours, datées de la dernière modification de la tâche
+        '''INSERT INTO assignations_taches (membre_id, tache_id, assigne_le, type)
+           SELECT assigne_a, id, mis_a_jour_le, 'assignation' FROM taches WHERE assigne_a IS NOT NULL''',
+        f'''CREATE TRIGGER IF NOT EXISTS taches_historique_insertion AFTER INSERT ON taches
+            WHEN new.assigne_a IS NOT NULL BEGIN
+                INSERT INTO assignations_taches (membre_id, tache_id, assigne_le, type)
+                VALUES (new.assigne_a, new.id, {_HORODATAGE}, 'assignation');
+            END''',
+        f'''CREATE TRIGGER IF NOT EXISTS taches_historique_modification AFTER UPDATE OF assigne_a ON taches
+            WHEN old.assigne_a IS NOT new.assigne_a BEGIN
+                INSERT INTO assignations_taches (membre_id, tache_id, assigne_le, type)
+                SELECT old.assigne_a, old.id, {_HORODATAGE}, 'desassignation' WHERE old.assigne_a IS NOT NULL;
+                INSERT INTO assignations_taches (membre_id, tache_id, assigne_le, type)
+                SELECT new.assigne_a, new.id, {_HORODATAGE}, 'assignation' WHERE new.assigne_a IS NOT NULL;
+            END''',
+        f'''CREATE TRIGGER IF NOT EXISTS taches_historique_suppression AFTER DELETE ON taches
+            WHEN old.assigne_a IS NOT NULL BEGIN
+                INSERT INTO assignations_taches (membre_id, tache_id, assigne_le, type)
+                VALUES (old.assigne_a, old.id, {_HORODATAGE}, 'desassignation');
+            END''',
+        # Tâches en cours d'un membre : lues par l'index sans parcourir la table
+        # (l'index composé remplace celui sur assigne_a seul)
+        'CREATE INDEX IF NOT EXISTS idx_taches_assigne_a_statut ON taches (assigne_a, statut)',
+        'DROP INDEX IF EXISTS idx_taches_assigne_a',
+    ]),
+    (10, "Archive des tâches terminées", [
+        # Mêmes colonnes que taches ; les tâches gardent leur ID (jamais réutilisé : AUTOINCREMENT)
+        '''CREATE TABLE IF NOT EXISTS taches_archive (
+               id INTEGER PRIMARY KEY,
+               titre TEXT NOT NULL,
+               description TEXT,
+               id_projet INTEGER,
+               priorite TEXT NOT NULL,
+               statut TEXT NOT NULL,
+               assigne_a INTEGER,
+               echeance TEXT,
+               heures_estimees INTEGER DEFAULT 0,
+               cree_le TEXT NOT NULL,
+               mis_a_jour_le TEXT NOT NULL,
+               archive_le TEXT NOT NULL
+           )''',
+        '''CREATE TABLE IF NOT EXISTS competences_taches_archive (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               tache_id INTEGER NOT NULL,
+               competence_id INTEGER NOT NULL,
+               UNIQUE (tache_id, competence_id)
+           )''',
+        'CREATE INDEX IF NOT EXISTS idx_taches_archive_id_projet ON taches_archive (id_projet)',
+        'CREATE INDEX IF NOT EXISTS idx_taches_archive_assigne_a ON taches_archive (assigne_a)',
+        'CREATE INDEX IF NOT EXISTS idx_taches_archive_cree_le ON taches_archive (cree_le)',
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS taches_archive_fts USING fts5(
+               titre, description, content='taches_archive', content_rowid='id',
+               tokenize='unicode61 remove_diacritics 2', prefix='2 3')''',
+        '''CREATE TRIGGER IF NOT EXISTS taches_archive_fts_insertion AFTER INSERT ON taches_archive BEGIN
+               INSERT INTO taches_archive_fts (rowid, titre, description) VALUES (new.id, new.titre, new.description);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS taches_archive_fts_suppression AFTER DELETE ON taches_archive BEGIN
+               INSERT INTO taches_archive_fts (taches_archive_fts, rowid, titre, description)
+               VALUES ('delete', old.id, old.titre, old.description);
+           END''',
+        # Les tâches archivées restent comptées dans les compteurs de leur projet
+        '''CREATE TRIGGER IF NOT EXISTS taches_archive_compteurs_insertion AFTER INSERT ON taches_archive
+           WHEN new.id_projet IS NOT NULL BEGIN
+               UPDATE projets SET nb_taches = nb_taches + 1,
+                                  nb_terminees = nb_terminees + (new.statut = 'Terminé'),
+                                  heures_totales = heures_totales + COALESCE(new.heures_estimees, 0)
+               WHERE id = new.id_projet;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS taches_archive_compteurs_suppression AFTER DELETE ON taches_archive
+           WHEN old.id_projet IS NOT NULL BEGIN
+               UPDATE projets SET nb_taches = nb_taches - 1,
+                                  nb_terminees = nb_terminees - (old.statut = 'Terminé'),
+                                  heures_totales = heures_totales - COALESCE(old.heures_estimees, 0)
+               WHERE id = old.id_projet;
+           END''',
+        *_declencheurs_version('taches_archive', 'taches'),
+        # Archiver une tâche (copie dans taches_archive puis suppression) n'est pas une désassignation
+        'DROP TRIGGER IF EXISTS taches_historique_suppression',
+        f'''CREATE TRIGGER IF NOT EXISTS taches_historique_suppression AFTER DELETE ON taches
+            WHEN old.assigne_a IS NOT NULL
+                 AND NOT EXISTS (SELECT 1 FROM taches_archive WHERE id = old.id) BEGIN
+                INSERT INTO assignations_taches (membre_id, tache_id, assigne_le, type)
+                VALUES (old.assigne_a, old.id, {_HORODATAGE}, 'desassignation');
+            END''',
+        # Tâches actives et archivées, pour les recherches qui incluent les archives
+        f'''CREATE VIEW IF NOT EXISTS toutes_taches AS
+            SELECT {_COLONNES_TACHES} FROM taches
+            UNION ALL
+            SELECT {_COLONNES_TACHES} FROM taches_archive''',
+    ]),
+    (11, "Version des lignes pour le verrouillage optimiste", [
+        # Incrémentée par les mises à jour du gestionnaire de données (jamais par les déclencheurs,
+        # qui ne tiennent que des colonnes calculées) et vérifiée dans leur clause WHERE
+        *[f'ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1'
+          for table in ('projets', 'taches', 'membres_equipe', 'taches_archive')],
+        'DROP VIEW IF EXISTS toutes_taches',
+        f'''CREATE VIEW toutes_taches AS
+            SELECT {_COLONNES_TACHES}, version FROM taches
+            UNION ALL
+            SELECT {_COLONNES_TACHES}, version FROM taches_archive''',
+    ]),
+    (12, "Index des statistiques sur les tâches archivées", [
+        # Les statistiques comptent aussi les tâches archivées, comme les compteurs des projets
+        'CREATE INDEX IF NOT EXISTS idx_taches_archive_statut_priorite_echeance '
+        'ON taches_archive (statut, priorite, echeance)',
+    ]),
+]
+
+def version_schema(conn: sqlite3.Connection) -> int:
+    """Retourner la version actuelle du schéma"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def appliquer_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Appliquer dans l'ordre les migrations plus récentes que la version du schéma.
+    Chaque migration s'exécute dans sa propre transaction avec la mise à jour de
+    user_version : une base existante est mise à niveau sur place, et une migration
+    qui échoue est annulée sans laisser le schéma à moitié modifié.
+    Retourne la version finale du schéma.
+    """
+    version = version_schema(conn)
+    
+    for version_migration, description, etapes in MIGRATIONS:
+        if version_migration <= version:
+            continue
+        
+        try:
+            # IMMEDIATE : un autre processus ne peut pas appliquer la même migration en parallèle
+            conn.execute('BEGIN IMMEDIATE')
+            if version_schema(conn) >= version_migration:
+                conn.rollback()
+                version = version_schema(conn)
+                continue
+            for etape in etapes:
+                if callable(etape):
+                    etape(conn)
+                else:
+                    conn.execute(etape)
+            conn.execute(f'PRAGMA user_version = {int(version_migration)}')
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Échec de la migration {version_migration} ({description}) : {e}") from e
+        
+        version = version_migration
+    
+    return version
@@ -19,9 +19,14 @@ class Projet:
         self.date_debut = date_debut
         self.date_fin = date_fin
         self.cree_par = cree_par
+        # Compteurs des tâches du projet, tenus par la base de données (lecture seule)
+        self.nb_taches = 0
+        self.nb_terminees = 0
+        self.heures_totales = 0
         self.cree_le = datetime.now().isoformat()
         self.mis_a_jour_le = datetime.now().isoformat()
-        
+        self.version: Optional[int] = None  # Version de la ligne lue (verrouillage optimiste), tenue par le stockage
+    
     def vers_dict(self) -> Dict[str, Any]:
         """Convertir le projet en dictionnaire pour la sérialisation JSON"""
         return {
@@ -61,9 +66,19 @@ class Projet:
         )
         projet.id = ligne['id']
         projet.statut = ligne.get('statut', cls.STATUT_ACTIF)
+        projet.nb_taches = ligne.get('nb_taches', 0)
+        projet.nb_terminees = ligne.get('nb_terminees', 0)
+        projet.heures_totales = ligne.get('heures_totales', 0)
         projet.cree_le = ligne.get('cree_le', datetime.now().isoformat())
         projet.mis_a_jour_le = ligne.get('mis_a_jour_le', datetime.now().isoformat())
+        projet.version = ligne.get('version')
         return projet
     
+    def obtenir_progres(self) -> int:
+        """Pourcentage de tâches terminées (0 si le projet n'a aucune tâche)"""
+        if self.nb_taches == 0:
+            return 0
+        return int((self.nb_terminees / self.nb_taches) * 100)
+    
     def __str__(self):
         return f"Projet({self.nom})"
@@ -0,0 +1,300 @@
+"""
+Interface de stockage des données de l'application de suivi des projets
+Deux implémentations : GestionnaireDonnees (SQLite, sur disque) et
+GestionnaireDonneesMemoire (dictionnaires et index en mémoire)
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional
+from modeles.projet import Projet
+from modeles.tache import Tache
+from modeles.membre_equipe import MembreEquipe
+from modeles.colonnes_taches import ColonnesTaches
+
+# Nombre de lignes par page pour la pagination par clé (keyset)
+TAILLE_PAGE = 200
+
+# Nombre de lignes lues par fetchmany dans les itérateurs
+TAILLE_LOT_LECTURE = 1000
+
+# Types d'événements de l'historique des assignations
+TYPE_ASSIGNATION = 'assignation'
+TYPE_DESASSIGNATION = 'desassignation'
+
+# Archivage : ancienneté par défaut (jours depuis la dernière modification) et tâches par transaction
+JOURS_AVANT_ARCHIVAGE = 90
+TAILLE_LOT_ARCHIVAGE = 500
+
+# Tables dont version_donnees() suit les modifications
+TABLES_VERSIONNEES = ('projets', 'taches', 'membres_equipe')
+
+# Version d'une ligne à sa création (verrouillage optimiste : +1 à chaque mise à jour)
+VERSION_INITIALE = 1
+
+class ConflitConcurrence(Exception):
+    """
+    Mise à jour refusée : l'enregistrement a été modifié ou supprimé par un autre utilisateur
+    (ou un autre processus) depuis sa lecture. Rien n'a été écrit ; recharger les données
+    puis refaire la modification.
+    """
+    
+    def __init__(self, table: str, ids: List[int]):
+        self.table = table
+        self.ids = list(ids)
+        super().__init__(f"Enregistrements modifiés ou supprimés entre-temps ({table}) : "
+                         f"{', '.join(map(str, self.ids))}")
+
+class StockageDonnees(ABC):
+    """
+    Opérations communes à tous les stockages. Les méthodes abstraites sont propres à chaque
+    implémentation ; les autres sont construites dessus et peuvent être redéfinies quand
+    le stockage sait faire mieux (requête SQL dédiée, par exemple).
+    Règles communes :
+    - les objets retournés sont des copies : les modifier n'a aucun effet avant leur sauvegarde ;
+    - les compétences sont normalisées (casse, espaces) et identifiées par des IDs entiers ;
+    - la charge de travail des membres, les compteurs de tâches des projets et l'historique
+      des assignations sont tenus par le stockage, jamais par l'appelant ;
+    - les tâches archivées sont exclues des lectures, sauf avec rechercher_taches(inclure_archives=True),
+      mais restent comptées dans les compteurs de leur projet ;
+    - les mises à jour sont optimistes : un objet lu porte la version de sa ligne, et sa
+      sauvegarde lève ConflitConcurrence si la ligne a changé depuis (un objet sans version,
+      construit hors du stockage, écrase la ligne sans vérification).
+    """
+    
+    # Généralités
+    @abstractmethod
+    def fermer(self):
+        """Libérer les ressources du stockage"""
+    
+    @abstractmethod
+    def transaction(self):
+        """
+        Gestionnaire de contexte regroupant les écritures du bloc : tout est annulé si une
+        exception est levée. Un bloc imbriqué rejoint le bloc englobant.
+        """
+    
+    @abstractmethod
+    def creer_instantane(self, lecture_seule: bool = True) -> 'StockageDonnees':
+        """Retourner une copie en mémoire des données (brouillon si lecture_seule=False)"""
+    
+    @abstractmethod
+    def version_donnees(self) -> Dict[str, int]:
+        """Retourner un compteur de modifications par table de TABLES_VERSIONNEES"""
+    
+    def donnees_modifiees(self, version: Optional[Dict[str, int]],
+                          tables: tuple = TABLES_VERSIONNEES) -> bool:
+        """Indiquer si l'une des tables a changé depuis une version retournée par version_donnees()"""
+        if version is None:
+            return True
+        actuelle = self.version_donnees()
+        return any(actuelle.get(table) != version.get(table) for table in tables)
+    
+    # Projets
+    @abstractmethod
+    def charger_projets(self) -> List[Projet]:
+        """Charger tous les projets, des plus récents aux plus anciens"""
+    
+    @abstractmethod
+    def charger_page_projets(self, apres: Optional[tuple] = None, taille: int = TAILLE_PAGE,
+                             statut: Optional[str] = None, texte: Optional[str] = None):
+        """Charger une page de projets ; retourne (projets, curseur_suivant)"""
+    
+    def iterer_projets(self, taille_lot: int = TAILLE_LOT_LECTURE) -> Iterator[Projet]:
+        """Parcourir tous les projets, des plus récents aux plus anciens"""
+        yield from self.charger_projets()
+    
+    @abstractmethod
+    def rechercher_texte_projets(self, texte: str, limite: int = 50) -> List[Projet]:
+        """Recherche plein texte des projets (nom et description), classée par pertinence"""
+    
+    def ajouter_projet(self, projet: Projet):
+        """Ajouter un nouveau projet"""
+        self.ajouter_projets_en_lot([projet])
+    
+    @abstractmethod
+    def ajouter_projets_en_lot(self, projets: List[Projet]) -> List[int]:
+        """Ajouter plusieurs projets ; retourne leurs IDs"""
+    
+    @abstractmethod
+    def mettre_a_jour_projet(self, projet: Projet):
+        """Mettre à jour un projet existant"""
+    
+    @abstractmethod
+    def supprimer_projet(self, id_projet: int):
+        """Supprimer un projet"""
+    
+    @abstractmethod
+    def obtenir_projet(self, id_projet: int) -> Optional[Projet]:
+        """Obtenir un projet par son ID"""
+    
+    @abstractmethod
+    def noms_projets(self, ids_projets: List[int]) -> Dict[int, str]:
+        """Retourner {id: nom} des projets donnés (les IDs inexistants sont absents)"""
+    
+    # Tâches
+    def charger_taches(self) -> List[Tache]:
+        """Charger toutes les tâches avec leurs compétences"""
+        return self.rechercher_taches()
+    
+    @abstractmethod
+    def rechercher_taches(self, statut: Optional[str] = None, priorite: Optional[str] = None,
+                          id_projet: Optional[int] = None, assigne_a: Optional[int] = None,
+                          echeance_avant: Optional[str] = None, texte: Optional[str] = None,
+                          tri: str = 'recentes', limite: Optional[int] = None,
+                          decalage: Optional[int] = None, apres: Optional[tuple] = None,
+                          inclure_archives: bool = False) -> List[Tache]:
+        """Rechercher des tâches (voir GestionnaireDonnees.rechercher_taches)"""
+    
+    @abstractmethod
+    def rechercher_texte(self, texte: str, limite: int = 50) -> List[Tache]:
+        """Recherche plein texte des tâches (titre et description), classée par pertinence"""
+    
+    def iterer_taches(self, taille_lot: int = TAILLE_LOT_LECTURE, **filtres) -> Iterator[Tache]:
+        """Parcourir les tâches (filtres et tri de rechercher_taches)"""
+        yield from self.rechercher_taches(**filtres)
+    
+    @abstractmethod
+    def colonnes_taches(self, taille_lot: int = TAILLE_LOT_LECTURE) -> ColonnesTaches:
+        """Instantané en colonnes de toutes les tâches, construit sans objets Tache"""
+    
+    def charger_page_taches(self, apres: Optional[tuple] = None, taille: int = TAILLE_PAGE,
+                            tri: str = 'recentes', **filtres):
+        """
+        Charger une page de tâches, des plus récentes aux plus anciennes (ou l'inverse avec
+        tri='anciennes'). Les filtres sont ceux de rechercher_taches ; apres est le curseur
+        (cree_le, id) retourné par la page précédente.
+        Retourne (taches, curseur_suivant) ; curseur_suivant vaut None à la dernière page.
+        """
+        taches = self.rechercher_taches(tri=tri, limite=taille, apres=apres, **filtres)
+        return taches, self._curseur_suivant(taches, taille, lambda t: (t.cree_le, t.id))
+    
+    def compter_taches_par_projet(self, ids_projets: List[int]) -> Dict[int, int]:
+        """Compter les tâches de chaque projet donné"""
+        comptes = {}
+        for id_projet in ids_projets:
+            nombre = len(self.rechercher_taches(id_projet=id_projet))
+            if nombre:
+                comptes[id_projet] = nombre
+        return comptes
+    
+    def compter_taches_actives_par_membre(self, ids_membres: List[int]) -> Dict[int, int]:
+        """Compter les tâches non terminées assignées à chaque membre donné"""
+        return {id_membre: len(taches)
+                for id_membre, taches in self.taches_actuelles_par_membre(ids_membres).items()}
+    
+    def ajouter_tache(self, tache: Tache):
+        """Ajouter une nouvelle tâche"""
+        self.ajouter_taches_en_lot([tache])
+    
+    def mettre_a_jour_tache(self, tache: Tache):
+        """Mettre à jour une tâche existante"""
+        self.mettre_a_jour_taches_en_lot([tache])
+    
+    @abstractmethod
+    def ajouter_taches_en_lot(self, taches: List[Tache]) -> List[int]:
+        """Ajouter plusieurs tâches et leurs compétences ; retourne leurs IDs"""
+    
+    @abstractmethod
+    def mettre_a_jour_taches_en_lot(self, taches: List[Tache]) -> List[int]:
+        """Mettre à jour plusieurs tâches existantes et leurs compétences"""
+    
+    @abstractmethod
+    def supprimer_tache(self, id_tache: int):
+        """Supprimer une tâche"""
+    
+    @abstractmethod
+    def obtenir_tache(self, id_tache: int) -> Optional[Tache]:
+        """Obtenir une tâche par son ID"""
+    
+    @abstractmethod
+    def archiver_taches_terminees(self, jours: int = JOURS_AVANT_ARCHIVAGE,
+                                  taille_lot: int = TAILLE_LOT_ARCHIVAGE) -> int:
+        """
+        Déplacer vers l'archive, avec leurs compétences, les tâches terminées non modifiées
+        depuis jours jours, par transactions de taille_lot tâches ; retourne le nombre archivé
+        """
+    
+    # Membres d'équipe
+    @abstractmethod
+    def charger_membres_equipe(self, avec_taches: bool = False) -> List[MembreEquipe]:
+        """
+        Charger tous les membres d'équipe avec leurs compétences, triés par nom
+        (taches_actuelles n'est renseignée qu'avec avec_taches=True)
+        """
+    
+    @abstractmethod
+    def charger_page_membres(self, apres: Optional[tuple] = None, taille: int = TAILLE_PAGE,
+                             texte: Optional[str] = None):
+        """Charger une page de membres triés par nom ; retourne (membres, curseur_suivant)"""
+    
+    def iterer_membres(self, taille_lot: int = TAILLE_LOT_LECTURE) -> Iterator[MembreEquipe]:
+        """Parcourir tous les membres d'équipe, triés par nom"""
+        yield from self.charger_membres_equipe()
+    
+    def ajouter_membre_equipe(self, membre: MembreEquipe):
+        """Ajouter un nouveau membre d'équipe"""
+        self.ajouter_membres_en_lot([membre])
+    
+    @abstractmethod
+    def ajouter_membres_en_lot(self, membres: List[MembreEquipe]) -> List[int]:
+        """Ajouter plusieurs membres d'équipe et leurs compétences ; retourne leurs IDs"""
+    
+    @abstractmethod
+    def mettre_a_jour_membre_equipe(self, membre: MembreEquipe):
+        """Mettre à jour un membre d'équipe existant (sauf sa charge de travail)"""
+    
+    @abstractmethod
+    def recalculer_charges_travail(self) -> int:
+        """Recalculer la charge de travail de tous les membres ; retourne le nombre de corrections"""
+    
+    @abstractmethod
+    def supprimer_membre_equipe(self, id_membre: int):
+        """Supprimer un membre d'équipe"""
+    
+    @abstractmethod
+    def obtenir_membre_equipe(self, id_membre: int) -> Optional[MembreEquipe]:
+        """Obtenir un membre d'équipe par son ID"""
+    
+    @abstractmethod
+    def noms_membres(self, ids_membres: List[int]) -> Dict[int, str]:
+        """Retourner {id: nom} des membres d'équipe donnés (les IDs inexistants sont absents)"""
+    
+    # Compétences et assignations
+    @abstractmethod
+    def charger_competences(self) -> Dict[int, str]:
+        """Retourner le dictionnaire des compétences {id: nom}"""
+    
+    @abstractmethod
+    def historique_assignations(self, membre_id: Optional[int] = None, tache_id: Optional[int] = None,
+                                debut: Optional[str] = None, fin: Optional[str] = None,
+                                limite: Optional[int] = None) -> List[dict]:
+        """Lire l'historique des assignations (voir GestionnaireDonnees.historique_assignations)"""
+    
+    @abstractmethod
+    def taches_actuelles_par_membre(self, ids_membres: Optional[List[int]] = None) -> Dict[int, List[int]]:
+        """Retourner les IDs des tâches non terminées assignées à chaque membre"""
+    
+    # Méthodes utilitaires
+    @abstractmethod
+    def obtenir_statistiques(self) -> dict:
+        """Obtenir les statistiques générales (voir GestionnaireDonnees.obtenir_statistiques)"""
+    
+    @staticmethod
+    def _curseur_suivant(elements: list, taille: int, cle):
+        """Curseur de la page suivante (clé du dernier élément), ou None si la page est incomplète"""
+        if len(elements) < taille:
+            return None
+        return cle(elements[-1])
+    
+    # Méthodes de compatibilité (pour maintenir l'interface existante)
+    def sauvegarder_projets(self, projets: List[Projet]):
+        """Compatibilité - ne fait rien car le stockage sauvegarde automatiquement"""
+        pass
+    
+    def sauvegarder_taches(self, taches: List[Tache]):
+        """Compatibilité - ne fait rien car le stockage sauvegarde automatiquement"""
+        pass
+    
+    def sauvegarder_membres_equipe(self, membres: List[MembreEquipe]):
+        """Compatibilité - ne fait rien car le stockage sauvegarde automatiquement"""
+        pass
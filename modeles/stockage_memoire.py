@@ -0,0 +1,799 @@
+"""
+Stockage en mémoire pour l'application de suivi des projets
+Mêmes règles que le stockage SQLite (compétences normalisées, charges de travail,
+compteurs des projets, historique des assignations) sans aucun accès disque :
+pour les tests, les bancs d'essai et les simulations du moteur d'assignation
+"""
+
+import copy
+import itertools
+import re
+import unicodedata
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from modeles.colonnes_taches import (ColonnesTaches, AUCUN, code_priorite, code_statut, jour_echeance,
+                                     construire_colonnes)
+from modeles.competences import cle_competence, nom_competence, interner_competences
+from modeles.stockage import (StockageDonnees, ConflitConcurrence, TAILLE_PAGE, TAILLE_LOT_LECTURE, TYPE_ASSIGNATION,
+                              TYPE_DESASSIGNATION, TABLES_VERSIONNEES, JOURS_AVANT_ARCHIVAGE, TAILLE_LOT_ARCHIVAGE,
+                              VERSION_INITIALE)
+from modeles.projet import Projet
+from modeles.tache import Tache
+from modeles.membre_equipe import MembreEquipe
+
+# Tris autorisés pour rechercher_taches, et ceux qui acceptent un curseur (cree_le, id)
+TRIS_TACHES = ('recentes', 'anciennes', 'echeance', 'priorite', 'titre')
+TRIS_PAGINABLES = ('recentes', 'anciennes')
+
+# Ordre des priorités du tri 'priorite' (les autres valeurs viennent après)
+ORDRE_PRIORITES = {Tache.PRIORITE_HAUTE: 0, Tache.PRIORITE_MOYENNE: 1}
+
+# Repli de casse ASCII seulement, comme COLLATE NOCASE et LIKE de SQLite
+_MINUSCULES_ASCII = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+# Attributs constituant l'état : copiés par creer_instantane()
+_ATTRIBUTS_ETAT = ('_projets', '_taches', '_membres', '_sequences', '_competences', '_ids_par_cle',
+                   '_competences_taches', '_competences_membres', '_assignations',
+                   '_archives', '_competences_taches_archive',
+                   '_taches_par_projet', '_taches_par_membre', '_versions')
+
+# Marque, dans le journal d'une transaction, une entrée qui n'existait pas avant d'être écrite
+_ABSENT = object()
+
+def _plier(texte: str) -> str:
+    """Retirer les accents et la casse, comme le tokenizer unicode61 remove_diacritics de FTS5"""
+    decompose = unicodedata.normalize('NFD', texte)
+    return ''.join(c for c in decompose if not unicodedata.combining(c)).casefold()
+
+def _mots(texte: str) -> List[str]:
+    """Découper un texte en mots pliés (lettres et chiffres)"""
+    return re.findall(r'[^\W_]+', _plier(texte or ''))
+
+def _pertinence(termes: List[str], *champs: str) -> int:
+    """
+    Nombre de mots des champs commençant par un des termes, ou 0 si un terme ne correspond
+    à aucun mot (tous les termes sont requis, comme dans une requête FTS5 "terme"*)
+    """
+    mots = [mot for champ in champs for mot in _mots(champ)]
+    total = 0
+    for terme in termes:
+        correspondances = sum(1 for mot in mots if mot.startswith(terme))
+        if not correspondances:
+            return 0
+        total += correspondances
+    return total
+
+def _nocase(texte: Optional[str]) -> str:
+    """Clé de comparaison équivalente à COLLATE NOCASE"""
+    return (texte or '').translate(_MINUSCULES_ASCII)
+
+class GestionnaireDonneesMemoire(StockageDonnees):
+    """
+    Stockage en dictionnaires : une ligne (dict) par projet, tâche et membre, et des index
+    tâches par projet et par assignataire. Non partagé entre threads.
+    """
+    
+    def __init__(self, lecture_seule: bool = False):
+        """Créer un stockage vide"""
+        self.lecture_seule = lecture_seule
+        
+        self._projets: Dict[int, dict] = {}
+        self._taches: Dict[int, dict] = {}
+        self._membres: Dict[int, dict] = {}
+        self._sequences: Dict[str, int] = {'projets': 0, 'taches': 0, 'membres_equipe': 0,
+                                           'competences': 0, 'assignations_taches': 0}
+        
+        # Dictionnaire des compétences et liens entité → IDs de compétences (ordre de saisie)
+        self._competences: Dict[int, str] = {}
+        self._ids_par_cle: Dict[str, int] = {}
+        self._competences_taches: Dict[int, List[int]] = {}
+        self._competences_membres: Dict[int, List[int]] = {}
+        
+        # Tâches archivées (lignes avec archive_le) et leurs compétences
+        self._archives: Dict[int, dict] = {}
+        self._competences_taches_archive: Dict[int, List[int]] = {}
+        
+        # Historique des assignations, dans l'ordre d'écriture
+        self._assignations: List[dict] = []
+        
+        # Index secondaires des tâches
+        self._taches_par_projet: Dict[int, Set[int]] = {}
+        self._taches_par_membre: Dict[int, Set[int]] = {}
+        
+        self._versions: Dict[str, int] = {table: 0 for table in TABLES_VERSIONNEES}
+        
+        # Journal d'annulation de la transaction en cours (None hors transaction) :
+        # (dictionnaire, clé, valeur avant écriture) dans l'ordre des écritures
+        self._journal: Optional[List[Tuple[dict, object, object]]] = None
+    
+    # Généralités
+    def fermer(self):
+        """Rien à libérer : les données disparaissent avec l'objet"""
+        pass
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Regrouper les écritures du bloc : chaque entrée modifiée est journalisée avant sa
+        première écriture (l'état n'est pas copié en entier), et les entrées journalisées,
+        les séquences, les compteurs de versions et l'historique sont restaurés si une
+        exception est levée. Un bloc imbriqué fait partie du bloc le plus externe.
+        """
+        if self._journal is not None:
+            yield self
+            return
+        
+        sequences, versions, nb_assignations = dict(self._sequences), dict(self._versions), len(self._assignations)
+        self._journal = []
+        try:
+            yield self
+        except BaseException:
+            for conteneur, cle, valeur in reversed(self._journal):
+                if valeur is _ABSENT:
+                    conteneur.pop(cle, None)
+                else:
+                    conteneur[cle] = valeur
+            self._sequences, self._versions = sequences, versions
+            del self._assignations[nb_assignations:]
+            raise
+        finally:
+            self._journal = None
+    
+    def creer_instantane(self, lecture_seule: bool = True) -> 'GestionnaireDonneesMemoire':
+        """Retourner une copie indépendante des données"""
+        instantane = GestionnaireDonneesMemoire(lecture_seule)
+        for nom, valeur in self._copier_etat().items():
+            setattr(instantane, nom, valeur)
+        return instantane
+    
+    def version_donnees(self) -> Dict[str, int]:
+        """Retourner un compteur de modifications par table"""
+        return dict(self._versions)
+    
+    # Projets
+    def charger_projets(self) -> List[Projet]:
+        """Charger tous les projets, des plus récents aux plus anciens"""
+        return [self._construire_projet(ligne) for ligne in self._projets_tries()]
+    
+    def charger_page_projets(self, apres: Optional[tuple] = None, taille: int = TAILLE_PAGE,
+                             statut: Optional[str] = None, texte: Optional[str] = None):
+        """Charger une page de projets ; retourne (projets, curseur_suivant)"""
+        termes = _mots(texte) if texte else []
+        projets = []
+        for ligne in self._projets_tries():
+            if len(projets) >= taille:
+                break
+            if statut is not None and ligne['statut'] != statut:
+                continue
+            if termes and not _pertinence(termes, ligne['nom'], ligne['description']):
+                continue
+            if apres is not None and (ligne['cree_le'], ligne['id']) >= tuple(apres):
+                continue
+            projets.append(self._construire_projet(ligne))
+        return projets, self._curseur_suivant(projets, taille, lambda p: (p.cree_le, p.id))
+    
+    def rechercher_texte_projets(self, texte: str, limite: int = 50) -> List[Projet]:
+        """Recherche plein texte des projets, classée par nombre de mots correspondants"""
+        termes = _mots(texte)
+        if not termes:
+            return []
+        scores = [(_pertinence(termes, ligne['nom'], ligne['description']), ligne)
+                  for ligne in self._projets.values()]
+        scores = sorted((s for s in scores if s[0]), key=lambda s: (-s[0], s[1]['id']))
+        return [self._construire_projet(ligne) for _, ligne in scores[:limite]]
+    
+    def ajouter_projets_en_lot(self, projets: List[Projet]) -> List[int]:
+        """Ajouter plusieurs projets"""
+        self._verifier_ecriture()
+        maintenant = self._maintenant()
+        with self.transaction():
+            ids = []
+            for projet in projets:
+                id_projet = self._nouvel_id('projets')
+                self._noter(self._projets, id_projet)
+                self._projets[id_projet] = {
+                    'id': id_projet, 'nom': projet.nom, 'description': projet.description,
+                    'statut': projet.statut, 'date_debut': projet.date_debut, 'date_fin': projet.date_fin,
+                    'cree_le': maintenant, 'mis_a_jour_le': maintenant, 'version': VERSION_INITIALE,
+                    'nb_taches': 0, 'nb_terminees': 0, 'heures_totales': 0,
+                }
+                self._versions['projets'] += 1
+                ids.append(id_projet)
+        for id_projet, projet in zip(ids, projets):
+            projet.id = id_projet
+            projet.cree_le = maintenant
+            projet.mis_a_jour_le = maintenant
+            projet.version = VERSION_INITIALE
+        return ids
+    
+    def mettre_a_jour_projet(self, projet: Projet):
+        """Mettre à jour un projet existant (ConflitConcurrence s'il a changé depuis sa lecture)"""
+        self._verifier_ecriture()
+        self._verifier_versions(self._projets, 'projets', [projet])
+        maintenant = self._maintenant()
+        ligne = self._projets.get(projet.id)
+        if ligne is not None:
+            self._noter(self._projets, projet.id)
+            ligne.update(nom=projet.nom, description=projet.description, statut=projet.statut,
+                         date_debut=projet.date_debut, date_fin=projet.date_fin, mis_a_jour_le=maintenant,
+                         version=ligne['version'] + 1)
+            self._versions['projets'] += 1
+        projet.mis_a_jour_le = maintenant
+        if projet.version is not None:
+            projet.version += 1
+    
+    def supprimer_projet(self, id_projet: int):
+        """Supprimer un projet (ses tâches gardent leur id_projet, comme en SQLite)"""
+        self._verifier_ecriture()
+        self._noter(self._projets, id_projet)
+        if self._projets.pop(id_projet, None) is not None:
+            self._versions['projets'] += 1
+    
+    def obtenir_projet(self, id_projet: int) -> Optional[Projet]:
+        """Obtenir un projet par son ID"""
+        ligne = self._projets.get(id_projet)
+        return self._construire_projet(ligne) if ligne is not None else None
+    
+    def noms_projets(self, ids_projets: List[int]) -> Dict[int, str]:
+        """Retourner {id: nom} des projets donnés"""
+        return {i: self._projets[i]['nom'] for i in ids_projets if i in self._projets}
+    
+    # Tâches
+    def rechercher_taches(self, statut: Optional[str] = None, priorite: Optional[str] = None,
+                          id_projet: Optional[int] = None, assigne_a: Optional[int] = None,
+                          echeance_avant: Optional[str] = None, texte: Optional[str] = None,
+                          tri: str = 'recentes', limite: Optional[int] = None,
+                          decalage: Optional[int] = None, apres: Optional[tuple] = None,
+                          inclure_archives: bool = False) -> List[Tache]:
+        """Rechercher des tâches, en partant de l'index le plus sélectif disponible"""
+        if tri not in TRIS_TACHES:
+            raise ValueError(f"Tri inconnu : {tri}")
+        if apres is not None and tri not in TRIS_PAGINABLES:
+            raise ValueError(f"Le tri '{tri}' ne permet pas la pagination par curseur")
+        
+        if id_projet is not None:
+            candidats = (self._taches[i] for i in self._taches_par_projet.get(id_projet, ()))
+        elif assigne_a is not None:
+            candidats = (self._taches[i] for i in self._taches_par_membre.get(assigne_a, ()))
+        else:
+            candidats = self._taches.values()
+        if inclure_archives:
+            # Les archives ne sont pas indexées : elles sont parcourues en entier
+            candidats = itertools.chain(candidats, self._archives.values())
+        
+        termes = _mots(texte) if texte else []
+        lignes = []
+        for ligne in candidats:
+            if statut is not None and ligne['statut'] != statut:
+                continue
+            if priorite is not None and ligne['priorite'] != priorite:
+                continue
+            if id_projet is not None and ligne['id_projet'] != id_projet:
+                continue
+            if assigne_a is not None and ligne['assigne_a'] != assigne_a:
+                continue
+            if echeance_avant and not (ligne['echeance'] and ligne['echeance'] < echeance_avant):
+                continue
+            if termes and not _pertinence(termes, ligne['titre'], ligne['description']):
+                continue
+            if apres is not None:
+                cle = (ligne['cree_le'], ligne['id'])
+                if (tri == 'recentes' and cle >= tuple(apres)) or (tri == 'anciennes' and cle <= tuple(apres)):
+                    continue
+            lignes.append(ligne)
+        
+        self._trier_taches(lignes, tri)
+        if limite is not None:
+            debut = decalage or 0
+            lignes = lignes[debut:debut + limite]
+        return [self._construire_tache(ligne) for ligne in lignes]
+    
+    def rechercher_texte(self, texte: str, limite: int = 50) -> List[Tache]:
+        """Recherche plein texte des tâches, classée par nombre de mots correspondants"""
+        termes = _mots(texte)
+        if not termes:
+            return []
+        scores = [(_pertinence(termes, ligne['titre'], ligne['description']), ligne)
+                  for ligne in self._taches.values()]
+        scores = sorted((s for s in scores if s[0]), key=lambda s: (-s[0], s[1]['id']))
+        return [self._construire_tache(ligne) for _, ligne in scores[:limite]]
+    
+    def colonnes_taches(self, taille_lot: int = TAILLE_LOT_LECTURE) -> ColonnesTaches:
+        """Instantané en colonnes de toutes les tâches, codé directement depuis les lignes"""
+        lignes = [(l['id'], l['id_projet'] or AUCUN, l['assigne_a'] or AUCUN, code_priorite(l['priorite']),
+                   code_statut(l['statut']), l['heures_estimees'] or 0, jour_echeance(l['echeance']))
+                  for _, l in sorted(self._taches.items())]
+        return construire_colonnes([lignes])
+    
+    def ajouter_taches_en_lot(self, taches: List[Tache]) -> List[int]:
+        """Ajouter plusieurs tâches et leurs compétences"""
+        self._verifier_ecriture()
+        maintenant = self._maintenant()
+        with self.transaction():
+            ids = []
+            ids_competences = []
+            for tache in taches:
+                id_tache = self._nouvel_id('taches')
+                ligne = self._ligne_tache(tache, id_tache, maintenant, maintenant)
+                self._noter(self._taches, id_tache)
+                self._taches[id_tache] = ligne
+                self._appliquer_tache(None, ligne)
+                ids_competences.append(self._lier_competences(
+                    self._competences_taches, id_tache, tache.competences_requises))
+                ids.append(id_tache)
+        for id_tache, tache, competences in zip(ids, taches, ids_competences):
+            tache.id = id_tache
+            tache.ids_competences = competences
+            tache.cree_le = maintenant
+            tache.mis_a_jour_le = maintenant
+            tache.version = VERSION_INITIALE
+            tache.marquer_enregistre()
+        return ids
+    
+    def mettre_a_jour_taches_en_lot(self, taches: List[Tache]) -> List[int]:
+        """
+        Mettre à jour plusieurs tâches existantes : seulement leurs champs modifiés, et leurs
+        compétences seulement si leur ensemble a changé (tâches inchangées ignorées).
+        Rien n'est écrit si une tâche a changé depuis sa lecture (ConflitConcurrence).
+        """
+        self._verifier_ecriture()
+        modifiees = [tache for tache in taches
+                     if tache.champs_modifies() or tache.competences_modifiees()]
+        self._verifier_versions(self._taches, 'taches', modifiees)
+        maintenant = self._maintenant()
+        with self.transaction():
+            ids_competences = []
+            for tache in modifiees:
+                ancienne = self._taches.get(tache.id)
+                if ancienne is not None:
+                    ligne = dict(ancienne, **tache.champs_modifies(), mis_a_jour_le=maintenant,
+                                 version=ancienne['version'] + 1)
+                    self._noter(self._taches, tache.id)
+                    self._taches[tache.id] = ligne
+                    self._appliquer_tache(ancienne, ligne)
+                ids_competences.append(self._modifier_liens(
+                    self._competences_taches, tache.id, tache.competences_enregistrees(),
+                    tache.competences_requises) if tache.competences_modifiees() else None)
+        for tache, competences in zip(modifiees, ids_competences):
+            if competences is not None:
+                tache.ids_competences = competences
+            tache.mis_a_jour_le = maintenant
+            if tache.version is not None:
+                tache.version += 1
+            tache.marquer_enregistre()
+        return [tache.id for tache in taches]
+    
+    def supprimer_tache(self, id_tache: int):
+        """Supprimer une tâche"""
+        self._verifier_ecriture()
+        self._noter(self._taches, id_tache)
+        ancienne = self._taches.pop(id_tache, None)
+        if ancienne is not None:
+            self._appliquer_tache(ancienne, None)
+            self._noter(self._competences_taches, id_tache)
+            self._competences_taches.pop(id_tache, None)
+    
+    def archiver_taches_terminees(self, jours: int = JOURS_AVANT_ARCHIVAGE,
+                                  taille_lot: int = TAILLE_LOT_ARCHIVAGE) -> int:
+        """
+        Déplacer vers l'archive les tâches terminées non modifiées depuis jours jours
+        (taille_lot est sans effet : le déplacement en mémoire ne peut pas échouer en cours de route)
+        """
+        self._verifier_ecriture()
+        limite = (datetime.now() - timedelta(days=jours)).isoformat()
+        ids = [id_tache for id_tache, ligne in self._taches.items()
+               if ligne['statut'] == Tache.STATUT_TERMINE and ligne['mis_a_jour_le'] < limite]
+        maintenant = self._maintenant()
+        for id_tache in ids:
+            # Compteurs des projets, charge (tâche terminée) et historique restent inchangés
+            for conteneur in (self._taches, self._archives, self._competences_taches,
+                              self._competences_taches_archive):
+                self._noter(conteneur, id_tache)
+            ligne = self._taches.pop(id_tache)
+            self._indexer_tache(ligne, None)
+            self._archives[id_tache] = dict(ligne, archive_le=maintenant)
+            self._competences_taches_archive[id_tache] = self._competences_taches.pop(id_tache, [])
+        if ids:
+            self._versions['taches'] += 1
+        return len(ids)
+    
+    def obtenir_tache(self, id_tache: int) -> Optional[Tache]:
+        """Obtenir une tâche par son ID"""
+        ligne = self._taches.get(id_tache)
+        return self._construire_tache(ligne) if ligne is not None else None
+    
+    # Membres d'équipe
+    def charger_membres_equipe(self, avec_taches: bool = False) -> List[MembreEquipe]:
+        """Charger tous les membres d'équipe avec leurs compétences, triés par nom"""
+        return [self._construire_membre(ligne, avec_taches=avec_taches) for ligne in self._membres_tries()]
+    
+    def charger_page_membres(self, apres: Optional[tuple] = None, taille: int = TAILLE_PAGE,
+                             texte: Optional[str] = None):
+        """Charger une page de membres triés par nom ; retourne (membres, curseur_suivant)"""
+        motif = _nocase(texte) if texte else None
+        membres = []
+        for ligne in self._membres_tries():
+            if len(membres) >= taille:
+                break
+            if motif and not any(motif in _nocase(ligne[champ]) for champ in ('nom', 'email', 'role')):
+                continue
+            if apres is not None and (ligne['nom'], ligne['id']) <= tuple(apres):
+                continue
+            membres.append(self._construire_membre(ligne))
+        return membres, self._curseur_suivant(membres, taille, lambda m: (m.nom, m.id))
+    
+    def ajouter_membres_en_lot(self, membres: List[MembreEquipe]) -> List[int]:
+        """Ajouter plusieurs membres d'équipe et leurs compétences"""
+        self._verifier_ecriture()
+        maintenant = self._maintenant()
+        with self.transaction():
+            ids = []
+            ids_competences = []
+            for membre in membres:
+                id_membre = self._nouvel_id('membres_equipe')
+                self._noter(self._membres, id_membre)
+                self._membres[id_membre] = {
+                    'id': id_membre, 'nom': membre.nom, 'email': membre.email, 'role': membre.role,
+                    'disponibilite': membre.disponibilite, 'heures_max_par_semaine': membre.heures_max_par_semaine,
+                    'charge_travail_heures': 0, 'cree_le': maintenant, 'mis_a_jour_le': maintenant,
+                    'version': VERSION_INITIALE,
+                }
+                self._versions['membres_equipe'] += 1
+                ids_competences.append(self._lier_competences(
+                    self._competences_membres, id_membre, membre.competences))
+                ids.append(id_membre)
+        for id_membre, membre, competences in zip(ids, membres, ids_competences):
+            membre.id = id_membre
+            membre.ids_competences = competences
+            membre.cree_le = maintenant
+            membre.mis_a_jour_le = maintenant
+            membre.charge_travail_heures = 0
+            membre.version = VERSION_INITIALE
+            membre.marquer_enregistre()
+        return ids
+    
+    def mettre_a_jour_membre_equipe(self, membre: MembreEquipe):
+        """
+        Mettre à jour un membre d'équipe existant : seulement ses champs modifiés, et ses
+        compétences seulement si leur ensemble a changé (la charge de travail est calculée).
+        ConflitConcurrence si le membre a changé depuis sa lecture.
+        """
+        self._verifier_ecriture()
+        champs = membre.champs_modifies()
+        competences_modifiees = membre.competences_modifiees()
+        if not champs and not competences_modifiees:
+            return
+        self._verifier_versions(self._membres, 'membres_equipe', [membre])
+        maintenant = self._maintenant()
+        ligne = self._membres.get(membre.id)
+        if ligne is not None:
+            self._noter(self._membres, membre.id)
+            ligne.update(champs, mis_a_jour_le=maintenant, version=ligne['version'] + 1)
+            self._versions['membres_equipe'] += 1
+        if competences_modifiees:
+            membre.ids_competences = self._modifier_liens(
+                self._competences_membres, membre.id, membre.competences_enregistrees(),
+                membre.competences)
+        membre.mis_a_jour_le = maintenant
+        if membre.version is not None:
+            membre.version += 1
+        membre.marquer_enregistre()
+    
+    def recalculer_charges_travail(self) -> int:
+        """Recalculer la charge de travail de tous les membres ; retourne le nombre de corrections"""
+        self._verifier_ecriture()
+        corrections = 0
+        for id_membre, ligne in self._membres.items():
+            charge = sum(self._taches[i]['heures_estimees'] or 0
+                         for i in self._taches_par_membre.get(id_membre, ())
+                         if self._taches[i]['statut'] != Tache.STATUT_TERMINE)
+            if ligne['charge_travail_heures'] != charge:
+                self._noter(self._membres, id_membre)
+                ligne['charge_travail_heures'] = charge
+                corrections += 1
+        if corrections:
+            self._versions['membres_equipe'] += 1
+        return corrections
+    
+    def supprimer_membre_equipe(self, id_membre: int):
+        """Supprimer un membre d'équipe (ses tâches gardent leur assigne_a, comme en SQLite)"""
+        self._verifier_ecriture()
+        self._noter(self._membres, id_membre)
+        self._noter(self._competences_membres, id_membre)
+        if self._membres.pop(id_membre, None) is not None:
+            self._competences_membres.pop(id_membre, None)
+            self._versions['membres_equipe'] += 1
+    
+    def obtenir_membre_equipe(self, id_membre: int) -> Optional[MembreEquipe]:
+        """Obtenir un membre d'équipe par son ID"""
+        ligne = self._membres.get(id_membre)
+        return self._construire_membre(ligne) if ligne is not None else None
+    
+    def noms_membres(self, ids_membres: List[int]) -> Dict[int, str]:
+        """Retourner {id: nom} des membres d'équipe donnés"""
+        return {i: self._membres[i]['nom'] for i in ids_membres if i in self._membres}
+    
+    # Compétences et historique des assignations
+    def charger_competences(self) -> Dict[int, str]:
+        """Retourner le dictionnaire des compétences {id: nom}"""
+        return dict(self._competences)
+    
+    def historique_assignations(self, membre_id: Optional[int] = None, tache_id: Optional[int] = None,
+                                debut: Optional[str] = None, fin: Optional[str] = None,
+                                limite: Optional[int] = None) -> List[dict]:
+        """Lire l'historique des assignations, du plus ancien au plus récent"""
+        evenements = [dict(e) for e in self._assignations
+                      if (membre_id is None or e['membre_id'] == membre_id)
+                      and (tache_id is None or e['tache_id'] == tache_id)
+                      and (not debut or e['assigne_le'] >= debut)
+                      and (not fin or e['assigne_le'] < fin)]
+        evenements.sort(key=lambda e: (e['assigne_le'], e['id']))
+        return evenements[:limite] if limite is not None else evenements
+    
+    def taches_actuelles_par_membre(self, ids_membres: Optional[List[int]] = None) -> Dict[int, List[int]]:
+        """Retourner les IDs des tâches non terminées assignées à chaque membre"""
+        ids = sorted(self._taches_par_membre) if ids_membres is None else ids_membres
+        taches = {}
+        for id_membre in ids:
+            actuelles = sorted(i for i in self._taches_par_membre.get(id_membre, ())
+                               if self._taches[i]['statut'] != Tache.STATUT_TERMINE)
+            if actuelles:
+                taches[id_membre] = actuelles
+        return taches
+    
+    # Méthodes utilitaires
+    def obtenir_statistiques(self) -> dict:
+        """Obtenir les statistiques générales (mêmes clés que le stockage SQLite, archives comprises)"""
+        projets_par_statut = {}
+        for ligne in self._projets.values():
+            projets_par_statut[ligne['statut']] = projets_par_statut.get(ligne['statut'], 0) + 1
+        
+        taches_par_statut = {}
+        taches_haute_priorite = 0
+        taches_en_retard = 0
+        aujourd_hui = date.today().isoformat()
+        for ligne in itertools.chain(self._taches.values(), self._archives.values()):
+            taches_par_statut[ligne['statut']] = taches_par_statut.get(ligne['statut'], 0) + 1
+            if ligne['priorite'] == Tache.PRIORITE_HAUTE:
+                taches_haute_priorite += 1
+            if ligne['statut'] != Tache.STATUT_TERMINE and self._date_valide(ligne['echeance']):
+                taches_en_retard += ligne['echeance'][:10] < aujourd_hui
+        
+        membres_disponibles = sum(1 for ligne in self._membres.values()
+                                  if self._construire_membre(ligne, complet=False).obtenir_score_disponibilite() > 0.5)
+        
+        return {
+            'total_projets': sum(projets_par_statut.values()),
+            'projets_actifs': projets_par_statut.get(Projet.STATUT_ACTIF, 0),
+            'projets_termines': projets_par_statut.get(Projet.STATUT_TERMINE, 0),
+            'total_taches': sum(taches_par_statut.values()),
+            'taches_a_faire': taches_par_statut.get(Tache.STATUT_A_FAIRE, 0),
+            'taches_en_cours': taches_par_statut.get(Tache.STATUT_EN_COURS, 0),
+            'taches_terminees': taches_par_statut.get(Tache.STATUT_TERMINE, 0),
+            'taches_haute_priorite': taches_haute_priorite,
+            'taches_en_retard': taches_en_retard,
+            'total_membres': len(self._membres),
+            'membres_disponibles': membres_disponibles
+        }
+    
+    # Fonctionnement interne
+    def _verifier_ecriture(self):
+        """Refuser les écritures sur un instantané en lecture seule"""
+        if self.lecture_seule:
+            raise PermissionError("Stockage en lecture seule")
+    
+    def _copier_etat(self) -> dict:
+        """Copie profonde de l'état (lignes, index, compteurs)"""
+        return {nom: copy.deepcopy(getattr(self, nom)) for nom in _ATTRIBUTS_ETAT}
+    
+    def _noter(self, conteneur: dict, cle):
+        """
+        Journaliser la valeur d'une entrée (copie superficielle : ligne, ensemble ou liste
+        d'IDs) avant de la modifier, si une transaction est en cours
+        """
+        if self._journal is not None:
+            valeur = conteneur.get(cle, _ABSENT)
+            self._journal.append((conteneur, cle, valeur if valeur is _ABSENT else copy.copy(valeur)))
+    
+    def _nouvel_id(self, table: str) -> int:
+        """Attribuer l'ID suivant d'une table (jamais réutilisé, comme AUTOINCREMENT)"""
+        self._sequences[table] += 1
+        return self._sequences[table]
+    
+    @staticmethod
+    def _maintenant() -> str:
+        """Retourner la date/heure actuelle en format ISO"""
+        return datetime.now().isoformat()
+    
+    @staticmethod
+    def _date_valide(echeance: Optional[str]) -> bool:
+        """Vrai si l'échéance commence par une date AAAA-MM-JJ (date() de SQLite sinon NULL)"""
+        if not echeance:
+            return False
+        try:
+            date.fromisoformat(echeance[:10])
+            return True
+        except ValueError:
+            return False
+    
+    @staticmethod
+    def _verifier_versions(lignes: Dict[int, dict], table: str, elements: List):
+        """
+        Lever ConflitConcurrence si la ligne d'un élément a été supprimée ou n'a plus la version
+        lue (les éléments sans version, construits hors du stockage, ne sont pas vérifiés)
+        """
+        conflits = [element.id for element in elements if element.version is not None
+                    and (lignes.get(element.id) or {}).get('version') != element.version]
+        if conflits:
+            raise ConflitConcurrence(table, conflits)
+    
+    @staticmethod
+    def _ligne_tache(tache: Tache, id_tache: int, cree_le: str, mis_a_jour_le: str) -> dict:
+        """Ligne stockée pour une tâche"""
+        return {
+            'id': id_tache, 'titre': tache.titre, 'description': tache.description,
+            'id_projet': tache.id_projet, 'priorite': tache.priorite, 'statut': tache.statut,
+            'assigne_a': tache.assigne_a, 'echeance': tache.echeance,
+            'heures_estimees': tache.heures_estimees, 'cree_le': cree_le, 'mis_a_jour_le': mis_a_jour_le,
+            'version': VERSION_INITIALE,
+        }
+    
+    def _appliquer_tache(self, ancienne: Optional[dict], nouvelle: Optional[dict]):
+        """
+        Répercuter l'écriture d'une tâche (insertion, modification ou suppression) sur les
+        index, la charge des membres, les compteurs des projets et l'historique des
+        assignations, comme le font les déclencheurs du stockage SQLite
+        """
+        self._versions['taches'] += 1
+        self._indexer_tache(ancienne, nouvelle)
+        
+        if ancienne is not None:
+            self._compter_dans_projet(ancienne, -1)
+            self._compter_dans_charge(ancienne, -1)
+        if nouvelle is not None:
+            self._compter_dans_projet(nouvelle, 1)
+            self._compter_dans_charge(nouvelle, 1)
+        
+        ancien_membre = ancienne['assigne_a'] if ancienne is not None else None
+        nouveau_membre = nouvelle['assigne_a'] if nouvelle is not None else None
+        if ancien_membre != nouveau_membre:
+            maintenant = self._maintenant()
+            id_tache = (nouvelle or ancienne)['id']
+            if ancien_membre is not None:
+                self._journaliser(ancien_membre, id_tache, maintenant, TYPE_DESASSIGNATION)
+            if nouveau_membre is not None:
+                self._journaliser(nouveau_membre, id_tache, maintenant, TYPE_ASSIGNATION)
+    
+    def _indexer_tache(self, ancienne: Optional[dict], nouvelle: Optional[dict]):
+        """Mettre à jour les index par projet et par assignataire"""
+        for index, colonne in ((self._taches_par_projet, 'id_projet'), (self._taches_par_membre, 'assigne_a')):
+            if ancienne is not None and ancienne[colonne] is not None:
+                self._noter(index, ancienne[colonne])
+                ids = index.get(ancienne[colonne])
+                ids.discard(ancienne['id'])
+                if not ids:
+                    del index[ancienne[colonne]]
+            if nouvelle is not None and nouvelle[colonne] is not None:
+                self._noter(index, nouvelle[colonne])
+                index.setdefault(nouvelle[colonne], set()).add(nouvelle['id'])
+    
+    def _compter_dans_projet(self, ligne: dict, signe: int):
+        """Ajouter (signe=1) ou retirer (signe=-1) une tâche des compteurs de son projet"""
+        projet = self._projets.get(ligne['id_projet'])
+        if projet is None:
+            return
+        self._noter(self._projets, ligne['id_projet'])
+        projet['nb_taches'] += signe
+        projet['nb_terminees'] += signe * (ligne['statut'] == Tache.STATUT_TERMINE)
+        projet['heures_totales'] += signe * (ligne['heures_estimees'] or 0)
+        self._versions['projets'] += 1
+    
+    def _compter_dans_charge(self, ligne: dict, signe: int):
+        """Ajouter ou retirer une tâche non terminée de la charge de son assignataire"""
+        membre = self._membres.get(ligne['assigne_a'])
+        if membre is None or ligne['statut'] == Tache.STATUT_TERMINE:
+            return
+        self._noter(self._membres, ligne['assigne_a'])
+        membre['charge_travail_heures'] += signe * (ligne['heures_estimees'] or 0)
+        self._versions['membres_equipe'] += 1
+    
+    def _journaliser(self, id_membre: int, id_tache: int, horodatage: str, type_evenement: str):
+        """Ajouter un événement à l'historique des assignations"""
+        self._assignations.append({
+            'id': self._nouvel_id('assignations_taches'), 'membre_id': id_membre,
+            'tache_id': id_tache, 'assigne_le': horodatage, 'type': type_evenement,
+        })
+    
+    def _resoudre_competences(self, noms: Iterable[str]) -> List[int]:
+        """
+        IDs des compétences nommées, dédoublonnés dans l'ordre de saisie, en ajoutant au
+        dictionnaire celles qui n'y sont pas encore
+        """
+        ids = []
+        for nom in noms:
+            cle = cle_competence(nom)
+            if not cle:
+                continue
+            if cle not in self._ids_par_cle:
+                id_competence = self._nouvel_id('competences')
+                self._noter(self._ids_par_cle, cle)
+                self._noter(self._competences, id_competence)
+                self._ids_par_cle[cle] = id_competence
+                self._competences[id_competence] = nom_competence(nom)
+            ids.append(self._ids_par_cle[cle])
+        # dict.fromkeys : dédoublonner en gardant l'ordre de saisie
+        return list(dict.fromkeys(ids))
+    
+    def _lier_competences(self, liens: Dict[int, List[int]], id_entite: int, noms: Iterable[str]):
+        """Remplacer les compétences d'une entité ; retourne l'ensemble interné de leurs IDs"""
+        self._noter(liens, id_entite)
+        liens[id_entite] = self._resoudre_competences(noms)
+        return interner_competences(liens[id_entite])
+    
+    def _modifier_liens(self, liens: Dict[int, List[int]], id_entite: int,
+                        anciens: Optional[Iterable[str]], nouveaux: Iterable[str]):
+        """
+        Appliquer un changement de compétences par différence d'ensembles, comme le stockage
+        SQLite : retirer les liens des compétences enlevées, ajouter ceux des nouvelles
+        (remplacement complet si l'état enregistré est inconnu) ; retourne l'ensemble interné
+        """
+        if anciens is None:
+            return self._lier_competences(liens, id_entite, nouveaux)
+        ids_anciens = set(self._resoudre_competences(anciens))
+        ids_nouveaux = self._resoudre_competences(nouveaux)
+        conserves = [i for i in liens.get(id_entite, []) if i not in ids_anciens or i in ids_nouveaux]
+        self._noter(liens, id_entite)
+        liens[id_entite] = conserves + [i for i in ids_nouveaux if i not in ids_anciens and i not in conserves]
+        return interner_competences(ids_nouveaux)
+    
+    def _projets_tries(self) -> List[dict]:
+        """Lignes des projets, des plus récents aux plus anciens"""
+        return sorted(self._projets.values(), key=lambda l: (l['cree_le'], l['id']), reverse=True)
+    
+    def _membres_tries(self) -> List[dict]:
+        """Lignes des membres, triées par nom"""
+        return sorted(self._membres.values(), key=lambda l: (l['nom'], l['id']))
+    
+    @staticmethod
+    def _trier_taches(lignes: List[dict], tri: str):
+        """Trier des lignes de tâches sur place selon une clé de TRIS_TACHES"""
+        if tri == 'anciennes':
+            lignes.sort(key=lambda l: (l['cree_le'], l['id']))
+        elif tri == 'echeance':
+            # Échéances vides en dernier, NULL avant '' (ordre de SQLite)
+            lignes.sort(key=lambda l: (not l['echeance'], l['echeance'] is not None, l['echeance'] or '', l['id']))
+        elif tri == 'titre':
+            lignes.sort(key=lambda l: (_nocase(l['titre']), l['id']))
+        else:
+            lignes.sort(key=lambda l: (l['cree_le'], l['id']), reverse=True)
+            if tri == 'priorite':
+                # Tri stable : à priorité égale, l'ordre des plus récentes est conservé
+                lignes.sort(key=lambda l: ORDRE_PRIORITES.get(l['priorite'], 2))
+    
+    def _construire_projet(self, ligne: dict) -> Projet:
+        """Construire un Projet depuis sa ligne"""
+        return Projet.depuis_ligne_db(dict(ligne))
+    
+    def _construire_tache(self, ligne: dict) -> Tache:
+        """Construire une Tache et lui associer ses compétences requises"""
+        tache = Tache.depuis_ligne_db(dict(ligne))
+        ids = self._competences_taches.get(tache.id)
+        if ids is None:
+            ids = self._competences_taches_archive.get(tache.id, [])
+        tache.competences_requises = [self._competences[i] for i in ids]
+        tache.ids_competences = interner_competences(ids)
+        tache.marquer_enregistre()
+        return tache
+    
+    def _construire_membre(self, ligne: dict, complet: bool = True, avec_taches: bool = True) -> MembreEquipe:
+        """Construire un MembreEquipe avec ses compétences et (avec_taches) ses tâches en cours"""
+        membre = MembreEquipe.depuis_ligne_db(dict(ligne))
+        if complet:
+            ids = self._competences_membres.get(membre.id, [])
+            membre.competences = [self._competences[i] for i in ids]
+            membre.ids_competences = interner_competences(ids)
+            if avec_taches:
+                membre.taches_actuelles = self.taches_actuelles_par_membre([membre.id]).get(membre.id, [])
+            membre.marquer_enregistre()
+        return membre
@@ -0,0 +1,51 @@
+"""
+Suivi des modifications des objets modèles depuis leur dernier état enregistré
+Le gestionnaire de données mémorise l'état d'un objet quand il le charge ou le sauvegarde ;
+la sauvegarde suivante n'écrit que les champs modifiés depuis
+"""
+
+from typing import Any, Dict, Optional, Tuple
+from modeles.competences import cle_competence
+
+def _cles_competences(noms) -> set:
+    """Ensemble des clés canoniques (non vides) de noms de compétences"""
+    return {cle_competence(nom) for nom in noms} - {''}
+
+class SuiviModifications:
+    """
+    Classe de base des modèles dont les sauvegardes sont différentielles.
+    Les sous-classes définissent CHAMPS_SUIVIS (attributs enregistrés en colonnes) et
+    CHAMP_COMPETENCES (attribut liste des noms de compétences), et initialisent
+    _etat_enregistre et _competences_enregistrees à None.
+    Un objet jamais marqué (nouvel objet, ou construit hors du gestionnaire) est
+    considéré entièrement modifié.
+    """
+    CHAMPS_SUIVIS: Tuple[str, ...] = ()
+    CHAMP_COMPETENCES = ''
+    
+    def marquer_enregistre(self):
+        """Mémoriser l'état actuel comme état enregistré (appelé par le gestionnaire de données)"""
+        self._etat_enregistre = {champ: getattr(self, champ) for champ in self.CHAMPS_SUIVIS}
+        self._competences_enregistrees = tuple(getattr(self, self.CHAMP_COMPETENCES))
+    
+    def champs_modifies(self) -> Dict[str, Any]:
+        """Champs modifiés depuis l'état enregistré, avec leur nouvelle valeur (tous si inconnu)"""
+        if self._etat_enregistre is None:
+            return {champ: getattr(self, champ) for champ in self.CHAMPS_SUIVIS}
+        return {champ: getattr(self, champ) for champ in self.CHAMPS_SUIVIS
+                if getattr(self, champ) != self._etat_enregistre[champ]}
+    
+    def competences_enregistrees(self) -> Optional[Tuple[str, ...]]:
+        """Noms des compétences à l'état enregistré, ou None si cet état est inconnu"""
+        return self._competences_enregistrees
+    
+    def competences_modifiees(self) -> bool:
+        """Indiquer si l'ensemble des compétences a changé (casse et espaces ignorés, pas l'ordre)"""
+        if self._competences_enregistrees is None:
+            return True
+        return (_cles_competences(getattr(self, self.CHAMP_COMPETENCES))
+                != _cles_competences(self._competences_enregistrees))
+    
+    def est_modifie(self) -> bool:
+        """Indiquer si une sauvegarde a quelque chose à écrire"""
+        return bool(self.champs_modifies()) or self.competences_modifiees()
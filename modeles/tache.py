@@ -3,9 +3,10 @@ Modèle de tâche pour gérer les données de tâche
 """
 
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, FrozenSet
+from modeles.suivi_modifications import SuiviModifications
 
-class Tache:
+class Tache(SuiviModifications):
     # Niveaux de priorité
     PRIORITE_HAUTE = "Haute"
     PRIORITE_MOYENNE = "Moyenne"
@@ -16,6 +17,11 @@ class Tache:
     STATUT_EN_COURS = "En cours"
     STATUT_TERMINE = "Terminé"
     
+    # Champs enregistrés en colonnes, écrits seulement s'ils ont changé (voir SuiviModifications)
+    CHAMPS_SUIVIS = ('titre', 'description', 'id_projet', 'priorite', 'statut', 'assigne_a',
+                     'echeance', 'heures_estimees')
+    CHAMP_COMPETENCES = 'competences_requises'
+    
     def __init__(self, titre: str, description: str = "", id_projet: Optional[int] = None, 
                  priorite: str = PRIORITE_MOYENNE, echeance: str = ""):
         self.id: Optional[int] = None  # Sera défini par la base de données
@@ -28,9 +34,13 @@ class Tache:
         self.echeance = echeance
         self.heures_estimees = 0
         self.competences_requises: List[str] = []  # Liste des compétences requises pour cette tâche
+        self.ids_competences: FrozenSet[int] = frozenset()  # IDs (table competences), renseignés par le gestionnaire
         self.cree_le = datetime.now().isoformat()
         self.mis_a_jour_le = datetime.now().isoformat()
-        
+        self.version: Optional[int] = None  # Version de la ligne lue (verrouillage optimiste), tenue par le stockage
+        self._etat_enregistre = None  # État à la dernière lecture/sauvegarde (SuiviModifications)
+        self._competences_enregistrees = None
+    
     def vers_dict(self) -> Dict[str, Any]:
         """Convertir la tâche en dictionnaire pour la sérialisation JSON"""
         return {
@@ -83,6 +93,7 @@ class Tache:
         tache.heures_estimees = ligne.get('heures_estimees', 0)
         tache.cree_le = ligne.get('cree_le', datetime.now().isoformat())
         tache.mis_a_jour_le = ligne.get('mis_a_jour_le', datetime.now().isoformat())
+        tache.version = ligne.get('version')
         return tache
     
     def marquer_termine(self):
@@ -0,0 +1,77 @@
+"""
+Tests de l'importation en masse : un fichier JSON Lines mêlant enregistrements valides et
+invalides est importé jusqu'au bout, les invalides étant rejetés un par un
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from modeles.gestionnaire_donnees import GestionnaireDonnees
+from modeles.stockage_memoire import GestionnaireDonneesMemoire
+from utilitaires.importation import ImportateurDonnees, ENTITE_PROJETS, ENTITE_MEMBRES, ENTITE_TACHES
+
+class TestImportationJsonl(unittest.TestCase):
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dossier.cleanup)
+    
+    def ecrire_jsonl(self, nom: str, lignes) -> str:
+        """Écrire un fichier JSON Lines (les chaînes sont écrites telles quelles)"""
+        chemin = os.path.join(self.dossier.name, nom)
+        with open(chemin, 'w', encoding='utf-8') as fichier:
+            for ligne in lignes:
+                fichier.write((ligne if isinstance(ligne, str) else json.dumps(ligne)) + '\n')
+        return chemin
+    
+    def gestionnaires(self):
+        """Les deux implémentations du stockage, vides"""
+        base = GestionnaireDonnees(os.path.join(self.dossier.name, 'test.db'))
+        self.addCleanup(base.fermer)
+        return [base, GestionnaireDonneesMemoire()]
+    
+    def test_fichier_mixte(self):
+        projets = self.ecrire_jsonl('projets.jsonl', [
+            {'id': 10, 'nom': 'Site web'},
+            {'nom': 123},
+            {'nom': 'Dates', 'date_debut': 20260101},
+            'pas du json',
+            {'id': 11, 'nom': 'Application', 'date_debut': '2026-01-01'},
+        ])
+        membres = self.ecrire_jsonl('membres.jsonl', [
+            {'id': 1, 'nom': 'Alice', 'disponibilite': '50', 'competences': ['Python']},
+            {'nom': 'Bruno', 'disponibilite': True},
+            {'nom': 'Chloé', 'email': 5},
+            {'nom': 'David', 'heures_max_par_semaine': 40.5},
+        ])
+        taches = self.ecrire_jsonl('taches.jsonl', [
+            {'titre': 'Maquettes', 'id_projet': 10, 'assigne_a': 1, 'heures_estimees': 8},
+            {'titre': 'Décimale', 'heures_estimees': 12.5},
+            {'titre': 'Booléen', 'heures_estimees': True},
+            {'titre': ['liste']},
+            {'titre': 'Échéance', 'echeance': 3},
+            {'titre': 'Texte', 'heures_estimees': '4', 'id_projet': '11'},
+        ])
+        for gestionnaire in self.gestionnaires():
+            with self.subTest(stockage=type(gestionnaire).__name__):
+                importateur = ImportateurDonnees(gestionnaire)
+                rapport_projets = importateur.importer_fichier(projets, ENTITE_PROJETS)
+                self.assertEqual((rapport_projets['lus'], rapport_projets['importes'],
+                                  rapport_projets['rejetes']), (5, 2, 3))
+                self.assertEqual([ligne for ligne, _ in rapport_projets['erreurs']], [2, 3, 4])
+                
+                rapport_membres = importateur.importer_fichier(membres, ENTITE_MEMBRES)
+                self.assertEqual((rapport_membres['importes'], rapport_membres['rejetes']), (1, 3))
+                membre, = gestionnaire.charger_membres_equipe()
+                self.assertEqual(membre.disponibilite, 50)
+                
+                rapport_taches = importateur.importer_fichier(
+                    taches, ENTITE_TACHES,
+                    correspondance_projets=rapport_projets['correspondance'],
+                    correspondance_membres=rapport_membres['correspondance'])
+                self.assertEqual((rapport_taches['importes'], rapport_taches['rejetes']), (2, 4))
+                self.assertEqual(sorted(t.heures_estimees for t in gestionnaire.charger_taches()), [4, 8])
+                self.assertEqual(gestionnaire.obtenir_membre_equipe(membre.id).charge_travail_heures, 8)
+
+if __name__ == '__main__':
+    unittest.main()
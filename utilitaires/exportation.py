@@ -0,0 +1,166 @@
+"""
+Exportation en flux des projets, membres d'équipe et tâches vers des fichiers JSON Lines ou CSV
+Les données sont lues page par page (pagination par clé) et écrites au fil de l'eau :
+la mémoire utilisée est bornée par la taille d'une page, quel que soit le volume exporté
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+from typing import Callable, List, Optional
+from modeles.stockage import StockageDonnees
+from modeles.projet import Projet
+from modeles.tache import Tache
+from modeles.membre_equipe import MembreEquipe
+from utilitaires.importation import (ImportateurDonnees, ENTITE_PROJETS, ENTITE_MEMBRES, ENTITE_TACHES,
+                                     FORMAT_CSV, SEPARATEUR_LISTE)
+
+# Nombre d'enregistrements lus puis écrits par page
+TAILLE_LOT_EXPORT = 1000
+
+# Suffixe du fichier de reprise, écrit à côté du fichier exporté
+SUFFIXE_REPRISE = '.reprise'
+
+# Niveau de compression gzip (celui de zlib par défaut ; 9, celui de gzip.compress, est bien plus lent)
+NIVEAU_COMPRESSION = 6
+
+# Filtres acceptés pour l'export des tâches (ceux de rechercher_taches, sauf la pagination et
+# le tri : l'export parcourt les tâches des plus anciennes aux plus récentes, page par page)
+FILTRES_EXPORT_TACHES = ('statut', 'priorite', 'id_projet', 'assigne_a', 'echeance_avant', 'texte',
+                         'inclure_archives')
+
+# Colonnes CSV de chaque entité : clés de vers_dict, dans le même ordre
+COLONNES_CSV = {
+    ENTITE_PROJETS: list(Projet('').vers_dict()),
+    ENTITE_MEMBRES: list(MembreEquipe('').vers_dict()),
+    ENTITE_TACHES: list(Tache('').vers_dict()),
+}
+
+class ExportateurDonnees:
+    """
+    Exporter une entité complète, ou un ensemble filtré de tâches :
+        exportateur = ExportateurDonnees(gestionnaire_donnees)
+        exportateur.exporter('taches.jsonl.gz', ENTITE_TACHES, statut=Tache.STATUT_TERMINE)
+    Après chaque page, un fichier de reprise (chemin + SUFFIXE_REPRISE) mémorise le curseur
+    de la dernière page écrite et la taille du fichier à ce moment. Avec reprendre=True, un
+    export interrompu repart de là : le fichier est tronqué à la dernière page complète puis
+    complété. Le fichier de reprise est supprimé à la fin de l'export.
+    Avec compression, chaque page est un membre gzip complet : le fichier reste lisible
+    par gzip.open quelle que soit la page où l'export s'est arrêté.
+    """
+    
+    def __init__(self, gestionnaire_donnees: StockageDonnees, taille_lot: int = TAILLE_LOT_EXPORT):
+        self.gestionnaire_donnees = gestionnaire_donnees
+        self.taille_lot = taille_lot
+    
+    def exporter(self, chemin: str, entite: str, format_fichier: Optional[str] = None,
+                 compresser: Optional[bool] = None, reprendre: bool = False,
+                 rappel_progression: Optional[Callable[[int], None]] = None, **filtres) -> int:
+        """
+        Exporter une entité (ENTITE_PROJETS, ENTITE_MEMBRES ou ENTITE_TACHES) vers chemin.
+        format_fichier et compresser sont déduits de l'extension s'ils ne sont pas donnés
+        (.jsonl/.ndjson/.csv, éventuellement suivie de .gz).
+        filtres : filtres de rechercher_taches (tâches seulement), parmi FILTRES_EXPORT_TACHES ;
+        tri, limite, decalage, apres et taille sont refusés (ValueError).
+        rappel_progression(nombre_exportes) est appelé après chaque page.
+        Retourne le nombre d'enregistrements exportés (depuis le début de l'export, reprise comprise).
+        """
+        if entite not in COLONNES_CSV:
+            raise ValueError(f"Entité inconnue : {entite}")
+        if filtres and entite != ENTITE_TACHES:
+            raise ValueError("Les filtres ne s'appliquent qu'à l'export des tâches")
+        filtres_refuses = sorted(set(filtres) - set(FILTRES_EXPORT_TACHES))
+        if filtres_refuses:
+            raise ValueError(f"Filtres d'export non acceptés : {', '.join(filtres_refuses)} "
+                             f"(acceptés : {', '.join(FILTRES_EXPORT_TACHES)})")
+        format_fichier = format_fichier or ImportateurDonnees.detecter_format(chemin)
+        if compresser is None:
+            compresser = chemin.endswith('.gz')
+        
+        parametres = {'entite': entite, 'format': format_fichier, 'compresser': compresser,
+                      'filtres': filtres}
+        reprise = self._lire_reprise(chemin, parametres) if reprendre else None
+        curseur = tuple(reprise['curseur']) if reprise else None
+        exportes = reprise['exportes'] if reprise else 0
+        
+        with open(chemin, 'r+b' if reprise else 'wb') as fichier:
+            if reprise:
+                # Écarter une page à moitié écrite lors de l'interruption
+                fichier.truncate(reprise['octets'])
+                fichier.seek(reprise['octets'])
+            elif format_fichier == FORMAT_CSV:
+                self._ecrire_page(fichier, [], entite, format_fichier, compresser, entete=True)
+            
+            while True:
+                elements, curseur = self._lire_page(entite, curseur, filtres)
+                if elements:
+                    self._ecrire_page(fichier, elements, entite, format_fichier, compresser)
+                    exportes += len(elements)
+                if curseur is None:
+                    break
+                fichier.flush()
+                self._ecrire_reprise(chemin, dict(parametres, curseur=curseur, exportes=exportes,
+                                                  octets=fichier.tell()))
+                if rappel_progression:
+                    rappel_progression(exportes)
+        
+        if os.path.exists(chemin + SUFFIXE_REPRISE):
+            os.remove(chemin + SUFFIXE_REPRISE)
+        if rappel_progression:
+            rappel_progression(exportes)
+        return exportes
+    
+    def _lire_page(self, entite: str, curseur: Optional[tuple], filtres: dict):
+        """Lire la page suivant curseur ; retourne (elements, curseur_suivant)"""
+        if entite == ENTITE_PROJETS:
+            return self.gestionnaire_donnees.charger_page_projets(apres=curseur, taille=self.taille_lot)
+        if entite == ENTITE_MEMBRES:
+            return self.gestionnaire_donnees.charger_page_membres(apres=curseur, taille=self.taille_lot)
+        # Tâches des plus anciennes aux plus récentes : une reprise tardive inclut les tâches
+        # créées depuis l'interruption
+        return self.gestionnaire_donnees.charger_page_taches(apres=curseur, taille=self.taille_lot,
+                                                             tri='anciennes', **filtres)
+    
+    @staticmethod
+    def _ecrire_page(fichier, elements: List, entite: str, format_fichier: str, compresser: bool,
+                     entete: bool = False):
+        """Sérialiser une page (ou l'en-tête CSV) et l'écrire d'un bloc, compressée si demandé"""
+        tampon = io.StringIO()
+        if format_fichier == FORMAT_CSV:
+            redacteur = csv.DictWriter(tampon, fieldnames=COLONNES_CSV[entite], lineterminator='\n')
+            if entete:
+                redacteur.writeheader()
+            for element in elements:
+                redacteur.writerow({cle: SEPARATEUR_LISTE.join(map(str, valeur)) if isinstance(valeur, list) else valeur
+                                    for cle, valeur in element.vers_dict().items()})
+        else:
+            for element in elements:
+                tampon.write(json.dumps(element.vers_dict(), ensure_ascii=False))
+                tampon.write('\n')
+        
+        donnees = tampon.getvalue().encode('utf-8')
+        fichier.write(gzip.compress(donnees, NIVEAU_COMPRESSION) if compresser else donnees)
+    
+    @staticmethod
+    def _lire_reprise(chemin: str, parametres: dict) -> Optional[dict]:
+        """Lire le fichier de reprise d'un export interrompu (None s'il n'y en a pas)"""
+        try:
+            with open(chemin + SUFFIXE_REPRISE, encoding='utf-8') as fichier:
+                reprise = json.load(fichier)
+        except FileNotFoundError:
+            return None
+        if any(reprise.get(cle) != valeur for cle, valeur in parametres.items()):
+            raise ValueError("Le fichier de reprise correspond à un autre export")
+        if not os.path.exists(chemin) or os.path.getsize(chemin) < reprise['octets']:
+            raise ValueError(f"Fichier exporté absent ou incomplet : {chemin}")
+        return reprise
+    
+    @staticmethod
+    def _ecrire_reprise(chemin: str, reprise: dict):
+        """Écrire le fichier de reprise de manière atomique (fichier temporaire puis os.replace)"""
+        temporaire = chemin + SUFFIXE_REPRISE + '.tmp'
+        with open(temporaire, 'w', encoding='utf-8') as fichier:
+            json.dump(reprise, fichier, ensure_ascii=False)
+        os.replace(temporaire, chemin + SUFFIXE_REPRISE)
@@ -0,0 +1,317 @@
+"""
+Importation en masse de projets, membres d'équipe et tâches depuis des fichiers CSV ou JSON Lines
+Les fichiers sont lus en flux, par lots : la mémoire utilisée est bornée par la taille
+d'un lot, et chaque lot valide est écrit dans une seule transaction
+"""
+
+import csv
+import gzip
+import json
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from modeles.stockage import StockageDonnees
+from modeles.projet import Projet
+from modeles.tache import Tache
+from modeles.membre_equipe import MembreEquipe
+from utilitaires.validateurs import Validateurs
+
+# Types d'entités importables
+ENTITE_PROJETS = 'projets'
+ENTITE_MEMBRES = 'membres'
+ENTITE_TACHES = 'taches'
+
+# Formats reconnus (déduits de l'extension, .gz accepté en plus)
+FORMAT_CSV = 'csv'
+FORMAT_JSONL = 'jsonl'
+EXTENSIONS = {'.csv': FORMAT_CSV, '.jsonl': FORMAT_JSONL, '.ndjson': FORMAT_JSONL}
+
+# Nombre d'enregistrements validés puis écrits par transaction
+TAILLE_LOT_IMPORT = 1000
+
+# Nombre maximal de messages d'erreur conservés dans le rapport (les rejets sont tous comptés)
+MAX_ERREURS_RAPPORT = 100
+
+# Séparateur des listes (compétences, tâches actuelles) dans une cellule CSV
+SEPARATEUR_LISTE = ';'
+
+# Enregistrement lu : (numéro de ligne, dictionnaire) ou (numéro de ligne, message d'erreur)
+Enregistrement = Tuple[int, Union[dict, str]]
+
+# Types attendus des champs (cellules CSV, toujours du texte, et valeurs JSON Lines)
+CHAMPS_ENTIERS = ('id', 'id_projet', 'assigne_a', 'disponibilite', 'heures_max_par_semaine',
+                  'heures_estimees', 'charge_travail_heures')
+CHAMPS_TEXTES = ('nom', 'titre', 'description', 'email', 'role', 'statut', 'priorite',
+                 'date_debut', 'date_fin', 'echeance', 'cree_le', 'mis_a_jour_le')
+CHAMPS_LISTES = ('competences', 'competences_requises', 'taches_actuelles')
+
+class ImportateurDonnees:
+    """
+    Importer un fichier d'une entité :
+        importateur = ImportateurDonnees(gestionnaire_donnees)
+        rapport = importateur.importer_fichier('projets.csv', ENTITE_PROJETS)
+        importateur.importer_fichier('taches.jsonl', ENTITE_TACHES,
+                                     correspondance_projets=rapport['correspondance'])
+    Les IDs présents dans le fichier ne sont pas conservés : le rapport d'un import de
+    projets ou de membres donne la correspondance ancien ID → nouvel ID, utilisable pour
+    traduire les id_projet et assigne_a d'un import de tâches venant du même outil.
+    """
+    
+    def __init__(self, gestionnaire_donnees: StockageDonnees, taille_lot: int = TAILLE_LOT_IMPORT):
+        self.gestionnaire_donnees = gestionnaire_donnees
+        self.taille_lot = taille_lot
+    
+    def importer_fichier(self, chemin: str, entite: str, format_fichier: Optional[str] = None,
+                         rappel_progression: Optional[Callable[[dict], None]] = None,
+                         correspondance_projets: Optional[Dict[int, int]] = None,
+                         correspondance_membres: Optional[Dict[int, int]] = None) -> dict:
+        """
+        Importer un fichier CSV ou JSON Lines d'une entité (ENTITE_PROJETS, ENTITE_MEMBRES
+        ou ENTITE_TACHES). Les enregistrements invalides sont rejetés et signalés dans le
+        rapport, les autres sont importés.
+        rappel_progression(rapport) est appelé après l'écriture de chaque lot.
+        Retourne le rapport : lus, importes, rejetes, erreurs [(ligne, message)] et
+        correspondance {ancien ID: nouvel ID} (projets et membres seulement).
+        """
+        format_fichier = format_fichier or self.detecter_format(chemin)
+        ouvrir = gzip.open if chemin.endswith('.gz') else open
+        with ouvrir(chemin, 'rt', encoding='utf-8-sig', newline='') as fichier:
+            if format_fichier == FORMAT_CSV:
+                enregistrements = self._lire_csv(fichier)
+            else:
+                enregistrements = self._lire_jsonl(fichier)
+            return self.importer_enregistrements(enregistrements, entite, rappel_progression,
+                                                 correspondance_projets, correspondance_membres)
+    
+    def importer_enregistrements(self, enregistrements: Iterator[Enregistrement], entite: str,
+                                 rappel_progression: Optional[Callable[[dict], None]] = None,
+                                 correspondance_projets: Optional[Dict[int, int]] = None,
+                                 correspondance_membres: Optional[Dict[int, int]] = None) -> dict:
+        """
+        Importer des enregistrements (numéro de ligne, dictionnaire) par lots.
+        Un message d'erreur à la place du dictionnaire signale une ligne illisible, rejetée.
+        """
+        if entite not in (ENTITE_PROJETS, ENTITE_MEMBRES, ENTITE_TACHES):
+            raise ValueError(f"Entité inconnue : {entite}")
+        
+        rapport = {'lus': 0, 'importes': 0, 'rejetes': 0, 'erreurs': [], 'correspondance': {}}
+        references = None
+        if entite == ENTITE_TACHES:
+            references = self._charger_references(correspondance_projets, correspondance_membres)
+        
+        lot = []
+        for numero_ligne, donnees in enregistrements:
+            rapport['lus'] += 1
+            lot.append((numero_ligne, donnees))
+            if len(lot) >= self.taille_lot:
+                self._importer_lot(lot, entite, references, rapport)
+                lot = []
+                if rappel_progression:
+                    rappel_progression(rapport)
+        if lot:
+            self._importer_lot(lot, entite, references, rapport)
+        if rappel_progression:
+            rappel_progression(rapport)
+        return rapport
+    
+    @staticmethod
+    def detecter_format(chemin: str) -> str:
+        """Déduire le format d'un fichier de son extension (.csv, .jsonl, .ndjson, éventuellement .gz)"""
+        nom = chemin[:-3] if chemin.endswith('.gz') else chemin
+        for extension, format_fichier in EXTENSIONS.items():
+            if nom.lower().endswith(extension):
+                return format_fichier
+        raise ValueError(f"Format de fichier non reconnu : {chemin}")
+    
+    # Lecture
+    def _lire_csv(self, fichier) -> Iterator[Enregistrement]:
+        """Produire les lignes d'un CSV (en-tête = noms des champs), listes découpées"""
+        lecteur = csv.DictReader(fichier)
+        for ligne in lecteur:
+            yield lecteur.line_num, self._preparer_ligne_csv(ligne)
+    
+    @staticmethod
+    def _lire_jsonl(fichier) -> Iterator[Enregistrement]:
+        """Produire les objets d'un fichier JSON Lines (lignes vides ignorées)"""
+        for numero_ligne, ligne in enumerate(fichier, 1):
+            if not ligne.strip():
+                continue
+            try:
+                donnees = json.loads(ligne)
+            except json.JSONDecodeError as e:
+                yield numero_ligne, f"JSON invalide : {e.msg}"
+                continue
+            if not isinstance(donnees, dict):
+                yield numero_ligne, "Un objet JSON est attendu"
+                continue
+            yield numero_ligne, donnees
+    
+    @staticmethod
+    def _preparer_ligne_csv(ligne: Dict[str, str]) -> dict:
+        """Nettoyer les cellules d'une ligne CSV (cellules vides omises : valeur par défaut du modèle)"""
+        donnees = {}
+        for champ, valeur in ligne.items():
+            if champ is None or valeur is None:
+                continue
+            valeur = valeur.strip()
+            if champ in CHAMPS_LISTES:
+                donnees[champ] = [element.strip() for element in valeur.split(SEPARATEUR_LISTE) if element.strip()]
+            elif valeur:
+                donnees[champ] = valeur
+        return donnees
+    
+    @staticmethod
+    def _convertir_enregistrement(donnees: dict) -> dict:
+        """
+        Vérifier et convertir les champs d'un enregistrement CSV ou JSON Lines selon leur type
+        attendu (ValueError sinon) : un entier peut être donné en texte ("50"), mais ni
+        décimal ni booléen ; les valeurs nulles et les entiers vides sont omis.
+        """
+        convertis = {}
+        for champ, valeur in donnees.items():
+            if valeur is None:
+                continue
+            if champ in CHAMPS_ENTIERS:
+                if isinstance(valeur, str):
+                    if not valeur.strip():
+                        continue
+                    try:
+                        valeur = int(valeur.strip())
+                    except ValueError:
+                        raise ValueError(f"{champ} : entier attendu ({valeur})")
+                elif isinstance(valeur, bool) or not isinstance(valeur, int):
+                    raise ValueError(f"{champ} : entier attendu ({valeur})")
+            elif champ in CHAMPS_TEXTES:
+                if not isinstance(valeur, str):
+                    raise ValueError(f"{champ} : texte attendu ({valeur})")
+            elif champ in CHAMPS_LISTES:
+                if not isinstance(valeur, (list, str)):
+                    raise ValueError(f"{champ} : liste attendue ({valeur})")
+                if champ == 'taches_actuelles':
+                    valeur = [int(i) for i in valeur if str(i).isdigit()] if isinstance(valeur, list) else []
+            convertis[champ] = valeur
+        return convertis
+    
+    # Validation et écriture
+    def _charger_references(self, correspondance_projets, correspondance_membres) -> dict:
+        """IDs existants des projets et membres, pour valider les références des tâches"""
+        return {
+            'projets': {projet.id for projet in self.gestionnaire_donnees.iterer_projets()},
+            'membres': {membre.id for membre in self.gestionnaire_donnees.iterer_membres()},
+            'correspondance_projets': correspondance_projets or {},
+            'correspondance_membres': correspondance_membres or {},
+        }
+    
+    def _importer_lot(self, lot: List[Enregistrement], entite: str, references: Optional[dict], rapport: dict):
+        """Construire et valider les objets d'un lot, puis écrire les valides en une transaction"""
+        objets = []
+        anciens_ids = []
+        for numero_ligne, donnees in lot:
+            if not isinstance(donnees, dict):
+                self._rejeter(rapport, numero_ligne, donnees or "Ligne illisible")
+                continue
+            try:
+                objet = self._construire(donnees, entite, references)
+            except (KeyError, TypeError, ValueError) as e:
+                message = f"Champ obligatoire manquant : {e.args[0]}" if isinstance(e, KeyError) else str(e)
+                self._rejeter(rapport, numero_ligne, message)
+                continue
+            anciens_ids.append(objet.id)
+            objets.append(objet)
+        
+        if not objets:
+            return
+        with self.gestionnaire_donnees.transaction():
+            if entite == ENTITE_PROJETS:
+                self.gestionnaire_donnees.ajouter_projets_en_lot(objets)
+            elif entite == ENTITE_MEMBRES:
+                self.gestionnaire_donnees.ajouter_membres_en_lot(objets)
+            else:
+                self.gestionnaire_donnees.ajouter_taches_en_lot(objets)
+        
+        rapport['importes'] += len(objets)
+        if entite == ENTITE_TACHES:
+            return  # Pas de correspondance pour les tâches : la mémoire reste bornée par le lot
+        for ancien_id, objet in zip(anciens_ids, objets):
+            if ancien_id is not None:
+                rapport['correspondance'][ancien_id] = objet.id
+    
+    def _construire(self, donnees: dict, entite: str, references: Optional[dict]):
+        """Construire l'objet modèle d'un enregistrement et le valider (ValueError si invalide)"""
+        donnees = self._convertir_enregistrement(donnees)
+        if entite == ENTITE_PROJETS:
+            projet = Projet.depuis_dict(donnees)
+            self._valider_projet(projet)
+            return projet
+        if entite == ENTITE_MEMBRES:
+            membre = MembreEquipe.depuis_dict(donnees)
+            self._valider_membre(membre)
+            return membre
+        tache = Tache.depuis_dict(donnees)
+        self._valider_tache(tache, references)
+        return tache
+    
+    @staticmethod
+    def _valider_projet(projet: Projet):
+        """Valider un projet importé"""
+        if not Validateurs.valider_nom_projet(projet.nom):
+            raise ValueError("Nom de projet invalide")
+        if projet.statut not in (Projet.STATUT_ACTIF, Projet.STATUT_TERMINE, Projet.STATUT_EN_ATTENTE):
+            raise ValueError(f"Statut de projet inconnu : {projet.statut}")
+        for date_projet in (projet.date_debut, projet.date_fin):
+            if not Validateurs.valider_date(date_projet):
+                raise ValueError(f"Date invalide : {date_projet}")
+    
+    @staticmethod
+    def _valider_membre(membre: MembreEquipe):
+        """Valider un membre d'équipe importé"""
+        if not Validateurs.valider_nom_membre(membre.nom):
+            raise ValueError("Nom de membre invalide")
+        if not Validateurs.valider_email(membre.email):
+            raise ValueError(f"Email invalide : {membre.email}")
+        if not Validateurs.valider_pourcentage(membre.disponibilite):
+            raise ValueError(f"Disponibilité invalide : {membre.disponibilite}")
+        if not Validateurs.valider_entier(membre.heures_max_par_semaine, 1, 168):
+            raise ValueError(f"Heures maximum par semaine invalides : {membre.heures_max_par_semaine}")
+        membre.competences = ImportateurDonnees._valider_competences(membre.competences)
+    
+    @staticmethod
+    def _valider_tache(tache: Tache, references: dict):
+        """Valider une tâche importée et traduire ses références (projet, assignataire)"""
+        if not Validateurs.valider_titre_tache(tache.titre):
+            raise ValueError("Titre de tâche invalide")
+        if tache.priorite not in (Tache.PRIORITE_HAUTE, Tache.PRIORITE_MOYENNE, Tache.PRIORITE_BASSE):
+            raise ValueError(f"Priorité inconnue : {tache.priorite}")
+        if tache.statut not in (Tache.STATUT_A_FAIRE, Tache.STATUT_EN_COURS, Tache.STATUT_TERMINE):
+            raise ValueError(f"Statut de tâche inconnu : {tache.statut}")
+        if not Validateurs.valider_date(tache.echeance or ''):
+            raise ValueError(f"Échéance invalide : {tache.echeance}")
+        if (not isinstance(tache.heures_estimees, int) or isinstance(tache.heures_estimees, bool)
+                or tache.heures_estimees < 0):
+            raise ValueError(f"Heures estimées invalides : {tache.heures_estimees}")
+        tache.competences_requises = ImportateurDonnees._valider_competences(tache.competences_requises)
+        
+        if tache.id_projet is not None:
+            tache.id_projet = references['correspondance_projets'].get(tache.id_projet, tache.id_projet)
+            if tache.id_projet not in references['projets']:
+                raise ValueError(f"Projet inexistant : {tache.id_projet}")
+        if tache.assigne_a is not None:
+            tache.assigne_a = references['correspondance_membres'].get(tache.assigne_a, tache.assigne_a)
+            if tache.assigne_a not in references['membres']:
+                raise ValueError(f"Membre inexistant : {tache.assigne_a}")
+    
+    @staticmethod
+    def _valider_competences(competences) -> List[str]:
+        """Valider une liste de compétences (une chaîne seule est découpée sur SEPARATEUR_LISTE)"""
+        if isinstance(competences, str):
+            competences = competences.split(SEPARATEUR_LISTE)
+        competences = [c.strip() for c in competences if isinstance(c, str) and c.strip()]
+        for competence in competences:
+            if not Validateurs.valider_nom_competence(competence):
+                raise ValueError(f"Compétence invalide : {competence}")
+        return competences
+    
+    @staticmethod
+    def _rejeter(rapport: dict, numero_ligne: int, message: str):
+        """Compter un enregistrement rejeté et conserver son message (dans la limite du rapport)"""
+        rapport['rejetes'] += 1
+        if len(rapport['erreurs']) < MAX_ERREURS_RAPPORT:
+            rapport['erreurs'].append((numero_ligne, message))
@@ -3,30 +3,33 @@ Moteur d'assignation automatique des tâches
 """
 
 from typing import List, Optional
-from modeles.gestionnaire_donnees import GestionnaireDonnees
+from modeles.stockage import StockageDonnees
 from modeles.tache import Tache
 from modeles.membre_equipe import MembreEquipe
 
 class MoteurAssignation:
-    def __init__(self, gestionnaire_donnees: GestionnaireDonnees):
+    def __init__(self, gestionnaire_donnees: StockageDonnees):
         self.gestionnaire_donnees = gestionnaire_donnees
     
-    def trouver_meilleur_assignataire(self, tache: Tache) -> Optional[MembreEquipe]:
+    def trouver_meilleur_assignataire(self, tache: Tache,
+                                      membres_equipe: Optional[List[MembreEquipe]] = None) -> Optional[MembreEquipe]:
         """
         Trouver le meilleur membre d'équipe pour assigner une tâche basé sur :
         - Correspondance des compétences requises
         - Charge de travail actuelle/disponibilité
         - Priorité de la tâche
+        membres_equipe : membres déjà chargés (rechargés depuis la base sinon)
         """
-        membres_equipe = self.gestionnaire_donnees.charger_membres_equipe()
+        if membres_equipe is None:
+            membres_equipe = self.gestionnaire_donnees.charger_membres_equipe()
         
         if not membres_equipe:
             return None
         
-        # Filtrer les membres qui ont les compétences requises
+        # Filtrer les membres qui ont les compétences requises (inclusion d'ensembles d'IDs)
         membres_eligibles = []
         for membre in membres_equipe:
-            if membre.a_competences_requises(tache.competences_requises):
+            if tache.ids_competences <= membre.ids_competences:
                 membres_eligibles.append(membre)
         
         # Si personne n'a les compétences requises, considérer tous les membres
@@ -74,22 +77,20 @@ class MoteurAssignation:
     
     def _calculer_score_competences(self, membre: MembreEquipe, tache: Tache) -> float:
         """Calculer à quel point les compétences du membre correspondent aux exigences de la tâche"""
-        if not tache.competences_requises:
+        if not tache.ids_competences:
             return 0.5  # Score neutre si aucune compétence spécifique requise
         
-        if not membre.competences:
+        if not membre.ids_competences:
             return 0.0  # Aucune compétence signifie aucune correspondance
         
         # Calculer le pourcentage de compétences requises que le membre possède
-        competences_correspondantes = 0
-        for competence in tache.competences_requises:
-            if competence.lower() in [c.lower() for c in membre.competences]:
-                competences_correspondantes += 1
+        # (intersection d'ensembles d'IDs : la casse est déjà normalisée par la base)
+        competences_correspondantes = len(tache.ids_competences & membre.ids_competences)
         
-        ratio_correspondance_competences = competences_correspondantes / len(tache.competences_requises)
+        ratio_correspondance_competences = competences_correspondantes / len(tache.ids_competences)
         
         # Bonus pour avoir des compétences supplémentaires pertinentes
-        bonus_competences_supplementaires = min(len(membre.competences) / 10.0, 0.2)
+        bonus_competences_supplementaires = min(len(membre.ids_competences) / 10.0, 0.2)
         
         return min(ratio_correspondance_competences + bonus_competences_supplementaires, 1.0)
     
@@ -134,27 +135,46 @@ class MoteurAssignation:
         # Trier les tâches par priorité (haute priorité en premier)
         taches_non_assignees.sort(key=lambda t: t.obtenir_poids_priorite(), reverse=True)
         
-        for tache in taches_non_assignees:
-            meilleur_membre = self.trouver_meilleur_assignataire(tache)
-            
-            if meilleur_membre:
-                # Assigner la tâche
-                tache.assigner_a(meilleur_membre.id)
-                meilleur_membre.assigner_tache(tache.id, tache.heures_estimees)
-                
-                # Sauvegarder les changements
-                self.gestionnaire_donnees.mettre_a_jour_tache(tache)
-                self.gestionnaire_donnees.mettre_a_jour_membre_equipe(meilleur_membre)
+        # Membres chargés une seule fois : leur charge en mémoire est tenue à jour après
+        # chaque assignation (assigner_tache), comme les déclencheurs le font dans la base
+        membres_equipe = self.gestionnaire_donnees.charger_membres_equipe()
+        
+        # Une seule transaction pour tout le lot : un seul commit, rien n'est écrit en cas d'erreur
+        with self.gestionnaire_donnees.transaction():
+            for tache in taches_non_assignees:
+                meilleur_membre = self.trouver_meilleur_assignataire(tache, membres_equipe)
                 
-                resultats['assignees'].append({
-                    'tache': tache,
-                    'assignataire': meilleur_membre
-                })
-            else:
-                resultats['non_assignees'].append(tache)
+                if meilleur_membre:
+                    # Assigner la tâche (et compter ses heures dans la charge en mémoire du
+                    # membre, pour les tâches suivantes du lot)
+                    tache.assigner_a(meilleur_membre.id)
+                    meilleur_membre.assigner_tache(tache.id, tache.heures_estimees or 0)
+                    
+                    # Sauvegarder les changements (la charge du membre est mise à jour
+                    # dans la base par les déclencheurs)
+                    self.gestionnaire_donnees.mettre_a_jour_tache(tache)
+                    
+                    resultats['assignees'].append({
+                        'tache': tache,
+                        'assignataire': meilleur_membre
+                    })
+                else:
+                    resultats['non_assignees'].append(tache)
         
         return resultats
     
+    def simuler_auto_assignation(self) -> dict:
+        """
+        Simuler l'assignation automatique de toutes les tâches non assignées sur une copie
+        en mémoire de la base : mêmes résultats que auto_assigner_toutes_taches_non_assignees(),
+        mais rien n'est écrit dans la base réelle.
+        """
+        brouillon = self.gestionnaire_donnees.creer_instantane(lecture_seule=False)
+        try:
+            return MoteurAssignation(brouillon).auto_assigner_toutes_taches_non_assignees()
+        finally:
+            brouillon.fermer()
+    
     def suggerer_reassignations(self) -> List[dict]:
         """
         Suggérer des réassignations de tâches pour un meilleur équilibre de charge de travail.
@@ -175,7 +195,7 @@ class MoteurAssignation:
             taches_membre.sort(key=lambda t: t.obtenir_poids_priorite())
             
             for tache in taches_membre[:3]:  # Considérer jusqu'à 3 tâches pour réassignation
-                meilleur_assignataire = self.trouver_meilleur_assignataire(tache)
+                meilleur_assignataire = self.trouver_meilleur_assignataire(tache, membres_equipe)
                 
                 if meilleur_assignataire and meilleur_assignataire.id != membre.id:
                     score_actuel = self._calculer_score_assignation(membre, tache)